@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+#
+#   DIM-SDK : Decentralized Instant Messaging Software Development Kit
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+"""
+    Compressor Benchmark
+    ~~~~~~~~~~~~~~~~~~~~
+
+    Throughput and allocations of MessageShortener & MessageCompressor
+    for content, symmetric key and network message shapes across sizes.
+
+    Alternative compressors can be compared by '--compressor name=module:ClassName',
+    the class will be created with 'shortener=MessageShortener()'.
+
+    Usage:
+        python benchmarks/bench_compressor.py [--iterations 1000] [--output result.json]
+"""
+
+import argparse
+import base64
+import importlib
+import os
+import random
+import sys
+import tracemalloc
+from typing import Optional, Callable, Any, List, Dict, Tuple
+
+path = os.path.abspath(os.path.dirname(__file__))
+if path not in sys.path:
+    sys.path.insert(0, path)
+
+from common import *
+
+
+class PlainShortener(Shortener):
+    """ Keep the long keys, for comparing with the short keys format """
+
+    # Override
+    def compress_content(self, content: StrMap) -> StrMap:
+        return content
+
+    # Override
+    def extract_content(self, content: StrMap) -> StrMap:
+        return content
+
+    # Override
+    def compress_symmetric_key(self, key: StrMap) -> StrMap:
+        return key
+
+    # Override
+    def extract_symmetric_key(self, key: StrMap) -> StrMap:
+        return key
+
+    # Override
+    def compress_reliable_message(self, msg: StrMap) -> StrMap:
+        return msg
+
+    # Override
+    def extract_reliable_message(self, msg: StrMap) -> StrMap:
+        return msg
+
+
+#
+#   Shapes
+#
+
+def _random_base64(size: int) -> str:
+    return base64.b64encode(os.urandom(size)).decode('utf-8')
+
+
+def _random_id(name: str) -> str:
+    return '%s@%s' % (name, base64.b32encode(os.urandom(20)).decode('utf-8')[:34])
+
+
+def content_shapes() -> Dict[str, StrMap]:
+    shapes = {}
+    for size in [16, 1024, 65536]:
+        shapes['text_%d' % size] = {
+            'type': '1',
+            'sn': random.randint(1, 0x7FFFFFFF),
+            'time': 1790000000.123,
+            'text': 'x' * size,
+        }
+    shapes['invite_100'] = {
+        'type': '88',
+        'sn': random.randint(1, 0x7FFFFFFF),
+        'time': 1790000000.123,
+        'command': 'invite',
+        'group': _random_id(name='group'),
+        'members': [_random_id(name='member%d' % i) for i in range(100)],
+    }
+    return shapes
+
+
+def key_shapes() -> Dict[str, StrMap]:
+    return {
+        'aes': {'algorithm': 'AES', 'data': _random_base64(32)},
+        'aes_iv': {'algorithm': 'AES', 'data': _random_base64(32), 'iv': _random_base64(16)},
+    }
+
+
+def message_shapes() -> Dict[str, StrMap]:
+    shapes = {}
+    sender = _random_id(name='alice')
+    for size in [0, 10, 100, 1000]:
+        msg = {
+            'sender': sender,
+            'receiver': _random_id(name='bob'),
+            'time': 1790000000.123,
+            'type': '1',
+            'data': _random_base64(256),
+            'signature': _random_base64(64),
+        }
+        if size == 0:
+            msg['key'] = _random_base64(128)
+            shapes['personal'] = msg
+            continue
+        keys = {_random_id(name='member%d' % i): _random_base64(128) for i in range(size)}
+        keys['digest'] = _random_base64(8)
+        msg['receiver'] = _random_id(name='group')
+        msg['keys'] = keys
+        shapes['group%d' % size] = msg
+    return shapes
+
+
+#
+#   Measurement
+#
+
+def allocations(func: Callable[[], Any]) -> Dict[str, int]:
+    """ Peak bytes & retained blocks of one call """
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+        stats = after.compare_to(before, 'lineno')
+        blocks = sum(item.count_diff for item in stats if item.count_diff > 0)
+        del result
+    finally:
+        tracemalloc.stop()
+    return {
+        'peak_bytes': peak - base,
+        'retained_blocks': blocks,
+    }
+
+
+def bench(scenario: str, stage: str, func: Callable[[], Any], iterations: int, **extra) -> Dict[str, Any]:
+    func()  # warm up
+    samples = measure(func=func, iterations=iterations)
+    extra.update(allocations(func=func))
+    return summarize(scenario=scenario, stage=stage, samples=samples, **extra)
+
+
+def bench_shortener(shortener: Shortener, iterations: int) -> List[Dict[str, Any]]:
+    results = []
+    groups = [
+        (content_shapes(), shortener.compress_content, shortener.extract_content),
+        (key_shapes(), shortener.compress_symmetric_key, shortener.extract_symmetric_key),
+        (message_shapes(), shortener.compress_reliable_message, shortener.extract_reliable_message),
+    ]
+    for shapes, compress, extract in groups:
+        for name, info in shapes.items():
+            short = compress(info)
+            results.append(bench(scenario='shortener/%s' % name, stage='shorten',
+                                 func=lambda: compress(info), iterations=iterations))
+            results.append(bench(scenario='shortener/%s' % name, stage='restore',
+                                 func=lambda: extract(short), iterations=iterations))
+    return results
+
+
+def bench_compressor(label: str, compressor: Compressor, iterations: int) -> List[Dict[str, Any]]:
+    results = []
+    key_info = key_shapes()['aes']
+    groups: List[Tuple[Dict[str, StrMap], Callable, Callable]] = [
+        (content_shapes(),
+         lambda info: compressor.compress_content(content=info, key=key_info),
+         lambda data: compressor.extract_content(data=data, key=key_info)),
+        (key_shapes(),
+         lambda info: compressor.compress_symmetric_key(key=info),
+         lambda data: compressor.extract_symmetric_key(data=data)),
+        (message_shapes(),
+         lambda info: compressor.compress_reliable_message(msg=info),
+         lambda data: compressor.extract_reliable_message(data=data)),
+    ]
+    for shapes, compress, extract in groups:
+        for name, info in shapes.items():
+            data = compress(info)
+            scenario = '%s/%s' % (label, name)
+            results.append(bench(scenario=scenario, stage='compress', func=lambda: compress(info),
+                                 iterations=iterations, bytes=len(data)))
+            results.append(bench(scenario=scenario, stage='extract', func=lambda: extract(data),
+                                 iterations=iterations, bytes=len(data)))
+    # envelope for routing
+    for name, info in message_shapes().items():
+        data = compressor.compress_reliable_message(msg=info)
+        results.append(bench(scenario='%s/%s' % (label, name), stage='envelope',
+                             func=lambda: compressor.extract_message_envelope(data=data),
+                             iterations=iterations, bytes=len(data)))
+    return results
+
+
+def load_compressor(spec: str) -> Tuple[str, Compressor]:
+    """ 'name=module:ClassName' """
+    label, _, target = spec.partition('=')
+    module_name, _, class_name = target.partition(':')
+    clazz = getattr(importlib.import_module(module_name), class_name)
+    return label, clazz(shortener=MessageShortener())
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Benchmark for shortener & compressor')
+    parser.add_argument('--iterations', type=int, default=1000, help='iterations for each shape')
+    parser.add_argument('--compressor', action='append', default=[], help='name=module:ClassName')
+    parser.add_argument('--output', default=None, help='JSON report file (default: stdout)')
+    args = parser.parse_args(argv)
+    load_plugins()
+    compressors = [
+        ('json', MessageCompressor(shortener=MessageShortener())),
+        ('json-long-keys', MessageCompressor(shortener=PlainShortener())),
+    ]
+    for spec in args.compressor:
+        compressors.append(load_compressor(spec=spec))
+    results = bench_shortener(shortener=MessageShortener(), iterations=args.iterations)
+    for label, compressor in compressors:
+        results.extend(bench_compressor(label=label, compressor=compressor, iterations=args.iterations))
+    emit(name='compressor', results=results, output=args.output)
+
+
+if __name__ == '__main__':
+    main()
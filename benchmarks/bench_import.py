@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+#
+#   DIM-SDK : Decentralized Instant Messaging Software Development Kit
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+"""
+    Import Benchmark
+    ~~~~~~~~~~~~~~~~
+
+    Time spent on importing 'dimsdk' (and some names from it) in fresh processes.
+
+    Usage:
+        python benchmarks/bench_import.py [--iterations 20] [--output result.json]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from typing import Optional, List
+
+path = os.path.abspath(os.path.dirname(__file__))
+if path not in sys.path:
+    sys.path.insert(0, path)
+
+from common import summarize, emit
+
+
+ROOT = os.path.dirname(path)
+
+SCENARIOS = {
+    'package': 'import dimsdk',
+    'protocol': 'from dimsdk import ID, Envelope, InstantMessage',
+    'messenger': 'from dimsdk import Messenger, MessagePacker, MessageProcessor',
+    'everything': 'from dimsdk import *',
+}
+
+SCRIPT = '''
+import sys
+import time
+sys.path.insert(0, %r)
+start = time.perf_counter()
+%s
+print(time.perf_counter() - start)
+'''
+
+
+def measure_import(statement: str, iterations: int) -> List[float]:
+    samples = []
+    script = SCRIPT % (ROOT, statement)
+    for _ in range(iterations):
+        output = subprocess.check_output([sys.executable, '-c', script])
+        samples.append(float(output.decode('utf-8').strip()))
+    return samples
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Benchmark for importing dimsdk')
+    parser.add_argument('--iterations', type=int, default=20, help='processes for each scenario')
+    parser.add_argument('--output', default=None, help='JSON report file (default: stdout)')
+    args = parser.parse_args(argv)
+    results = []
+    for name, statement in SCENARIOS.items():
+        samples = measure_import(statement=statement, iterations=args.iterations)
+        results.append(summarize(scenario=name, stage='import', samples=samples, statement=statement))
+    emit(name='import', results=results, output=args.output)
+
+
+if __name__ == '__main__':
+    main()
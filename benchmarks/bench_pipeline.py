@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+#
+#   DIM-SDK : Decentralized Instant Messaging Software Development Kit
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+"""
+    Pipeline Benchmark
+    ~~~~~~~~~~~~~~~~~~
+
+    Messages/sec and p50/p99 latency of packing (encrypt + sign + serialize),
+    processing packages (MessageProcessor.process_package) and compressing
+    network messages (MessageCompressor), for personal, group and broadcast messages.
+
+    Usage:
+        python benchmarks/bench_pipeline.py [--scenarios personal,group100] [--scale 1.0] [--output result.json]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from typing import List, Dict, Any
+
+path = os.path.abspath(os.path.dirname(__file__))
+if path not in sys.path:
+    sys.path.insert(0, path)
+
+from common import *
+
+
+# scenario => (group size, iterations), group size 0 for personal message, -1 for broadcast message
+SCENARIOS = {
+    'personal': (0, 200),
+    'group10': (10, 100),
+    'group100': (100, 30),
+    'group1000': (1000, 5),
+    'broadcast': (-1, 200),
+}
+
+
+async def run_scenario(name: str, size: int, iterations: int) -> List[Dict[str, Any]]:
+    db = MemoryDatabase()
+    # all members share one decryption key, just to speed up the preparing
+    msg_key = PrivateKey.generate(algorithm=AsymmetricAlgorithms.RSA)
+    alice = create_user(database=db, name='alice', msg_key=msg_key)
+    bob = create_user(database=db, name='bob', msg_key=msg_key)
+    if size > 0:
+        members = [alice, bob]
+        while len(members) < size:
+            members.append(create_user(database=db, name='member%d' % len(members), msg_key=msg_key))
+        receiver = create_group(database=db, founder=alice, members=members)
+    elif size < 0:
+        receiver = ANYONE
+    else:
+        receiver = bob
+    sender = create_endpoint(database=db, local_users=[alice])
+    recipient = create_endpoint(database=db, local_users=[bob])
+    compressor = sender.compressor
+
+    def new_message() -> InstantMessage:
+        content = TextContent.create(text='Hello world!')
+        env = Envelope.create(sender=alice, receiver=receiver)
+        return InstantMessage.create(head=env, body=content)
+
+    async def pack(i_msg: InstantMessage) -> bytes:
+        s_msg = await sender.encrypt_message(msg=i_msg)
+        r_msg = await sender.sign_message(msg=s_msg)
+        return await sender.serialize_message(msg=r_msg)
+
+    # warm up caches (message keys, entities, visa keys)
+    package = await pack(i_msg=new_message())
+    await recipient.process_package(data=package)
+
+    # 1. pack
+    messages = [new_message() for _ in range(iterations)]
+    packages = []
+
+    async def pack_next():
+        packages.append(await pack(i_msg=messages[len(packages)]))
+
+    samples = await measure_async(func=pack_next, iterations=iterations)
+    results = [summarize(scenario=name, stage='pack', samples=samples, bytes=len(package))]
+
+    # 2. process package
+    queue = list(packages)
+
+    async def process_next():
+        await recipient.process_package(data=queue.pop())
+
+    samples = await measure_async(func=process_next, iterations=iterations)
+    results.append(summarize(scenario=name, stage='process_package', samples=samples, bytes=len(package)))
+
+    # 3. compressor
+    msg_info = (await recipient.deserialize_message(data=package)).to_map()
+    samples = measure(func=lambda: compressor.compress_reliable_message(msg=msg_info), iterations=iterations)
+    results.append(summarize(scenario=name, stage='compress', samples=samples, bytes=len(package)))
+    samples = measure(func=lambda: compressor.extract_reliable_message(data=package), iterations=iterations)
+    results.append(summarize(scenario=name, stage='extract', samples=samples, bytes=len(package)))
+    return results
+
+
+async def main():
+    parser = argparse.ArgumentParser(description='Benchmark for packing & processing messages')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS.keys()), help='comma separated scenario names')
+    parser.add_argument('--scale', type=float, default=1.0, help='multiplier for iterations')
+    parser.add_argument('--output', default=None, help='JSON report file (default: stdout)')
+    args = parser.parse_args()
+    load_plugins()
+    results = []
+    for name in args.scenarios.split(','):
+        size, iterations = SCENARIOS[name]
+        iterations = max(1, int(iterations * args.scale))
+        results.extend(await run_scenario(name=name, size=size, iterations=iterations))
+    emit(name='pipeline', results=results, output=args.output)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -28,17 +28,23 @@
 # SOFTWARE.
 # ==============================================================================
 
-from dimp import *
+import importlib
+from typing import TYPE_CHECKING
 
-from .crypto import *
-from .mkm import *
-from .msg import *
-# from .dkd import *
+if TYPE_CHECKING:
+    # public names are loaded lazily (see '__getattr__' below),
+    # these imports are for static analyzers only
+    from dimp import *
 
-from .core import *
-from .base import *
+    from .crypto import *
+    from .mkm import *
+    from .msg import *
+    # from .dkd import *
 
-from .cpu import *
+    from .core import *
+    from .base import *
+
+    from .cpu import *
 
 
 name = 'DIM-SDK'
@@ -277,100 +283,91 @@ __all__ = [
     'QuoteHelper', 'QuotePurifier',
     'QuoteExtension',
 
-
-    ################################################################
-    #
-    #   Software Development Kits
-    #
-    ################################################################
-
-
-    'EncryptedBundle', 'UserEncryptedBundle',
-    'EncryptedBundleHelper', 'DefaultBundleHelper',
-    'EncryptedBundleExtension',
-
-    'VisaAgent', 'DefaultVisaAgent',
-    'VisaAgentExtension',
-
-    #
-    #   Entities (MingKeMing)
-    #
-
-    'EntityDelegate',
-    'EntityDataSource',
-    'Entity', 'BaseEntity',
-
-    'GroupDataSource',
-    'Group', 'BaseGroup',
-
-    'UserDataSource',
-    'User', 'BaseUser',
-
-    #
-    #   Message Transformers (DaoKeDao)
-    #
-
-    'InstantMessageDelegate',
-    'SecureMessageDelegate',
-    'ReliableMessageDelegate',
-
-    'InstantMessagePacker',
-    'SecureMessagePacker',
-    'ReliableMessagePacker',
-
-    'MessagePackerFactory',
-    'MessagePackerExtension',
-
-    #
-    #   Content Processors (DaoKeDao)
-    #
-
-    # 'ContentProcessor',
-    # 'ContentProcessorCreator',
-    # 'ContentProcessorFactory',
-    #
-    # 'GeneralContentProcessorFactory',
-
-    #
-    #   Core Interfaces
-    #
-
-    'Archivist',
-    'Barrack',
-
-    'Shortener', 'MessageShortener',
-    'Compressor', 'MessageCompressor',
-
-    'Packer',
-    'Processor',
-    'Transformer',
-
-    'CipherKeyDelegate',
-
     #
-    #   Twins
+    #   Software Development Kits (appended from '_LAZY_EXPORTS' below)
     #
 
-    'TwinsHelper',
-
-    'Facebook',
-
-    'Messenger',
-    'MessageProcessor',
-    'MessagePacker',
-
-    #
-    #   CPU - Content Processing Units
-    #
+]
 
-    'ContentProcessor',
-    'ContentProcessorCreator',
-    'ContentProcessorFactory',
-    'GeneralContentProcessorFactory',
 
-    'BaseContentProcessor', 'BaseCommandProcessor',
-    'ArrayContentProcessor', 'ForwardContentProcessor',
-    'MetaCommandProcessor', 'DocumentCommandProcessor',
-    'BaseContentProcessorCreator',
+#
+#   Lazy Loading (PEP 562)
+#
+#   Importing 'dimsdk' loads nothing else, each public name is imported
+#   from its subpackage (or 'dimp') on first access, and cached here;
+#   the subpackages install their shared extensions only if the application
+#   has not set its own yet, so the loading order doesn't matter.
+#
 
-]
+_SUBPACKAGES = ('crypto', 'mkm', 'msg', 'dkd', 'core', 'base', 'cpu')
+
+_LAZY_EXPORTS = {
+    '.crypto': (
+        'EncryptedBundle', 'UserEncryptedBundle', 'SingleEncryptedBundle',
+        'EncryptedBundleHelper', 'DefaultBundleHelper', 'EncryptedBundleExtension',
+        'VisaAgent', 'DefaultVisaAgent', 'VisaAgentExtension',
+        'BytesMap',
+    ),
+    '.mkm': (
+        'EntityDelegate', 'EntityDataSource', 'Entity', 'BaseEntity',
+        'GroupDataSource', 'Group', 'BaseGroup',
+        'UserDataSource', 'User', 'BaseUser',
+    ),
+    '.msg': (
+        'InstantMessageDelegate', 'SecureMessageDelegate', 'ReliableMessageDelegate',
+        'InstantMessagePacker', 'SecureMessagePacker', 'ReliableMessagePacker',
+        'MessagePackerFactory', 'MessagePackerExtension',
+        'ChunkedBase64', 'MessageBuffers',
+        'BundleMap',
+    ),
+    '.dkd': (
+        'ContentProcessor', 'ContentProcessorCreator', 'ContentProcessorFactory',
+        'GeneralContentProcessorFactory',
+        'ContentScheduler',
+    ),
+    '.core': (
+        'Archivist', 'Barrack', 'BufferedArchivist',
+        'Shortener', 'MessageShortener',
+        'Compressor', 'MessageCompressor',
+        'Packer', 'Processor', 'Transformer',
+        'CipherKeyDelegate',
+        'MetricsSink', 'LatencyHistogram', 'HistogramSink', 'PipelineMetrics',
+        'SuspendedMessageQueue',
+        'SenderRateLimiter',
+        'RotatingBloomFilter',
+    ),
+    '.base': (
+        'TwinsHelper', 'Facebook', 'Messenger', 'MessageProcessor', 'MessagePacker',
+    ),
+    '.cpu': (
+        'BaseContentProcessor', 'BaseCommandProcessor',
+        'ArrayContentProcessor', 'ForwardContentProcessor',
+        'MetaValidationCache', 'MetaCommandProcessor', 'DocumentCommandProcessor',
+        'BaseContentProcessorCreator',
+    ),
+}
+
+_LAZY_NAMES = {name: module for module, names in _LAZY_EXPORTS.items() for name in names}
+
+__all__ += [name for names in _LAZY_EXPORTS.values() for name in names]
+
+
+def __getattr__(name: str):
+    if name.startswith('__'):
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    module_name = _LAZY_NAMES.get(name)
+    if module_name is not None:
+        value = getattr(importlib.import_module(module_name, __name__), name)
+    elif name in _SUBPACKAGES:
+        value = importlib.import_module(f'.{name}', __name__)
+    else:
+        # names from DIMP
+        value = getattr(importlib.import_module('dimp'), name, None)
+        if value is None:
+            raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
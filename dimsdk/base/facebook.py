@@ -41,7 +41,7 @@ from typing import Optional, List
 from dimp import ID
 
 from ..core import Barrack, Archivist
-from ..mkm import EntityDelegate, User, Group
+from ..mkm import EntityDelegate, User, Group, BaseGroup
 from ..mkm import UserDataSource, GroupDataSource
 
 
@@ -140,3 +140,19 @@ class Facebook(EntityDelegate, UserDataSource, GroupDataSource, ABC):
             if group is not None:
                 barrack.cache_group(group=group)
         return group
+
+    def invalidate_group(self, identifier: ID):
+        """
+        Clear cached owner & members of the group entity,
+        call it after the group membership changed;
+        group commands & bulletins are handled by the message processor,
+        but changes written to the database directly must call it too
+
+        :param identifier: group ID
+        """
+        assert identifier.is_group, f'group ID error: {identifier}'
+        barrack = self.barrack
+        assert barrack is not None, 'barrack not ready'
+        group = barrack.get_group(identifier=identifier)
+        if isinstance(group, BaseGroup):
+            group.invalidate()
@@ -36,18 +36,32 @@
 """
 
 from abc import ABC, abstractmethod
-from typing import Optional, List
+from typing import Optional, List, AsyncIterator
 
 from dimp import SymmetricKey
+from dimp import ID
 from dimp import Content
 from dimp import InstantMessage, SecureMessage, ReliableMessage
 
+from ..crypto import EncryptedBundle
 from ..core import Transformer, Packer, Processor
 from ..core import CipherKeyDelegate
+from ..core import PipelineMetrics
+from ..core import SuspendedMessageQueue
+from ..core.metrics import shared_pipeline_metrics
 
 
 class Messenger(Transformer, Packer, Processor, ABC):
 
+    def __init__(self):
+        super().__init__()
+        self.__suspended = SuspendedMessageQueue()
+
+    @property  # protected
+    def suspended_messages(self) -> SuspendedMessageQueue:
+        """ Messages waiting for meta/visa """
+        return self.__suspended
+
     @property  # protected
     @abstractmethod
     def key_cache(self) -> Optional[CipherKeyDelegate]:
@@ -72,6 +86,56 @@ class Messenger(Transformer, Packer, Processor, ABC):
             f'Not implemented: {type(self).__module__}.{type(self).__name__}.processor getter'
         )
 
+    @property  # protected
+    def offload_key_encryption(self) -> bool:
+        """
+        Let the packer encrypt message keys in an executor by the visa agent directly,
+        see 'MessagePacker.split_group_message()';
+        turn it on only when 'encrypt_key()' is not customized (it will be bypassed),
+        and the instant message packer accepts the 'bundles' argument
+        """
+        return False
+
+    @property  # protected
+    def metrics(self) -> Optional[PipelineMetrics]:
+        """ Instrumentation for pipeline stages, None when disabled """
+        metrics = shared_pipeline_metrics
+        return metrics if metrics.enabled else None
+
+    #
+    #   Transformer
+    #
+
+    # Override
+    async def serialize_message(self, msg: ReliableMessage) -> Optional[bytes]:
+        metrics = self.metrics
+        if metrics is None:
+            return await super().serialize_message(msg=msg)
+        return await metrics.measure(stage='serialize_message', coro=super().serialize_message(msg=msg))
+
+    # Override
+    async def deserialize_message(self, data: bytes) -> Optional[ReliableMessage]:
+        metrics = self.metrics
+        if metrics is None:
+            return await super().deserialize_message(data=data)
+        return await metrics.measure(stage='deserialize_message', coro=super().deserialize_message(data=data))
+
+    # Override
+    async def encrypt_key(self, data: bytes, receiver: ID, msg: InstantMessage) -> Optional[EncryptedBundle]:
+        metrics = self.metrics
+        if metrics is None:
+            return await super().encrypt_key(data=data, receiver=receiver, msg=msg)
+        coro = super().encrypt_key(data=data, receiver=receiver, msg=msg)
+        return await metrics.measure(stage='encrypt_key', coro=coro)
+
+    # Override
+    async def decrypt_key(self, bundle: EncryptedBundle, receiver: ID, msg: SecureMessage) -> Optional[bytes]:
+        metrics = self.metrics
+        if metrics is None:
+            return await super().decrypt_key(bundle=bundle, receiver=receiver, msg=msg)
+        coro = super().decrypt_key(bundle=bundle, receiver=receiver, msg=msg)
+        return await metrics.measure(stage='decrypt_key', coro=coro)
+
     #
     #   SecureMessageDelegate
     #
@@ -117,12 +181,18 @@ class Messenger(Transformer, Packer, Processor, ABC):
     # Override
     async def encrypt_message(self, msg: InstantMessage) -> Optional[SecureMessage]:
         packer = self.packer
-        return await packer.encrypt_message(msg=msg)
+        metrics = self.metrics
+        if metrics is None:
+            return await packer.encrypt_message(msg=msg)
+        return await metrics.measure(stage='encrypt_message', coro=packer.encrypt_message(msg=msg))
 
     # Override
     async def sign_message(self, msg: SecureMessage) -> Optional[ReliableMessage]:
         packer = self.packer
-        return await packer.sign_message(msg=msg)
+        metrics = self.metrics
+        if metrics is None:
+            return await packer.sign_message(msg=msg)
+        return await metrics.measure(stage='sign_message', coro=packer.sign_message(msg=msg))
 
     # # Override
     # async def serialize_message(self, msg: ReliableMessage) -> Optional[bytes]:
@@ -137,12 +207,18 @@ class Messenger(Transformer, Packer, Processor, ABC):
     # Override
     async def verify_message(self, msg: ReliableMessage) -> Optional[SecureMessage]:
         packer = self.packer
-        return await packer.verify_message(msg=msg)
+        metrics = self.metrics
+        if metrics is None:
+            return await packer.verify_message(msg=msg)
+        return await metrics.measure(stage='verify_message', coro=packer.verify_message(msg=msg))
 
     # Override
     async def decrypt_message(self, msg: SecureMessage) -> Optional[InstantMessage]:
         packer = self.packer
-        return await packer.decrypt_message(msg=msg)
+        metrics = self.metrics
+        if metrics is None:
+            return await packer.decrypt_message(msg=msg)
+        return await metrics.measure(stage='decrypt_message', coro=packer.decrypt_message(msg=msg))
 
     #
     #   Interfaces for Processing Message
@@ -153,22 +229,58 @@ class Messenger(Transformer, Packer, Processor, ABC):
         processor = self.processor
         return await processor.process_package(data=data)
 
+    # Override
+    async def iter_process_package(self, data: bytes) -> AsyncIterator[bytes]:
+        processor = self.processor
+        async for pack in processor.iter_process_package(data=data):
+            yield pack
+
     # Override
     async def process_reliable_message(self, msg: ReliableMessage) -> List[ReliableMessage]:
         processor = self.processor
         return await processor.process_reliable_message(msg=msg)
 
+    # Override
+    async def iter_process_reliable_message(self, msg: ReliableMessage) -> AsyncIterator[ReliableMessage]:
+        processor = self.processor
+        async for res in processor.iter_process_reliable_message(msg=msg):
+            yield res
+
     # Override
     async def process_secure_message(self, msg: SecureMessage, r_msg: ReliableMessage) -> List[SecureMessage]:
         processor = self.processor
         return await processor.process_secure_message(msg=msg, r_msg=r_msg)
 
+    # Override
+    async def iter_process_secure_message(self, msg: SecureMessage,
+                                          r_msg: ReliableMessage) -> AsyncIterator[SecureMessage]:
+        processor = self.processor
+        async for res in processor.iter_process_secure_message(msg=msg, r_msg=r_msg):
+            yield res
+
     # Override
     async def process_instant_message(self, msg: InstantMessage, r_msg: ReliableMessage) -> List[InstantMessage]:
         processor = self.processor
         return await processor.process_instant_message(msg=msg, r_msg=r_msg)
 
+    # Override
+    async def iter_process_instant_message(self, msg: InstantMessage,
+                                           r_msg: ReliableMessage) -> AsyncIterator[InstantMessage]:
+        processor = self.processor
+        async for res in processor.iter_process_instant_message(msg=msg, r_msg=r_msg):
+            yield res
+
     # Override
     async def process_content(self, content: Content, r_msg: ReliableMessage) -> List[Content]:
         processor = self.processor
-        return await processor.process_content(content=content, r_msg=r_msg)
+        metrics = self.metrics
+        if metrics is None:
+            return await processor.process_content(content=content, r_msg=r_msg)
+        coro = processor.process_content(content=content, r_msg=r_msg)
+        return await metrics.measure(stage='process_content', coro=coro)
+
+    # Override
+    async def iter_process_content(self, content: Content, r_msg: ReliableMessage) -> AsyncIterator[Content]:
+        processor = self.processor
+        async for res in processor.iter_process_content(content=content, r_msg=r_msg):
+            yield res
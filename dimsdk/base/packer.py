@@ -28,11 +28,19 @@
 # SOFTWARE.
 # ==============================================================================
 
-from typing import Optional
+import asyncio
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Optional, Any, Tuple, List, Dict
 
+from dimp import EncryptKey, SymmetricKey
+from dimp import ID, Meta, Document
 from dimp import InstantMessage, SecureMessage, ReliableMessage
 
+from ..crypto import BytesMap, EncryptedBundle
+from ..crypto.agent import visa_agent
 from ..msg.helpers import packer_factory
+from ..msg import BundleMap
 from ..msg import InstantMessagePacker, SecureMessagePacker, ReliableMessagePacker
 from ..core import Packer
 
@@ -49,6 +57,8 @@ class MessagePacker(TwinsHelper, Packer):
         self.__instant_packer = factory.create_instant_message_packer(messenger=messenger)
         self.__secure_packer = factory.create_secure_message_packer(messenger=messenger)
         self.__reliablePacker = factory.create_reliable_message_packer(messenger=messenger)
+        # receivers without visa key, waiting for querying documents (ID => time)
+        self.__waiting_visas: Dict[ID, float] = {}
 
     @property  # protected
     def instant_packer(self) -> InstantMessagePacker:
@@ -62,15 +72,141 @@ class MessagePacker(TwinsHelper, Packer):
     def reliable_packer(self) -> ReliableMessagePacker:
         return self.__reliablePacker
 
+    @property  # protected
+    def prefetch_concurrency(self) -> int:
+        """ Max members to be loaded at the same time before encrypting """
+        return 16
+
+    @property  # protected
+    def split_batch_size(self) -> int:
+        """ Members in each task when encrypting message key in the executor """
+        return 64
+
+    @property  # protected
+    def waiting_visas_capacity(self) -> int:
+        """ Max receivers kept for querying documents, the eldest ones will be dropped """
+        return 1024
+
+    @property  # protected
+    def waiting_visas_ttl(self) -> float:
+        """ Seconds before a receiver waiting for visa expired """
+        return 300.0
+
+    #
+    #   Visa Prefetching
+    #
+
+    def pop_waiting_visas(self) -> List[ID]:
+        """
+        Get receivers (and group members) whose visa key was missing when encrypting,
+        the application should query their documents
+
+        :return: user ID list
+        """
+        expired = time.time() - self.waiting_visas_ttl
+        waiting = [uid for uid, when in self.__waiting_visas.items() if when > expired]
+        self.__waiting_visas.clear()
+        return waiting
+
+    def _wait_for_visa(self, member: ID, now: float):
+        """ Put the receiver to the bounded waiting queue """
+        waiting = self.__waiting_visas
+        # move to the end
+        waiting.pop(member, None)
+        capacity = self.waiting_visas_capacity
+        while len(waiting) >= capacity > 0:
+            # drop the eldest one
+            waiting.pop(next(iter(waiting)), None)
+        waiting[member] = now
+
+    async def _prefetch_members(self, members: List[ID]) -> List[ID]:
+        """
+        Load user, meta & documents for all members concurrently,
+        members without encrypt key will be put into the waiting queue
+
+        :param members: receivers
+        :return: members ready for encrypting
+        """
+        semaphore = asyncio.Semaphore(self.prefetch_concurrency)
+
+        async def check(member: ID) -> bool:
+            async with semaphore:
+                return await self._check_visa_key(member=member)
+
+        results = await asyncio.gather(*[check(member=item) for item in members])
+        ready = []
+        now = time.time()
+        for member, ok in zip(members, results):
+            if ok:
+                ready.append(member)
+            else:
+                self._wait_for_visa(member=member, now=now)
+        return ready
+
+    # protected
+    def _suspend_members(self, msg: InstantMessage, members: List[ID], hidden: bool = False):
+        """
+        Suspend a copy of the group message for each member without visa key,
+        so the member will receive it (alone) when the visa arrived
+
+        :param msg:     group message (receiver is the group ID)
+        :param members: members waiting for visa
+        :param hidden:  True to keep the group ID in the content only, see option (A) in 'encrypt_message()'
+        """
+        messenger = self.messenger
+        group = msg.receiver
+        info = msg.copy_map()
+        body = msg.content.copy_map()
+        if hidden:
+            # the group ID will be removed from envelope,
+            # so let the member know it from the content
+            body['group'] = str(group)
+        else:
+            # overt group ID, see option (B) in 'encrypt_message()'
+            info['group'] = str(group)
+        for member in members:
+            item = info.copy()
+            item['receiver'] = str(member)
+            item['content'] = body.copy()
+            copy = InstantMessage.parse(msg=item)
+            if copy is not None:
+                messenger.suspended_messages.suspend(msg=copy, waiting=[member])
+
+    async def _load_members(self, group: ID) -> Optional[List[ID]]:
+        facebook = self.facebook
+        entity = await facebook.get_group(identifier=group)
+        if entity is None:
+            return await facebook.get_members(identifier=group)
+        # cached by group entity
+        return await entity.members
+
+    async def _check_visa_key(self, member: ID) -> bool:
+        """ Check whether the public key for encryption exists """
+        facebook = self.facebook
+        user = await facebook.get_user(identifier=member)
+        if user is None:
+            # meta/visa not found
+            return False
+        meta, docs = await asyncio.gather(user.meta, user.documents)
+        if meta is None:
+            return False
+        if _has_visa_key(documents=docs):
+            return True
+        # try meta key
+        return isinstance(meta.public_key, EncryptKey)
+
     #
     #   InstantMessage -> SecureMessage -> ReliableMessage -> Data
     #
 
     # Override
     async def encrypt_message(self, msg: InstantMessage) -> Optional[SecureMessage]:
-        # TODO: check receiver before calling this, make sure the visa.key exists;
-        #       otherwise, suspend this message for waiting receiver's visa/meta;
-        #       if receiver is a group, query all members' visa too!
+        # NOTICE: receivers (and group members) without visa.key will be skipped here,
+        #         call 'pop_waiting_visas()' to query their documents;
+        #         the message (or a copy for each skipped member) will be suspended
+        #         until the visa arrived (see 'MessageProcessor.resume_messages()'),
+        #         then sent by 'MessageProcessor._send_resumed_messages()', or kept for
+        #         'MessageProcessor.pop_resumed_messages()' if not overridden.
         facebook = self.facebook
         messenger = self.messenger
         assert facebook is not None and messenger is not None, 'twins not ready'
@@ -80,6 +216,7 @@ class MessagePacker(TwinsHelper, Packer):
         #           you can split it to multi-messages before encrypting,
         #           replace the 'receiver' to each member and keep the group hidden in the content;
         #           in this situation, the packer will use the personal message key (user to user);
+        #           ('split_group_message()' encrypts it with the group key instead, see its notice)
         #       (B) if the group ID is overt, no need to worry about the exposing,
         #           you can keep the 'receiver' being the group ID, or set the group ID as 'group'
         #           when splitting to multi-messages to let the remote packer knows it;
@@ -101,16 +238,33 @@ class MessagePacker(TwinsHelper, Packer):
         #
         if receiver.is_group:
             # group message
-            members = await facebook.get_members(identifier=receiver)
+            members = await self._load_members(group=receiver)
             if members is None:
                 return None
             assert len(members) > 0, f'group not ready: {receiver}'
             # a station will never send group message, so here must be a client;
             # the client messenger should check the group's meta & members before encrypting,
             # so we can trust that the group members MUST exist here.
+            ready = await self._prefetch_members(members=members)
+            if len(ready) < len(members):
+                # suspend a copy for each member without visa key
+                self._suspend_members(msg=msg, members=_exclude(members, ready))
+            if len(ready) == 0:
+                # visa keys for all members not found
+                return None
+            members = ready
             s_msg = await self.instant_packer.encrypt_message(msg=msg, password=password, members=members)
+        elif receiver.is_broadcast:
+            # broadcast message has no key
+            s_msg = await self.instant_packer.encrypt_message(msg=msg, password=password)
         else:
             # personal message (or split group message)
+            ready = await self._prefetch_members(members=[receiver])
+            if len(ready) == 0:
+                # visa key for receiver not found,
+                # suspend this message for waiting receiver's visa
+                messenger.suspended_messages.suspend(msg=msg, waiting=[receiver])
+                return None
             s_msg = await self.instant_packer.encrypt_message(msg=msg, password=password)
         if s_msg is None:
             # public key for encryption not found
@@ -127,10 +281,234 @@ class MessagePacker(TwinsHelper, Packer):
 
     # Override
     async def sign_message(self, msg: SecureMessage) -> Optional[ReliableMessage]:
-        assert len(msg.data) > 0, f'message data cannot be empty: {msg}'
+        assert not msg.data.is_empty, f'message data cannot be empty: {msg}'
         # sign 'data' by sender
         return await self.secure_packer.sign_message(msg=msg)
 
+    #
+    #   Fan-out
+    #
+
+    async def encrypt_and_sign_many(self, msg: InstantMessage) -> List[ReliableMessage]:
+        """
+        Pack a group message and split it for each member (with overt group ID),
+        the content will be encrypted with the group key and signed only once,
+        all the split messages share the same 'data' and 'signature'.
+
+        :param msg: group message (receiver is the group ID)
+        :return: network messages for each member except the sender (ready for sending),
+                 empty when no member is ready (see 'pop_waiting_visas()')
+        """
+        group = msg.receiver
+        assert group.is_group, f'group message error: {group}'
+        s_msg = await self.encrypt_message(msg=msg)
+        if s_msg is None:
+            return []
+        r_msg = await self.sign_message(msg=s_msg)
+        if r_msg is None:
+            return []
+        members = await self._load_members(group=group)
+        if members is None:
+            return []
+        # members without visa key got a suspended copy
+        members = [item for item in members if item not in self.__waiting_visas]
+        return self._split_message(msg=r_msg, group=group, members=members)
+
+    async def split_group_message(self, msg: InstantMessage, members: List[ID] = None,
+                                  executor: Executor = None) -> List[ReliableMessage]:
+        """
+        Pack a group message for each member with the group ID hidden,
+        see option (A) in 'encrypt_message()'.
+
+        The content will be serialized and encrypted with the group key only once,
+        and the message key will be encrypted for each member;
+        all the split messages share the same 'data' and 'signature'.
+
+        NOTICE: unlike option (A), the group key (sender -> group) is used here,
+                but the members will see a personal message (sender -> member),
+                so they will cache it as the personal key from this sender;
+                it's fine only when the message key is always attached
+                ('serialize_key()' never returns None for reused keys),
+                otherwise split the message and encrypt for each member instead.
+
+        :param msg:      group message (receiver is the group ID)
+        :param members:  receivers, default is all members of the group
+        :param executor: thread/process pool to encrypt message key for members,
+                         a process pool must load the crypto plugins in its initializer;
+                         the key is encrypted by the visa agent directly there (the same
+                         as 'Transformer.encrypt_key()'), so it will be ignored unless
+                         'messenger.offload_key_encryption' is turned on
+        :return: network messages for each member except the sender,
+                 empty when no member is ready (see 'pop_waiting_visas()')
+        """
+        messenger = self.messenger
+        assert messenger is not None, 'messenger not ready'
+        group = msg.receiver
+        assert group.is_group, f'group message error: {group}'
+        if members is None:
+            members = await self._load_members(group=group)
+            if members is None:
+                return []
+        sender = msg.sender
+        members = [item for item in members if item != sender]
+        ready = await self._prefetch_members(members=members)
+        if len(ready) < len(members):
+            # suspend a copy for each member without visa key
+            self._suspend_members(msg=msg, members=_exclude(members, ready), hidden=True)
+        if len(ready) == 0:
+            # visa keys for all members not found
+            return []
+        password = await messenger.get_encrypt_key(msg=msg)
+        if password is None:
+            return []
+        # the group ID will be removed from envelope,
+        # so let the members know it from the content (of a copied message)
+        if msg.content.group is None:
+            body = msg.content.copy_map()
+            body['group'] = str(group)
+            info = msg.copy_map()
+            info['content'] = body
+            msg = InstantMessage.parse(msg=info)
+        content = msg.content
+        #
+        #   1. encrypt content & message key for all members
+        #
+        packer = self.instant_packer
+        if executor is None or not messenger.offload_key_encryption:
+            # encrypt message key by 'messenger.encrypt_key()' for each member
+            s_msg = await packer.encrypt_message(msg=msg, password=password, members=ready)
+        else:
+            bundles = await self._encrypt_bundles(password=password, members=ready, msg=msg, executor=executor)
+            s_msg = await packer.encrypt_message(msg=msg, password=password, members=ready, bundles=bundles)
+        if s_msg is None:
+            return []
+        s_msg.envelope.type = content.type
+        #
+        #   2. sign once for all members
+        #
+        r_msg = await self.sign_message(msg=s_msg)
+        if r_msg is None:
+            return []
+        if r_msg.encrypted_keys is None:
+            # reused key, the members cannot find the group key without the group ID,
+            # so encrypt the message with personal key for each member instead
+            return await self._split_personal_messages(msg=msg, members=ready)
+        return self._split_message(msg=r_msg, group=None, members=ready)
+
+    async def _split_personal_messages(self, msg: InstantMessage, members: List[ID]) -> List[ReliableMessage]:
+        """ Pack a copy of the group message (group ID in content) for each member, see option (A) """
+        info = msg.copy_map()
+        info.pop('group', None)
+        messages = []
+        for member in members:
+            item = info.copy()
+            item['receiver'] = str(member)
+            copy = InstantMessage.parse(msg=item)
+            if copy is None:
+                continue
+            s_msg = await self.encrypt_message(msg=copy)
+            if s_msg is None:
+                continue
+            r_msg = await self.sign_message(msg=s_msg)
+            if r_msg is not None:
+                messages.append(r_msg)
+        return messages
+
+    # protected
+    async def _encrypt_bundles(self, password: SymmetricKey, members: List[ID], msg: InstantMessage,
+                               executor: Executor) -> BundleMap:
+        """ Encrypt message key for members in the executor, batch by batch """
+        facebook = self.facebook
+        messenger = self.messenger
+        pwd = await messenger.serialize_key(key=password, msg=msg)
+        if pwd is None:
+            # broadcast message or reused key
+            return {}
+        # threads can share the objects, but a process needs them to be pickled,
+        # and the objects (with cached public keys) cannot
+        shared = isinstance(executor, ThreadPoolExecutor)
+        # meta & documents of all members had been loaded by 'prefetch_members()'
+        tasks = []
+        for member in members:
+            docs = await facebook.get_documents(identifier=member)
+            if _has_visa_key(documents=docs):
+                # meta key is needed only when visa key not found,
+                # skip it to save the time for verifying meta in the executor
+                meta = None
+            else:
+                meta = await facebook.get_meta(identifier=member)
+            if not shared:
+                meta = None if meta is None else meta.to_map()
+                docs = [doc.to_map() for doc in docs]
+            tasks.append((str(member), meta, docs))
+        loop = asyncio.get_running_loop()
+        size = self.split_batch_size
+        futures = [loop.run_in_executor(executor, _encrypt_bundles, pwd, tasks[start:start + size])
+                   for start in range(0, len(tasks), size)]
+        metrics = messenger.metrics
+        bundles: BundleMap = {}
+        for results in await asyncio.gather(*futures):
+            for member, dictionary, elapsed in results:
+                if metrics is not None:
+                    # same stage as 'messenger.encrypt_key()'
+                    metrics.record(stage='encrypt_key', elapsed=elapsed, success=len(dictionary) > 0)
+                bundles[ID.parse(identifier=member)] = EncryptedBundle.create(dictionary=dictionary)
+        return bundles
+
+    # protected
+    def _split_message(self, msg: ReliableMessage, group: Optional[ID], members: List[ID]) -> List[ReliableMessage]:
+        """
+        Split group message with 'keys' for each member, group ID will be hidden if it's None
+
+        :param msg:     group message signed
+        :param group:   overt group ID, None for hidden
+        :param members: receivers, used when no 'keys' attached (reused key)
+        :return: network messages for each member except the sender
+        """
+        # group the encoded keys by member: 'ID' or 'ID/terminal',
+        # other fields (e.g.: 'digest') will be kept for all members
+        table: Dict[str, Dict[str, str]] = {}
+        shared: Dict[str, str] = {}
+        msg_keys = msg.encrypted_keys
+        if msg_keys is None:
+            # reused key, the members should have it already
+            if group is None:
+                # cannot find the group key without group ID
+                return []
+            for item in members:
+                table[str(item)] = {}
+            msg_keys = {}
+        for target, value in msg_keys.items():
+            member = target.split('/', 1)[0]
+            identifier = ID.parse(identifier=member)
+            if identifier is None or not identifier.is_user:
+                shared[target] = value
+                continue
+            keys = table.get(member)
+            if keys is None:
+                keys = {}
+                table[member] = keys
+            keys[target] = value
+        # no need to send to myself
+        table.pop(str(msg.sender), None)
+        info = msg.copy_map()
+        if group is None:
+            # hidden group
+            info.pop('group', None)
+        else:
+            info['group'] = str(group)
+        messages = []
+        for member, keys in table.items():
+            keys.update(shared)
+            item = info.copy()
+            item['receiver'] = member
+            if len(keys) > 0:
+                item['keys'] = keys
+            r_msg = ReliableMessage.parse(msg=item)
+            if r_msg is not None:
+                messages.append(r_msg)
+        return messages
+
     # # Override
     # async def serialize_message(self, msg: ReliableMessage) -> bytes:
     #     compressor = self.compressor
@@ -169,3 +547,38 @@ class MessagePacker(TwinsHelper, Packer):
         return await self.secure_packer.decrypt_message(msg=msg, receiver=me)
         # TODO: check top-secret message
         #       (do it by application)
+
+
+def _exclude(members: List[ID], ready: List[ID]) -> List[ID]:
+    ready = set(ready)
+    return [item for item in members if item not in ready]
+
+
+def _has_visa_key(documents: List[Document]) -> bool:
+    """ Check encrypt key in documents, same as 'VisaAgent.encrypt_bundle()' """
+    agent = visa_agent()
+    for doc in documents:
+        if isinstance(agent.get_encrypt_key(document=doc), EncryptKey):
+            return True
+    return False
+
+
+def _encrypt_bundles(plaintext: bytes,
+                     tasks: List[Tuple[str, Any, List[Any]]]) -> List[Tuple[str, BytesMap, float]]:
+    """
+    Encrypt message key for members (running in executor)
+
+    :param plaintext: serialized message key
+    :param tasks:     member ID, meta (None when visa key exists) & documents,
+                      objects in a thread, or maps in a process
+    :return: member ID with terminal-specific encrypted data, and seconds spent
+    """
+    agent = visa_agent()
+    results = []
+    for member, meta, documents in tasks:
+        start = time.perf_counter()
+        meta = None if meta is None else Meta.parse(meta=meta)
+        docs = [Document.parse(document=info) for info in documents]
+        bundle = agent.encrypt_bundle(plaintext=plaintext, meta=meta, documents=[doc for doc in docs if doc is not None])
+        results.append((member, bundle.to_map(), time.perf_counter() - start))
+    return results
@@ -29,14 +29,21 @@
 # ==============================================================================
 
 from abc import ABC, abstractmethod
-from typing import List
+from collections import deque
+from typing import Optional, List, Deque, AsyncIterator
 
+from dimp import utf8_encode
 from dimp import ContentType
+from dimp import ID
 from dimp import Content, Envelope
+from dimp import MetaCommand, DocumentCommand, GroupCommand
 from dimp import InstantMessage, SecureMessage, ReliableMessage
 
 from ..dkd import ContentProcessorFactory
+from ..dkd import ContentScheduler
 from ..core import Processor
+from ..core import SenderRateLimiter
+from ..core import RotatingBloomFilter
 
 from .facebook import Facebook
 from .messenger import Messenger
@@ -45,9 +52,68 @@ from .twins import TwinsHelper
 
 class MessageProcessor(TwinsHelper, Processor, ABC):
 
-    def __init__(self, facebook: Facebook, messenger: Messenger):
+    def __init__(self, facebook: Facebook, messenger: Messenger, routing: bool = False,
+                 scheduler: Optional[ContentScheduler] = None, rate_limiter: Optional[SenderRateLimiter] = None,
+                 duplicate_filter: Optional[RotatingBloomFilter] = None):
         super().__init__(facebook=facebook, messenger=messenger)
         self.__factory = self._create_factory(facebook=facebook, messenger=messenger)
+        self.__routing = routing
+        self.__scheduler = scheduler
+        self.__rate_limiter = rate_limiter
+        self.__duplicate_filter = duplicate_filter
+        # resumed messages not sent yet
+        self.__outbox: Deque[ReliableMessage] = deque(maxlen=self.outbox_capacity)
+
+    @property
+    def routing(self) -> bool:
+        """
+        Check receiver from envelope before verifying/decrypting the package,
+        packages for other receivers are passed to '_forward_package()'
+        """
+        return self.__routing
+
+    @routing.setter
+    def routing(self, enabled: bool):
+        self.__routing = enabled
+
+    @property
+    def scheduler(self) -> Optional[ContentScheduler]:
+        """ Priority scheduler before dispatching contents to CPUs, None for no queuing """
+        return self.__scheduler
+
+    @scheduler.setter
+    def scheduler(self, queue: Optional[ContentScheduler]):
+        self.__scheduler = queue
+
+    @property
+    def rate_limiter(self) -> Optional[SenderRateLimiter]:
+        """ Admission control for senders (with envelope of the package) before parsing messages, None for no limit """
+        return self.__rate_limiter
+
+    @rate_limiter.setter
+    def rate_limiter(self, limiter: Optional[SenderRateLimiter]):
+        self.__rate_limiter = limiter
+
+    @property
+    def duplicate_filter(self) -> Optional[RotatingBloomFilter]:
+        """ Suppress messages received again before verifying, None for no checking """
+        return self.__duplicate_filter
+
+    @duplicate_filter.setter
+    def duplicate_filter(self, bloom: Optional[RotatingBloomFilter]):
+        self.__duplicate_filter = bloom
+
+    # noinspection PyMethodMayBeStatic
+    def _get_fingerprint(self, msg: ReliableMessage) -> bytes:
+        """
+        Key for checking duplicated message: sender, receiver, group, time & signature
+
+        (copies split for group members share the same signature,
+        so the receiver & group are needed to tell them apart)
+        """
+        text = '%s|%s|%s|%s|%s' % (msg.get('sender'), msg.get('receiver'), msg.get('group'),
+                                   msg.get('time'), msg.get('signature'))
+        return utf8_encode(string=text)
 
     @property  # private
     def factory(self) -> ContentProcessorFactory:
@@ -67,56 +133,157 @@ class MessageProcessor(TwinsHelper, Processor, ABC):
 
     # Override
     async def process_package(self, data: bytes) -> List[bytes]:
+        # one pipeline for both entries, see 'iter_process_package()'
+        return [pack async for pack in self.iter_process_package(data=data)]
+
+    # Override
+    async def iter_process_package(self, data: bytes) -> AsyncIterator[bytes]:
+        """
+        Process data package, yield the serialized responses one by one
+
+        NOTICE: each response goes through the whole pipeline
+                (content -> instant -> secure -> reliable -> data) before the next
+                one is created, override the 'iter_process_*()' methods to customize
+                both entries, the 'process_*()' methods just collect their results.
+        """
         transceiver = self.messenger
         assert transceiver is not None, 'messenger not ready'
+        # 0. check receiver & sender's rate before parsing the whole message
+        if self.routing or self.rate_limiter is not None:
+            env = await transceiver.deserialize_envelope(data=data)
+            if env is None:
+                # no valid message received
+                return
+            forwarded = await self._route_package(data=data, envelope=env)
+            if forwarded is not None:
+                for pack in forwarded:
+                    yield pack
+                return
+            elif not self._admit_package(envelope=env):
+                # too many messages from this sender, drop it
+                return
         # 1. deserialize message
         msg = await transceiver.deserialize_message(data=data)
         if msg is None:
             # no valid message received
-            return []
+            return
         # 2. process message
-        responses = await transceiver.process_reliable_message(msg=msg)
-        if len(responses) == 0:
-            # nothing to respond
-            return []
-        # 3. serialize messages
-        packages = []
-        for res in responses:
+        async for res in transceiver.iter_process_reliable_message(msg=msg):
+            # 3. serialize message
             pack = await transceiver.serialize_message(msg=res)
             if pack is None:
                 # should not happen
                 continue
-            packages.append(pack)
-        return packages
+            yield pack
+
+    # protected
+    async def _route_package(self, data: bytes, envelope: Envelope) -> Optional[List[bytes]]:
+        """
+        Check receiver before any crypto (routing mode only)
+
+        :param data:     data package
+        :param envelope: message envelope
+        :return: None for local user, otherwise responses after forwarding
+        """
+        if not self.routing:
+            return None
+        user = await self.select_local_user(receiver=envelope.receiver)
+        if user is None:
+            # not for me, deliver the package without touching it
+            return await self._forward_package(data=data, envelope=envelope)
+
+    # protected
+    def _admit_package(self, envelope: Envelope) -> bool:
+        """
+        Check sender's rate before parsing the whole message
+
+        :param envelope: message envelope
+        :return: False on too many messages from this sender
+        """
+        limiter = self.rate_limiter
+        return limiter is None or limiter.admit(sender=envelope.sender)
+
+    # protected
+    async def _forward_package(self, data: bytes, envelope: Envelope) -> List[bytes]:
+        """
+        Deliver the package to other receiver (routing mode only),
+        subclass must override it before turning on the routing mode
+
+        :param data:     original data package
+        :param envelope: message envelope
+        :return: response packages
+        """
+        raise NotImplementedError(
+            f'Not implemented: {type(self).__module__}.{type(self).__name__}._forward_package(),'
+            f' cannot deliver package to {envelope.receiver}'
+        )
 
     # Override
     async def process_reliable_message(self, msg: ReliableMessage) -> List[ReliableMessage]:
+        return [res async for res in self.iter_process_reliable_message(msg=msg)]
+
+    # Override
+    async def iter_process_reliable_message(self, msg: ReliableMessage) -> AsyncIterator[ReliableMessage]:
         # TODO: override to check broadcast message before calling it
         transceiver = self.messenger
         assert transceiver is not None, 'messenger not ready'
         # 1. verify message
-        s_msg = await transceiver.verify_message(msg=msg)
+        s_msg = await self._verify_reliable_message(msg=msg)
         if s_msg is None:
-            # TODO: suspend and waiting for sender's meta if not exists
-            return []
+            return
         # 2. process message
-        responses = await transceiver.process_secure_message(msg=s_msg, r_msg=msg)
-        if len(responses) == 0:
-            # nothing to respond
-            return []
-        # 3. sign message
-        messages = []
-        for res in responses:
+        async for res in transceiver.iter_process_secure_message(msg=s_msg, r_msg=msg):
+            # 3. sign message
             signed = await transceiver.sign_message(msg=res)
             if signed is None:
                 # should not happen
                 continue
-            messages.append(signed)
-        return messages
+            yield signed
         # TODO: override to deliver to the receiver when catch exception "receiver error ..."
 
+    # protected
+    async def _verify_reliable_message(self, msg: ReliableMessage) -> Optional[SecureMessage]:
+        """
+        Check duplicated message & sender's meta, then verify it
+
+        :param msg: network message
+        :return: None on message dropped, suspended or signature not match
+        """
+        facebook = self.facebook
+        transceiver = self.messenger
+        assert facebook is not None and transceiver is not None, 'twins not ready'
+        sender = msg.sender
+        # 0. check duplicated message & sender's meta
+        #    (sender's rate had been checked with the envelope of the package)
+        bloom = self.duplicate_filter
+        if bloom is None:
+            fingerprint = None
+        else:
+            fingerprint = self._get_fingerprint(msg=msg)
+            if bloom.contains(key=fingerprint):
+                # received before
+                return None
+        if msg.get('meta') is None and await facebook.get_meta(identifier=sender) is None:
+            # suspend and waiting for sender's meta
+            transceiver.suspended_messages.suspend(msg=msg, waiting=[sender])
+            return None
+        # 1. verify message
+        s_msg = await transceiver.verify_message(msg=msg)
+        if s_msg is None:
+            # signature not match
+            return None
+        elif fingerprint is not None:
+            # remember verified message only, so forged copies cannot block the real one
+            bloom.add(key=fingerprint)
+        return s_msg
+
     # Override
     async def process_secure_message(self, msg: SecureMessage, r_msg: ReliableMessage) -> List[SecureMessage]:
+        return [res async for res in self.iter_process_secure_message(msg=msg, r_msg=r_msg)]
+
+    # Override
+    async def iter_process_secure_message(self, msg: SecureMessage,
+                                          r_msg: ReliableMessage) -> AsyncIterator[SecureMessage]:
         transceiver = self.messenger
         assert transceiver is not None, 'messenger not ready'
         # 1. decrypt message
@@ -124,51 +291,116 @@ class MessageProcessor(TwinsHelper, Processor, ABC):
         if i_msg is None:
             # cannot decrypt this message, not for you?
             # delivering message to other receiver?
-            return []
+            return
         # 2. process message
-        responses = await transceiver.process_instant_message(msg=i_msg, r_msg=r_msg)
-        if len(responses) == 0:
-            # nothing to respond
-            return []
-        # 3. encrypt messages
-        messages = []
-        for res in responses:
+        async for res in transceiver.iter_process_instant_message(msg=i_msg, r_msg=r_msg):
+            # 3. encrypt message
             encrypted = await transceiver.encrypt_message(msg=res)
             if encrypted is None:
                 # should not happen
                 continue
-            messages.append(encrypted)
-        return messages
+            yield encrypted
 
     # Override
     async def process_instant_message(self, msg: InstantMessage, r_msg: ReliableMessage) -> List[InstantMessage]:
-        facebook = self.facebook
+        return [res async for res in self.iter_process_instant_message(msg=msg, r_msg=r_msg)]
+
+    # Override
+    async def iter_process_instant_message(self, msg: InstantMessage,
+                                           r_msg: ReliableMessage) -> AsyncIterator[InstantMessage]:
         transceiver = self.messenger
-        assert facebook is not None and transceiver is not None, 'twins not ready'
-        # 1. process content from sender
-        responses = await transceiver.process_content(content=msg.content, r_msg=r_msg)
-        if len(responses) == 0:
-            # nothing to respond
-            return []
-        # 2. select a local user to build message
+        assert transceiver is not None, 'messenger not ready'
         sender = msg.sender
         receiver = msg.receiver
-        user = await self.select_local_user(receiver=receiver)
-        if user is None:
-            # assert False, f'receiver error: {receiver}'
-            return []
-        else:
-            me = user.identifier
-        # 3. package messages
-        messages = []
-        for res in responses:
+        me = None
+        # 1. process content from sender
+        async for res in transceiver.iter_process_content(content=msg.content, r_msg=r_msg):
             assert res is not None, 'should not happen'
+            # 2. select a local user to build message
+            if me is None:
+                user = await self.select_local_user(receiver=receiver)
+                if user is None:
+                    # assert False, f'receiver error: {receiver}'
+                    # still let the contents be processed
+                    continue
+                me = user.identifier
+            # 3. package message
             env = Envelope.create(sender=me, receiver=sender)
-            msg = InstantMessage.create(head=env, body=res)
-            # assert msg is not None, 'should not happen'
-            messages.append(msg)
+            yield InstantMessage.create(head=env, body=res)
+
+    #
+    #   Suspended Messages
+    #
+
+    async def resume_messages(self, identifier: ID) -> List[ReliableMessage]:
+        """
+        Re-drive the messages waiting for meta/visa of this entity,
+        call it when the meta/documents saved by other ways
+
+        :param identifier: entity ID
+        :return: outgoing messages (resumed messages & responses) to be sent
+        """
+        transceiver = self.messenger
+        assert transceiver is not None, 'messenger not ready'
+        messages = transceiver.suspended_messages.resume(identifier=identifier)
+        if len(messages) == 0:
+            return []
+        archivist = self.facebook.archivist
+        if archivist is not None:
+            # the meta/documents may be still in the buffer (write-behind),
+            # write them to the storage, so the facebook can load them
+            try:
+                await archivist.flush()
+            except Exception:
+                # storage error, keep the messages waiting for next time
+                for msg in messages:
+                    transceiver.suspended_messages.suspend(msg=msg, waiting=[identifier])
+                raise
+        results = []
+        for msg in messages:
+            if isinstance(msg, ReliableMessage):
+                # received message waiting for sender's meta
+                responses = await transceiver.process_reliable_message(msg=msg)
+                results.extend(responses)
+            elif isinstance(msg, InstantMessage):
+                # outgoing message waiting for receiver's visa
+                s_msg = await transceiver.encrypt_message(msg=msg)
+                if s_msg is None:
+                    # suspended again
+                    continue
+                r_msg = await transceiver.sign_message(msg=s_msg)
+                if r_msg is not None:
+                    results.append(r_msg)
+        return results
+
+    @property  # protected
+    def outbox_capacity(self) -> int:
+        """ Max count of resumed messages kept for 'pop_resumed_messages()' """
+        return 1024
+
+    def pop_resumed_messages(self) -> List[ReliableMessage]:
+        """
+        Get & clear the messages resumed after processing meta/document command,
+        the outgoing ones had been returned as None by 'encrypt_message()',
+        so the application should send them (if '_send_resumed_messages()' not overridden)
+
+        :return: resumed messages & responses (encrypted & signed)
+        """
+        messages = list(self.__outbox)
+        self.__outbox.clear()
         return messages
 
+    # protected
+    async def _send_resumed_messages(self, messages: List[ReliableMessage]):
+        """
+        Deliver messages resumed after processing meta/document command,
+        override it to send them directly; by default they are kept in a bounded
+        outbox (the eldest ones will be dropped when full) for 'pop_resumed_messages()'
+
+        :param messages: resumed messages & responses (encrypted & signed)
+        """
+        self.__outbox.extend(messages)
+
     # Override
     async def process_content(self, content: Content, r_msg: ReliableMessage) -> List[Content]:
         factory = self.factory
@@ -178,5 +410,39 @@ class MessageProcessor(TwinsHelper, Processor, ABC):
             # default content processor
             cpu = factory.get_content_processor_for_type(ContentType.ANY)
             assert cpu is not None, 'default CPU not defined'
-        return await cpu.process_content(content=content, r_msg=r_msg)
+        # call the CPU via factory, so it can be profiled
+        coro = factory.measure(cpu=cpu, content=content, r_msg=r_msg)
+        scheduler = self.scheduler
+        if scheduler is None:
+            responses = await coro
+        else:
+            responses = await scheduler.run(content=content, coro=coro)
+        if isinstance(content, GroupCommand):
+            # group membership may be changed by this command,
+            # clear the cached members of the group entity
+            group = content.group
+            if group is not None:
+                self.facebook.invalidate_group(identifier=group)
+        elif isinstance(content, MetaCommand):
+            # meta/documents may be saved by this command,
+            # re-drive the messages waiting for them
+            if content.meta is not None or (isinstance(content, DocumentCommand) and content.documents):
+                identifier = content.identifier
+                if identifier is not None and identifier.is_group:
+                    # owner/members may be changed by the group bulletin
+                    self.facebook.invalidate_group(identifier=identifier)
+                messages = await self.resume_messages(identifier=identifier)
+                if len(messages) > 0:
+                    await self._send_resumed_messages(messages=messages)
+        return responses
         # TODO: override to filter the response
+
+    # Override
+    async def iter_process_content(self, content: Content, r_msg: ReliableMessage) -> AsyncIterator[Content]:
+        """ Responses from CPU come as a whole, override it to yield them one by one """
+        transceiver = self.messenger
+        assert transceiver is not None, 'messenger not ready'
+        # measured by the messenger
+        responses = await transceiver.process_content(content=content, r_msg=r_msg)
+        for res in responses:
+            yield res
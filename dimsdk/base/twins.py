@@ -33,7 +33,7 @@ from typing import Optional
 
 from dimp import ID
 
-from ..mkm import User
+from ..mkm import User, BaseGroup
 
 from .facebook import Facebook
 from .messenger import Messenger
@@ -72,14 +72,34 @@ class TwinsHelper:
             # check local users
             me = await facebook.select_user(receiver=receiver)
         elif receiver.is_group:
-            members = await facebook.get_members(identifier=receiver)
-            if members is None or len(members) == 0:
-                # assert False, f'failed to get group members: {receiver}'
-                return None
-            me = await facebook.select_member(members=members)
+            group = await facebook.get_group(identifier=receiver)
+            if isinstance(group, BaseGroup):
+                # check local users with the member set cached by group entity
+                me = await _select_member(facebook=facebook, group=group)
+            else:
+                if group is None:
+                    members = await facebook.get_members(identifier=receiver)
+                else:
+                    members = await group.members
+                if members is None or len(members) == 0:
+                    # assert False, f'failed to get group members: {receiver}'
+                    return None
+                me = await facebook.select_member(members=members)
         else:
             assert False, f'unknown receiver: {receiver}'
         if me is None:
             # not for me?
             return None
         return await facebook.get_user(identifier=me)
+
+
+async def _select_member(facebook: Facebook, group: BaseGroup) -> Optional[ID]:
+    """ Select local user which is a member of the group """
+    archivist = facebook.archivist
+    assert archivist is not None, 'archivist not ready'
+    all_users = await archivist.get_local_users()
+    if all_users is None:
+        return None
+    for item in all_users:
+        if await group.has_member(identifier=item):
+            return item
@@ -30,6 +30,7 @@
 
 from .barrack import Archivist
 from .barrack import Barrack
+from .archivist import BufferedArchivist
 
 from .compress_keys import Shortener, MessageShortener
 from .compressor import Compressor, MessageCompressor
@@ -40,6 +41,11 @@ from .transformer import Transformer
 
 from .delegate import CipherKeyDelegate
 
+from .metrics import MetricsSink, LatencyHistogram, HistogramSink, PipelineMetrics
+from .suspend import SuspendedMessageQueue
+from .admission import SenderRateLimiter
+from .dedup import RotatingBloomFilter
+
 
 __all__ = [
 
@@ -49,6 +55,7 @@ __all__ = [
 
     'Archivist',
     'Barrack',
+    'BufferedArchivist',
 
     'Shortener', 'MessageShortener',
     'Compressor', 'MessageCompressor',
@@ -59,4 +66,9 @@ __all__ = [
 
     'CipherKeyDelegate',
 
+    'MetricsSink', 'LatencyHistogram', 'HistogramSink', 'PipelineMetrics',
+    'SuspendedMessageQueue',
+    'SenderRateLimiter',
+    'RotatingBloomFilter',
+
 ]
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+#
+#   DIM-SDK : Decentralized Instant Messaging Software Development Kit
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+"""
+    Admission Control
+    ~~~~~~~~~~~~~~~~~
+
+    Per-sender rate limiting before verifying messages
+"""
+
+import time
+from array import array
+from typing import Dict
+
+
+class SenderRateLimiter:
+    """
+        Sender Rate Limiter
+        ~~~~~~~~~~~~~~~~~~~
+
+        Approximate token buckets in fixed memory: each sender is hashed to
+        one bucket in every row, a message is admitted when any of these
+        buckets still has a token (so a sender is throttled only when all its
+        buckets are shared with heavy senders), then every bucket pays for it.
+
+        Memory: rows * width * 16 bytes, whatever the count of senders.
+    """
+
+    def __init__(self, rate: float = 10.0, burst: float = 50.0, width: int = 65536, rows: int = 2):
+        """
+        Create rate limiter
+
+        :param rate:  tokens refilled per second for each bucket
+        :param burst: max tokens in a bucket
+        :param width: buckets in each row
+        :param rows:  rows of buckets (hash functions)
+        """
+        super().__init__()
+        assert rate > 0 and burst >= 1 and width > 0 and rows > 0, f'params error: {rate}, {burst}, {width}, {rows}'
+        self.__rate = rate
+        self.__burst = burst
+        self.__width = width
+        self.__rows = rows
+        size = width * rows
+        self.__tokens = array('d', [burst]) * size
+        self.__updated = array('d', [0.0]) * size
+        self.__admitted = 0
+        self.__rejected = 0
+
+    @property
+    def rate(self) -> float:
+        return self.__rate
+
+    @property
+    def burst(self) -> float:
+        return self.__burst
+
+    def admit(self, sender: str, cost: float = 1.0, now: float = None) -> bool:
+        """
+        Check whether this sender can be served now
+
+        :param sender: sender ID (string)
+        :param cost:   tokens to be paid
+        :param now:    current time
+        :return: False on too many messages from this sender
+        """
+        if now is None:
+            now = time.monotonic()
+        tokens = self.__tokens
+        updated = self.__updated
+        rate = self.__rate
+        burst = self.__burst
+        width = self.__width
+        key = str(sender)
+        slots = [row * width + hash((row, key)) % width for row in range(self.__rows)]
+        allowed = False
+        for pos in slots:
+            # refill
+            amount = tokens[pos] + (now - updated[pos]) * rate
+            if amount > burst:
+                amount = burst
+            tokens[pos] = amount
+            updated[pos] = now
+            if amount >= cost:
+                allowed = True
+        if not allowed:
+            self.__rejected += 1
+            return False
+        for pos in slots:
+            amount = tokens[pos] - cost
+            tokens[pos] = amount if amount > 0.0 else 0.0
+        self.__admitted += 1
+        return True
+
+    def get_metrics(self) -> Dict[str, int]:
+        return {
+            'admitted': self.__admitted,
+            'rejected': self.__rejected,
+        }
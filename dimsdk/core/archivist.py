@@ -0,0 +1,342 @@
+# -*- coding: utf-8 -*-
+#
+#   DIM-SDK : Decentralized Instant Messaging Software Development Kit
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+"""
+    Write-behind Archivist
+    ~~~~~~~~~~~~~~~~~~~~~~
+
+    Acknowledge saving immediately, flush to the storage in batches
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Optional, Union, List, Dict, Tuple, Deque
+
+from dimp import ID, Meta, Document
+
+from .barrack import Archivist
+
+
+class BufferedArchivist(Archivist):
+    """
+        Buffered Archivist
+        ~~~~~~~~~~~~~~~~~~
+
+        Decorator for an archivist, metas & documents saved by it will be kept
+        in a bounded memory buffer and written to the inner archivist by a
+        background task (with the batch saving interfaces).
+
+        NOTICE: saving returns True once the item is buffered, so the inner
+                archivist can no longer reject a document by returning False;
+                the facebook should check 'peek_meta()' & 'peek_documents()' of
+                this buffer before loading from the storage (read your writes),
+                or call 'flush()' first, as 'MessageProcessor.resume_messages()' does;
+                items rejected by the inner archivist can be got by 'pop_rejected()',
+                and the last error of the background flusher by 'last_error'.
+    """
+
+    def __init__(self, archivist: Archivist, capacity: int = 1024, batch_size: int = 128, interval: float = 1.0):
+        """
+        Create buffered archivist
+
+        :param archivist:  inner archivist (storage)
+        :param capacity:   max count of pending items, saving will wait for flushing when full
+        :param batch_size: wake up the flusher when pending items reach this count
+        :param interval:   seconds between two flushing
+        """
+        super().__init__()
+        self.__archivist = archivist
+        self.__capacity = capacity
+        self.__batch_size = batch_size
+        self.__interval = interval
+        # pending items
+        self.__metas: Dict[ID, Meta] = {}
+        self.__documents: Dict[ID, Dict[str, Document]] = {}
+        # items being written
+        self.__flushing_metas: Dict[ID, Meta] = {}
+        self.__flushing_documents: Dict[ID, Dict[str, Document]] = {}
+        self.__depth = 0
+        # items rejected by the inner archivist
+        self.__rejected: Deque[Tuple[ID, Union[Meta, Document]]] = deque(maxlen=capacity)
+        self.__last_error: Optional[Exception] = None
+        # flusher
+        self.__lock = asyncio.Lock()
+        self.__wakeup: Optional[asyncio.Event] = None
+        self.__task: Optional[asyncio.Task] = None
+        self.__closed = False
+        # metrics
+        self.__max_depth = 0
+        self.__flush_count = 0
+        self.__flush_errors = 0
+        self.__flushed_items = 0
+        self.__rejected_items = 0
+        self.__last_latency = 0.0
+        self.__max_latency = 0.0
+        self.__total_latency = 0.0
+
+    @property
+    def archivist(self) -> Archivist:
+        """ Inner archivist """
+        return self.__archivist
+
+    @property
+    def buffer_depth(self) -> int:
+        """ Count of pending items """
+        return self.__depth
+
+    def get_metrics(self) -> Dict[str, float]:
+        """ Snapshot for buffer depth & flush latency (seconds) """
+        count = self.__flush_count
+        return {
+            'buffer_depth': self.__depth,
+            'max_buffer_depth': self.__max_depth,
+            'flush_count': count,
+            'flush_errors': self.__flush_errors,
+            'flushed_items': self.__flushed_items,
+            'rejected_items': self.__rejected_items,
+            'last_flush_latency': self.__last_latency,
+            'max_flush_latency': self.__max_latency,
+            'avg_flush_latency': 0.0 if count == 0 else self.__total_latency / count,
+        }
+
+    @property
+    def last_error(self) -> Optional[Exception]:
+        """ Last error raised by the inner archivist when flushing """
+        return self.__last_error
+
+    def pop_rejected(self) -> List[Tuple[ID, Union[Meta, Document]]]:
+        """ Get & clear the items which the inner archivist returned False for saving """
+        items = list(self.__rejected)
+        self.__rejected.clear()
+        return items
+
+    #
+    #   Read your writes
+    #
+
+    def peek_meta(self, identifier: ID) -> Optional[Meta]:
+        """ Get meta not flushed yet """
+        meta = self.__metas.get(identifier)
+        if meta is None:
+            meta = self.__flushing_metas.get(identifier)
+        return meta
+
+    def peek_documents(self, identifier: ID) -> List[Document]:
+        """ Get documents not flushed yet """
+        documents = []
+        table = self.__flushing_documents.get(identifier)
+        if table is not None:
+            documents.extend(table.values())
+        table = self.__documents.get(identifier)
+        if table is not None:
+            for doc in table.values():
+                if doc not in documents:
+                    documents.append(doc)
+        return documents
+
+    #
+    #   Archivist
+    #
+
+    # Override
+    async def save_meta(self, meta: Meta, identifier: ID) -> bool:
+        if self.__metas.get(identifier) is None:
+            self.__depth += 1
+        self.__metas[identifier] = meta
+        await self._buffered()
+        return True
+
+    # Override
+    async def save_document(self, document: Document, identifier: ID) -> bool:
+        table = self.__documents.get(identifier)
+        if table is None:
+            table = {}
+            self.__documents[identifier] = table
+        # the same document has the same signature
+        key = _document_key(document=document)
+        if table.get(key) is None:
+            self.__depth += 1
+        table[key] = document
+        await self._buffered()
+        return True
+
+    # Override
+    async def save_metas(self, metas: List[Meta], identifiers: List[ID]) -> List[bool]:
+        return [await self.save_meta(meta=meta, identifier=did) for meta, did in zip(metas, identifiers)]
+
+    # Override
+    async def save_documents(self, documents: List[Document], identifiers: List[ID]) -> List[bool]:
+        return [await self.save_document(document=doc, identifier=did) for doc, did in zip(documents, identifiers)]
+
+    # Override
+    async def get_local_users(self) -> List[ID]:
+        return await self.__archivist.get_local_users()
+
+    #
+    #   Flushing
+    #
+
+    # protected
+    async def _buffered(self):
+        """ Called after an item buffered """
+        depth = self.__depth
+        if depth > self.__max_depth:
+            self.__max_depth = depth
+        if depth >= self.__capacity:
+            # buffer full, wait for flushing
+            await self.flush()
+            return
+        self._start_flusher()
+        if depth >= self.__batch_size:
+            self.__wakeup.set()
+
+    # protected
+    def _start_flusher(self):
+        if self.__task is None and not self.__closed:
+            self.__wakeup = asyncio.Event()
+            self.__task = asyncio.get_running_loop().create_task(self._run())
+
+    # protected
+    async def _run(self):
+        """ Background flusher """
+        wakeup = self.__wakeup
+        while not self.__closed:
+            try:
+                await asyncio.wait_for(wakeup.wait(), timeout=self.__interval)
+            except asyncio.TimeoutError:
+                pass
+            wakeup.clear()
+            try:
+                await self.flush()
+            except Exception:
+                # error kept in 'last_error', items will be retried next round
+                pass
+
+    async def flush(self) -> int:
+        """
+        Write all pending items to the inner archivist
+
+        :return: count of items flushed
+        """
+        async with self.__lock:
+            metas = self.__metas
+            documents = self.__documents
+            if len(metas) == 0 and len(documents) == 0:
+                return 0
+            self.__metas = {}
+            self.__documents = {}
+            self.__flushing_metas = metas
+            self.__flushing_documents = documents
+            count = self.__depth
+            self.__depth = 0
+            start = time.perf_counter()
+            try:
+                rejected = await self._write(metas=metas, documents=documents)
+            except Exception as error:
+                self.__flush_errors += 1
+                self.__last_error = error
+                self._restore(metas=metas, documents=documents)
+                raise
+            finally:
+                self.__flushing_metas = {}
+                self.__flushing_documents = {}
+            latency = time.perf_counter() - start
+            # update metrics
+            self.__flush_count += 1
+            self.__flushed_items += count
+            if len(rejected) > 0:
+                self.__rejected_items += len(rejected)
+                self.__rejected.extend(rejected)
+            self.__last_latency = latency
+            self.__total_latency += latency
+            if latency > self.__max_latency:
+                self.__max_latency = latency
+            return count
+
+    # protected
+    async def _write(self, metas: Dict[ID, Meta],
+                     documents: Dict[ID, Dict[str, Document]]) -> List[Tuple[ID, Union[Meta, Document]]]:
+        """ Write items to the inner archivist, return the rejected ones """
+        archivist = self.__archivist
+        rejected = []
+        if len(metas) > 0:
+            identifiers = list(metas.keys())
+            results = await archivist.save_metas(metas=list(metas.values()), identifiers=identifiers)
+            for did, ok in zip(identifiers, results):
+                if not ok:
+                    rejected.append((did, metas[did]))
+        if len(documents) > 0:
+            docs = []
+            identifiers = []
+            for did, table in documents.items():
+                for doc in table.values():
+                    docs.append(doc)
+                    identifiers.append(did)
+            results = await archivist.save_documents(documents=docs, identifiers=identifiers)
+            for did, doc, ok in zip(identifiers, docs, results):
+                if not ok:
+                    rejected.append((did, doc))
+        return rejected
+
+    # protected
+    def _restore(self, metas: Dict[ID, Meta], documents: Dict[ID, Dict[str, Document]]):
+        """ Put items back to the buffer when flushing failed """
+        for did, meta in metas.items():
+            if self.__metas.get(did) is None:
+                self.__metas[did] = meta
+                self.__depth += 1
+        for did, table in documents.items():
+            pending = self.__documents.get(did)
+            if pending is None:
+                pending = {}
+                self.__documents[did] = pending
+            for key, doc in table.items():
+                if pending.get(key) is None:
+                    pending[key] = doc
+                    self.__depth += 1
+
+    async def close(self):
+        """ Stop the flusher and write all pending items """
+        self.__closed = True
+        task = self.__task
+        if task is not None:
+            self.__task = None
+            self.__wakeup.set()
+            await task
+        await self.flush()
+
+
+def _document_key(document: Document) -> str:
+    signature = document.get_str(key='signature')
+    if signature is None:
+        # not signed?
+        signature = str(id(document))
+    return signature
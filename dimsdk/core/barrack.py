@@ -128,6 +128,51 @@ class Archivist(ABC):
             f'Not implemented: {type(self).__module__}.{type(self).__name__}.save_document()'
         )
 
+    #
+    #   Batch Saving
+    #
+
+    async def save_metas(self, metas: List[Meta], identifiers: List[ID]) -> List[bool]:
+        """
+        Save metas for entity IDs (must verify first)
+        override it for storage supports bulk writing
+
+        :param metas:       entity metas
+        :param identifiers: entity IDs
+        :return: results for each meta
+        """
+        assert len(metas) == len(identifiers), f'metas not match IDs: {len(metas)}, {len(identifiers)}'
+        results = []
+        for meta, did in zip(metas, identifiers):
+            ok = await self.save_meta(meta=meta, identifier=did)
+            results.append(ok)
+        return results
+
+    async def save_documents(self, documents: List[Document], identifiers: List[ID]) -> List[bool]:
+        """
+        Save entity documents with IDs (must verify first)
+        override it for storage supports bulk writing
+
+        :param documents:   entity documents
+        :param identifiers: entity IDs
+        :return: results for each document
+        """
+        assert len(documents) == len(identifiers), f'docs not match IDs: {len(documents)}, {len(identifiers)}'
+        results = []
+        for doc, did in zip(documents, identifiers):
+            ok = await self.save_document(document=doc, identifier=did)
+            results.append(ok)
+        return results
+
+    async def flush(self) -> int:
+        """
+        Write the pending metas & documents to the storage,
+        override it for archivist which saves in background (write-behind)
+
+        :return: count of items flushed
+        """
+        return 0
+
     #
     #   Local Users
     #
@@ -39,6 +39,10 @@ from .compress_keys import Shortener
 
 
 class Compressor(ABC):
+    """
+        Data for extracting can be any bytes-like object,
+        such as 'bytes', 'bytearray' or 'memoryview' of a network buffer
+    """
 
     @abstractmethod
     def compress_content(self, content: StrMap, key: StrMap) -> bytes:
@@ -82,6 +86,16 @@ class Compressor(ABC):
             f'Not implemented: {type(self).__module__}.{type(self).__name__}.extract_reliable_message()'
         )
 
+    def extract_message_envelope(self, data: bytes) -> Optional[StrMap]:
+        """
+        Extract message info for routing, the big fields ('data', 'signature' and 'keys')
+        may be omitted from the result
+
+        :param data: message package
+        :return: message info contains envelope fields at least
+        """
+        return self.extract_reliable_message(data=data)
+
 
 class MessageCompressor(Compressor):
 
@@ -105,7 +119,7 @@ class MessageCompressor(Compressor):
 
     # Override
     def extract_content(self, data: bytes, key: StrMap) -> Optional[StrMap]:
-        json = utf8_decode(data=data)
+        json = _decode_text(data=data)
         if json is None:
             # assert False, f'content data error: {len(data)}'
             return None
@@ -127,7 +141,7 @@ class MessageCompressor(Compressor):
 
     # Override
     def extract_symmetric_key(self, data: bytes) -> Optional[StrMap]:
-        json = utf8_decode(data=data)
+        json = _decode_text(data=data)
         if json is None:
             # assert False, f'symmetric key error: {len(data)}'
             return None
@@ -149,7 +163,7 @@ class MessageCompressor(Compressor):
 
     # Override
     def extract_reliable_message(self, data: bytes) -> Optional[StrMap]:
-        json = utf8_decode(data=data)
+        json = _decode_text(data=data)
         if json is None:
             # assert False, f'reliable message error: {len(data)}'
             return None
@@ -158,3 +172,11 @@ class MessageCompressor(Compressor):
             msg = self.shortener.extract_reliable_message(msg=msg)
             return msg
         assert False, f'message package error: {json}'
+
+
+def _decode_text(data: bytes) -> Optional[str]:
+    """ Decode UTF-8 text from bytes-like object (bytes, bytearray or memoryview) """
+    if isinstance(data, bytes):
+        return utf8_decode(data=data)
+    # decode the buffer directly, without copying it to a new bytes object
+    return str(data, 'utf-8')
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+#
+#   DIM-SDK : Decentralized Instant Messaging Software Development Kit
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+"""
+    Duplicate Filter
+    ~~~~~~~~~~~~~~~~
+
+    Rotating Bloom filter for suppressing duplicated messages
+"""
+
+import hashlib
+import math
+import time
+from typing import Dict, List
+
+
+class _BloomFilter:
+
+    __slots__ = ('bits', 'size', 'count', 'created')
+
+    def __init__(self, size: int, created: float):
+        self.bits = bytearray((size + 7) // 8)
+        self.size = size
+        self.count = 0
+        self.created = created
+
+
+class RotatingBloomFilter:
+    """
+        Rotating Bloom Filter
+        ~~~~~~~~~~~~~~~~~~~~~
+
+        Two generations of Bloom filter: new keys go to the current one,
+        lookups check both; when the current one has lived for a window
+        (or is full), it becomes the previous one and a fresh filter starts.
+        So a key is remembered for at least one window, and memory is fixed
+        by the capacity & error rate, whatever the traffic.
+
+        A Bloom filter has false positives: a new key may be taken as seen
+        (at the error rate), and the message would be lost. So the digests
+        of the latest keys are kept to confirm the hits, unconfirmed ones
+        (false positives, or keys older than the latest ones) are let through
+        and counted as 'unconfirmed'; set 'recent' to 0 to trust the Bloom
+        filter only, then the false positives are counted as 'hits' too.
+    """
+
+    def __init__(self, capacity: int = 1000000, error_rate: float = 0.001, window: float = 3600.0,
+                 recent: int = 65536):
+        """
+        Create rotating Bloom filter
+
+        :param capacity:   max keys in one window
+        :param error_rate: false positive rate
+        :param window:     seconds to keep a key
+        :param recent:     count of the latest keys for confirming the hits, 0 for no confirmation
+        """
+        super().__init__()
+        assert capacity > 0 and 0 < error_rate < 1 and window > 0, f'params error: {capacity}, {error_rate}'
+        self.__capacity = capacity
+        self.__window = window
+        # digests of the latest keys, in order of adding
+        self.__recent_capacity = recent
+        self.__recent: Dict[bytes, None] = {}
+        size = int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.__size = size
+        self.__hashes = max(1, int(round(size / capacity * math.log(2))))
+        now = time.time()
+        self.__current = _BloomFilter(size=size, created=now)
+        self.__previous = _BloomFilter(size=size, created=now)
+        self.__rotations = 0
+        self.__hits = 0
+        self.__unconfirmed = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.__capacity
+
+    @property
+    def window(self) -> float:
+        return self.__window
+
+    @property
+    def memory_size(self) -> int:
+        """ Bytes of the bit arrays (the digests of the latest keys are not counted) """
+        return len(self.__current.bits) + len(self.__previous.bits)
+
+    # noinspection PyMethodMayBeStatic
+    def _digest(self, key: bytes) -> bytes:
+        return hashlib.blake2b(key, digest_size=16).digest()
+
+    def _positions(self, digest: bytes) -> List[int]:
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        size = self.__size
+        return [(h1 + i * h2) % size for i in range(self.__hashes)]
+
+    def contains(self, key: bytes, now: float = None) -> bool:
+        """ Check whether the key has been added, false positives are confirmed by the latest keys """
+        self._rotate(now=now)
+        digest = self._digest(key=key)
+        positions = self._positions(digest=digest)
+        for bloom in (self.__current, self.__previous):
+            bits = bloom.bits
+            for pos in positions:
+                if not bits[pos >> 3] & (1 << (pos & 7)):
+                    break
+            else:
+                if self.__recent_capacity > 0 and digest not in self.__recent:
+                    # false positive, or too old to confirm
+                    self.__unconfirmed += 1
+                    return False
+                self.__hits += 1
+                return True
+        return False
+
+    def add(self, key: bytes, now: float = None):
+        self._rotate(now=now)
+        digest = self._digest(key=key)
+        bloom = self.__current
+        bits = bloom.bits
+        for pos in self._positions(digest=digest):
+            bits[pos >> 3] |= 1 << (pos & 7)
+        bloom.count += 1
+        capacity = self.__recent_capacity
+        if capacity > 0:
+            recent = self.__recent
+            recent.pop(digest, None)
+            while len(recent) >= capacity:
+                # drop the eldest one
+                recent.pop(next(iter(recent)), None)
+            recent[digest] = None
+
+    def _rotate(self, now: float = None):
+        bloom = self.__current
+        if now is None:
+            now = time.time()
+        if now - bloom.created < self.__window and bloom.count < self.__capacity:
+            return
+        # reuse the memory of the previous one
+        previous = self.__previous
+        previous.bits[:] = bytes(len(previous.bits))
+        previous.count = 0
+        previous.created = now
+        self.__previous = bloom
+        self.__current = previous
+        self.__rotations += 1
+
+    def get_metrics(self) -> Dict[str, int]:
+        """
+        'hits' for the duplicates (confirmed by the latest keys, unless 'recent' is 0),
+        'unconfirmed' for the Bloom hits let through
+        """
+        return {
+            'memory_size': self.memory_size,
+            'hashes': self.__hashes,
+            'current_count': self.__current.count,
+            'previous_count': self.__previous.count,
+            'recent_count': len(self.__recent),
+            'rotations': self.__rotations,
+            'hits': self.__hits,
+            'unconfirmed': self.__unconfirmed,
+        }
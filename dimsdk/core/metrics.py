@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+#
+#   DIM-SDK : Decentralized Instant Messaging Software Development Kit
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+"""
+    Pipeline Metrics
+    ~~~~~~~~~~~~~~~~
+
+    Latency histograms & counters for the stages of message pipeline,
+    disabled until a sink is added.
+"""
+
+import time
+import threading
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Optional, Any, Awaitable, List, Dict
+
+
+class MetricsSink(ABC):
+    """ Receiver for pipeline measurements """
+
+    @abstractmethod
+    def record(self, stage: str, elapsed: float, success: bool):
+        """
+        Record one call of the pipeline stage
+
+        :param stage:   stage name, e.g.: 'serialize_message', 'encrypt_key', ...
+        :param elapsed: seconds spent
+        :param success: False on exception or empty result
+        """
+        raise NotImplementedError(
+            f'Not implemented: {type(self).__module__}.{type(self).__name__}.record()'
+        )
+
+    def record_value(self, stage: str, name: str, value: float):
+        """
+        Record other measurement of the pipeline stage, ignored by default
+
+        :param stage: stage name
+        :param name:  value name, e.g.: 'responses', 'allocated', ...
+        :param value: amount of this call
+        """
+        pass
+
+
+class LatencyHistogram:
+    """ Histogram with exponential buckets (from 1 microsecond to about 1 minute) """
+
+    BOUNDS = tuple(0.000001 * (2 ** i) for i in range(27))
+
+    def __init__(self):
+        super().__init__()
+        self.__buckets = [0] * (len(self.BOUNDS) + 1)
+        self.__count = 0
+        self.__errors = 0
+        self.__total = 0.0
+        self.__min = 0.0
+        self.__max = 0.0
+
+    @property
+    def count(self) -> int:
+        return self.__count
+
+    @property
+    def errors(self) -> int:
+        return self.__errors
+
+    @property
+    def total(self) -> float:
+        return self.__total
+
+    def add(self, elapsed: float, success: bool = True):
+        self.__buckets[bisect_left(self.BOUNDS, elapsed)] += 1
+        if self.__count == 0 or elapsed < self.__min:
+            self.__min = elapsed
+        if elapsed > self.__max:
+            self.__max = elapsed
+        self.__count += 1
+        self.__total += elapsed
+        if not success:
+            self.__errors += 1
+
+    def percentile(self, q: float) -> float:
+        """ Upper bound of the bucket which contains the q-th percentile """
+        if self.__count == 0:
+            return 0.0
+        rank = self.__count * q / 100.0
+        seen = 0
+        for index, amount in enumerate(self.__buckets):
+            seen += amount
+            if seen >= rank and amount > 0:
+                if index < len(self.BOUNDS):
+                    return min(self.BOUNDS[index], self.__max)
+                break
+        return self.__max
+
+    def snapshot(self) -> Dict[str, Any]:
+        count = self.__count
+        return {
+            'count': count,
+            'errors': self.__errors,
+            'total': self.__total,
+            'min': self.__min,
+            'max': self.__max,
+            'avg': self.__total / count if count > 0 else 0.0,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99),
+        }
+
+
+class HistogramSink(MetricsSink):
+    """ Keep a latency histogram for each stage in memory """
+
+    def __init__(self):
+        super().__init__()
+        self.__histograms: Dict[str, LatencyHistogram] = {}
+        # stage => name => [count, total, max]
+        self.__values: Dict[str, Dict[str, List[float]]] = {}
+        self.__lock = threading.Lock()
+
+    # Override
+    def record(self, stage: str, elapsed: float, success: bool):
+        with self.__lock:
+            histogram = self.__histograms.get(stage)
+            if histogram is None:
+                histogram = LatencyHistogram()
+                self.__histograms[stage] = histogram
+            histogram.add(elapsed=elapsed, success=success)
+
+    # Override
+    def record_value(self, stage: str, name: str, value: float):
+        with self.__lock:
+            table = self.__values.get(stage)
+            if table is None:
+                table = {}
+                self.__values[stage] = table
+            item = table.get(name)
+            if item is None:
+                table[name] = [1, value, value]
+                return
+            item[0] += 1
+            item[1] += value
+            if value > item[2]:
+                item[2] = value
+
+    def get_histogram(self, stage: str) -> Optional[LatencyHistogram]:
+        return self.__histograms.get(stage)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """ Latency of each stage, with its other values: {name: {count, total, max, avg}} """
+        with self.__lock:
+            info = {stage: histogram.snapshot() for stage, histogram in self.__histograms.items()}
+            for stage, table in self.__values.items():
+                item = info.setdefault(stage, {})
+                for name, (count, total, biggest) in table.items():
+                    item[name] = {
+                        'count': count,
+                        'total': total,
+                        'max': biggest,
+                        'avg': total / count,
+                    }
+            return info
+
+    def reset(self):
+        with self.__lock:
+            self.__histograms.clear()
+            self.__values.clear()
+
+
+class PipelineMetrics:
+    """ Dispatch measurements to sinks, enabled only when sinks exist """
+
+    def __init__(self):
+        super().__init__()
+        self.__sinks: List[MetricsSink] = []
+
+    @property
+    def enabled(self) -> bool:
+        return len(self.__sinks) > 0
+
+    @property
+    def sinks(self) -> List[MetricsSink]:
+        return list(self.__sinks)
+
+    def add_sink(self, sink: MetricsSink):
+        if sink not in self.__sinks:
+            # copy on write, so dispatching needs no lock
+            self.__sinks = self.__sinks + [sink]
+
+    def remove_sink(self, sink: MetricsSink):
+        if sink in self.__sinks:
+            self.__sinks = [item for item in self.__sinks if item is not sink]
+
+    def record(self, stage: str, elapsed: float, success: bool = True):
+        for sink in self.__sinks:
+            sink.record(stage=stage, elapsed=elapsed, success=success)
+
+    def record_value(self, stage: str, name: str, value: float):
+        for sink in self.__sinks:
+            sink.record_value(stage=stage, name=name, value=value)
+
+    async def measure(self, stage: str, coro: Awaitable) -> Any:
+        """
+        Await the coroutine and record its latency
+
+        :param stage: stage name
+        :param coro:  coroutine of the stage
+        :return: result of the coroutine
+        """
+        success = False
+        start = time.perf_counter()
+        try:
+            result = await coro
+            success = result is not None
+            return result
+        finally:
+            self.record(stage=stage, elapsed=time.perf_counter() - start, success=success)
+
+
+# shared by all messengers
+shared_pipeline_metrics = PipelineMetrics()
@@ -29,7 +29,7 @@
 # ==============================================================================
 
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, AsyncIterator
 
 from dimp import Content, InstantMessage, SecureMessage, ReliableMessage
 
@@ -52,6 +52,17 @@ class Processor(ABC):
             f'Not implemented: {type(self).__module__}.{type(self).__name__}.process_package()'
         )
 
+    async def iter_process_package(self, data: bytes) -> AsyncIterator[bytes]:
+        """
+        Process data package, yield the responses one by one
+
+        :param data: data to be processed
+        :return: responses
+        """
+        responses = await self.process_package(data=data)
+        for pack in responses:
+            yield pack
+
     @abstractmethod
     async def process_reliable_message(self, msg: ReliableMessage) -> List[ReliableMessage]:
         """
@@ -64,6 +75,17 @@ class Processor(ABC):
             f'Not implemented: {type(self).__module__}.{type(self).__name__}.process_reliable_message()'
         )
 
+    async def iter_process_reliable_message(self, msg: ReliableMessage) -> AsyncIterator[ReliableMessage]:
+        """
+        Process network message, yield the responses one by one
+
+        :param msg: message to be processed
+        :return: response messages
+        """
+        responses = await self.process_reliable_message(msg=msg)
+        for res in responses:
+            yield res
+
     @abstractmethod
     async def process_secure_message(self, msg: SecureMessage, r_msg: ReliableMessage) -> List[SecureMessage]:
         """
@@ -77,6 +99,19 @@ class Processor(ABC):
             f'Not implemented: {type(self).__module__}.{type(self).__name__}.process_secure_message()'
         )
 
+    async def iter_process_secure_message(self, msg: SecureMessage,
+                                          r_msg: ReliableMessage) -> AsyncIterator[SecureMessage]:
+        """
+        Process encrypted message, yield the responses one by one
+
+        :param msg:   message to be processed
+        :param r_msg: message received
+        :return: response messages
+        """
+        responses = await self.process_secure_message(msg=msg, r_msg=r_msg)
+        for res in responses:
+            yield res
+
     @abstractmethod
     async def process_instant_message(self, msg: InstantMessage, r_msg: ReliableMessage) -> List[InstantMessage]:
         """
@@ -90,6 +125,19 @@ class Processor(ABC):
             f'Not implemented: {type(self).__module__}.{type(self).__name__}.process_instant_message()'
         )
 
+    async def iter_process_instant_message(self, msg: InstantMessage,
+                                           r_msg: ReliableMessage) -> AsyncIterator[InstantMessage]:
+        """
+        Process plain message, yield the responses one by one
+
+        :param msg:   message to be processed
+        :param r_msg: message received
+        :return: response messages
+        """
+        responses = await self.process_instant_message(msg=msg, r_msg=r_msg)
+        for res in responses:
+            yield res
+
     @abstractmethod
     async def process_content(self, content: Content, r_msg: ReliableMessage) -> List[Content]:
         """
@@ -102,3 +150,15 @@ class Processor(ABC):
         raise NotImplementedError(
             f'Not implemented: {type(self).__module__}.{type(self).__name__}.process_content()'
         )
+
+    async def iter_process_content(self, content: Content, r_msg: ReliableMessage) -> AsyncIterator[Content]:
+        """
+        Process message content, yield the responses one by one
+
+        :param content: content to be processed
+        :param r_msg: message received
+        :return: response contents
+        """
+        responses = await self.process_content(content=content, r_msg=r_msg)
+        for res in responses:
+            yield res
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+#
+#   DIM-SDK : Decentralized Instant Messaging Software Development Kit
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+"""
+    Suspended Messages
+    ~~~~~~~~~~~~~~~~~~
+
+    Messages waiting for meta/visa of some entities
+"""
+
+import time
+from collections import deque
+from typing import Any, Iterable, List, Dict, Deque
+
+from dimp import ID
+
+
+class _SuspendedEntry:
+
+    __slots__ = ('msg', 'waiting', 'expired', 'alive')
+
+    def __init__(self, msg: Any, waiting: List[ID], expired: float):
+        self.msg = msg
+        self.waiting = waiting
+        self.expired = expired
+        self.alive = True
+
+
+class SuspendedMessageQueue:
+    """
+        Suspended Message Queue
+        ~~~~~~~~~~~~~~~~~~~~~~~
+
+        Messages indexed by the IDs of missing entities,
+        a message waiting for several entities will be resumed (only once)
+        when any of them arrived; expired messages and the eldest ones
+        (when the queue is full) will be dropped.
+    """
+
+    def __init__(self, capacity: int = 1024, ttl: float = 300.0, max_per_entity: int = 64):
+        """
+        Create suspended message queue
+
+        :param capacity:       max count of messages
+        :param ttl:            seconds before a message expired
+        :param max_per_entity: max count of messages waiting for the same entity
+        """
+        super().__init__()
+        self.__capacity = capacity
+        self.__ttl = ttl
+        self.__max_per_entity = max_per_entity
+        self.__index: Dict[ID, List[_SuspendedEntry]] = {}
+        self.__entries: Deque[_SuspendedEntry] = deque()
+        self.__count = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.__capacity
+
+    @property
+    def ttl(self) -> float:
+        return self.__ttl
+
+    def __len__(self) -> int:
+        return self.__count
+
+    @property
+    def waiting_ids(self) -> List[ID]:
+        """ IDs of the missing entities """
+        return list(self.__index.keys())
+
+    def suspend(self, msg: Any, waiting: Iterable[ID], now: float = None) -> bool:
+        """
+        Suspend a message for waiting meta/visa
+
+        :param msg:     instant message (to be sent) or reliable message (received)
+        :param waiting: IDs of the missing entities
+        :param now:     current time
+        :return: False on nothing to wait
+        """
+        waiting = list(dict.fromkeys(waiting))
+        if len(waiting) == 0:
+            return False
+        if now is None:
+            now = time.time()
+        self.purge(now=now)
+        entry = _SuspendedEntry(msg=msg, waiting=waiting, expired=now + self.__ttl)
+        for identifier in waiting:
+            entries = self.__index.get(identifier)
+            if entries is None:
+                entries = []
+                self.__index[identifier] = entries
+            elif len(entries) >= self.__max_per_entity:
+                # too many messages waiting for this entity, drop the eldest one
+                self._discard(entry=entries[0])
+                entries = self.__index.setdefault(identifier, [])
+            entries.append(entry)
+        self.__entries.append(entry)
+        self.__count += 1
+        # check capacity
+        while self.__count > self.__capacity:
+            self._discard(entry=self.__entries.popleft())
+        return True
+
+    def resume(self, identifier: ID, now: float = None) -> List[Any]:
+        """
+        Remove messages waiting for this entity
+
+        :param identifier: ID of the arrived entity
+        :param now:        current time
+        :return: messages not expired
+        """
+        entries = self.__index.get(identifier)
+        if entries is None:
+            return []
+        if now is None:
+            now = time.time()
+        messages = []
+        for item in list(entries):
+            if item.alive and item.expired > now:
+                messages.append(item.msg)
+            self._discard(entry=item)
+        return messages
+
+    def purge(self, now: float = None) -> int:
+        """
+        Remove expired messages
+
+        :param now: current time
+        :return: count of removed messages
+        """
+        if now is None:
+            now = time.time()
+        removed = 0
+        entries = self.__entries
+        while len(entries) > 0:
+            head = entries[0]
+            if head.alive and head.expired > now:
+                # messages are in order of time
+                break
+            entries.popleft()
+            if head.alive:
+                self._discard(entry=head)
+                removed += 1
+        return removed
+
+    def clear(self):
+        self.__index.clear()
+        self.__entries.clear()
+        self.__count = 0
+
+    # protected
+    def _discard(self, entry: _SuspendedEntry):
+        if not entry.alive:
+            return
+        entry.alive = False
+        self.__count -= 1
+        for identifier in entry.waiting:
+            entries = self.__index.get(identifier)
+            if entries is None:
+                continue
+            try:
+                entries.remove(entry)
+            except ValueError:
+                pass
+            if len(entries) == 0:
+                self.__index.pop(identifier, None)
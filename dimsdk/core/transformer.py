@@ -35,6 +35,7 @@ from dimp import StrMap
 from dimp import SymmetricKey
 from dimp import ID
 from dimp import Content
+from dimp import Envelope
 from dimp import InstantMessage, SecureMessage, ReliableMessage
 from dimp import BaseMessage
 
@@ -90,6 +91,20 @@ class Transformer(InstantMessageDelegate, SecureMessageDelegate, ReliableMessage
         info = compressor.extract_reliable_message(data=data)
         return ReliableMessage.parse(msg=info)
 
+    async def deserialize_envelope(self, data: bytes) -> Optional[Envelope]:
+        """
+        Deserialize envelope of network message for routing,
+        without parsing the 'data', 'signature' and 'keys' fields
+
+        :param data: data package
+        :return: message envelope
+        """
+        compressor = self.compressor
+        info = compressor.extract_message_envelope(data=data)
+        if info is None:
+            return None
+        return Envelope.parse(envelope=info)
+
     #
     #   InstantMessageDelegate
     #
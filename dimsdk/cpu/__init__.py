@@ -38,6 +38,7 @@ from ..dkd import ContentProcessor
 from ..dkd import ContentProcessorCreator
 from ..dkd import ContentProcessorFactory
 from ..dkd import GeneralContentProcessorFactory
+from ..dkd import ContentScheduler
 
 from .base import BaseContentProcessor
 from .base import BaseCommandProcessor
@@ -45,6 +46,7 @@ from .base import BaseCommandProcessor
 from .contents import ArrayContentProcessor
 from .contents import ForwardContentProcessor
 
+from .commands import MetaValidationCache
 from .commands import MetaCommandProcessor
 from .commands import DocumentCommandProcessor
 
@@ -57,6 +59,7 @@ __all__ = [
     'ContentProcessorCreator',
     'ContentProcessorFactory',
     'GeneralContentProcessorFactory',
+    'ContentScheduler',
 
     #
     #   CPU
@@ -68,6 +71,7 @@ __all__ = [
     'ArrayContentProcessor',
     'ForwardContentProcessor',
 
+    'MetaValidationCache',
     'MetaCommandProcessor',
     'DocumentCommandProcessor',
 
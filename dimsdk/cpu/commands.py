@@ -28,9 +28,11 @@
 # SOFTWARE.
 # ==============================================================================
 
-from typing import Optional, List
+from typing import Optional, Tuple, List, Dict
 from typing import Iterable
 
+from dimp import sha256
+from dimp import json_encode, utf8_encode
 from dimp import ID, Address, Meta, Document
 from dimp import ReliableMessage
 from dimp import Envelope, Content
@@ -38,18 +40,86 @@ from dimp import MetaCommand, DocumentCommand
 
 from ..crypto.agent import account_helper
 from ..core import Archivist
+from ..base import Facebook, Messenger
 
 from .base import BaseCommandProcessor
 
 
+class MetaValidationCache:
+    """
+        Meta Validation Cache
+        ~~~~~~~~~~~~~~~~~~~~~
+
+        Memoize the results of checking meta with entity ID,
+        so a meta pushed again costs a dictionary lookup only
+    """
+
+    def __init__(self, capacity: int = 4096):
+        super().__init__()
+        self.__capacity = capacity
+        self.__results: Dict[Tuple[str, bytes], bool] = {}
+
+    @property
+    def capacity(self) -> int:
+        return self.__capacity
+
+    def __len__(self) -> int:
+        return len(self.__results)
+
+    # noinspection PyMethodMayBeStatic
+    def cache_key(self, meta: Meta, identifier: ID) -> Tuple[str, bytes]:
+        """ Build cache key with ID string and digest of meta info """
+        info = meta.to_map()
+        fingerprint = sha256(data=utf8_encode(string=json_encode(container=info)))
+        return str(identifier), fingerprint
+
+    def get(self, key: Tuple[str, bytes]) -> Optional[bool]:
+        """ Get checking result, None on not found """
+        results = self.__results
+        ok = results.pop(key, None)
+        if ok is not None:
+            # touch it
+            results[key] = ok
+        return ok
+
+    def put(self, key: Tuple[str, bytes], ok: bool):
+        """ Cache checking result, drop the eldest one when full """
+        results = self.__results
+        results.pop(key, None)
+        while len(results) >= self.__capacity > 0:
+            eldest = next(iter(results))
+            results.pop(eldest, None)
+        results[key] = ok
+
+    def clear(self):
+        self.__results.clear()
+
+
 class MetaCommandProcessor(BaseCommandProcessor):
 
+    def __init__(self, facebook: Facebook, messenger: Messenger, meta_cache: Optional[MetaValidationCache] = None):
+        """
+        Create meta command processor
+
+        :param facebook:   entity delegate
+        :param messenger:  message transceiver
+        :param meta_cache: results of checking meta, shared by meta & document command processors
+        """
+        super().__init__(facebook=facebook, messenger=messenger)
+        if meta_cache is None:
+            meta_cache = MetaValidationCache()
+        self.__meta_cache = meta_cache
+
     @property  # protected
     def archivist(self) -> Optional[Archivist]:
         facebook = self.facebook
         if facebook is not None:
             return facebook.archivist
 
+    @property  # protected
+    def meta_cache(self) -> MetaValidationCache:
+        return self.__meta_cache
+
     # Override
     async def process_content(self, content: Content, r_msg: ReliableMessage) -> List[Content]:
         assert isinstance(content, MetaCommand), f'meta command error: {content}'
@@ -118,7 +188,9 @@ class MetaCommandProcessor(BaseCommandProcessor):
                     'did': str(identifier),
                 }
             })
-        elif not await self.archivist.save_meta(meta=meta, identifier=identifier):
+        # save meta
+        results = await self.archivist.save_metas(metas=[meta], identifiers=[identifier])
+        if not all(results):
             text = 'Meta not accepted.'
             return self._respond_receipt(text=text, content=content, envelope=envelope, extra={
                 'template': 'Meta not accepted: ${did}.',
@@ -128,8 +200,18 @@ class MetaCommandProcessor(BaseCommandProcessor):
             })
         # meta saved, return no error
 
-    # noinspection PyMethodMayBeStatic
     async def _check_meta(self, meta: Meta, identifier: ID) -> bool:
+        cache = self.meta_cache
+        key = cache.cache_key(meta=meta, identifier=identifier)
+        ok = cache.get(key)
+        if ok is None:
+            # not checked yet
+            ok = self._verify_meta(meta=meta, identifier=identifier)
+            cache.put(key, ok)
+        return ok
+
+    # noinspection PyMethodMayBeStatic
+    def _verify_meta(self, meta: Meta, identifier: ID) -> bool:
         if not meta.is_valid:
             return False
         old = identifier.address
@@ -247,13 +329,9 @@ class DocumentCommandProcessor(MetaCommandProcessor):
                 # failed
                 return errors
         # 2. try to save documents
-        errors = []
-        for doc in documents:
-            array = await self._save_document(doc, meta=meta, identifier=identifier, content=content, envelope=envelope)
-            if isinstance(array, list):
-                # failed
-                errors.extend(array)
-        if len(errors) > 0:
+        errors = await self._save_documents(documents, meta=meta, identifier=identifier,
+                                            content=content, envelope=envelope)
+        if errors is not None:
             # failed
             return errors
         # 3. success
@@ -266,28 +344,47 @@ class DocumentCommandProcessor(MetaCommandProcessor):
         })
 
     # protected
-    async def _save_document(self, doc: Document, meta: Meta, identifier: ID,
-                             content: DocumentCommand, envelope: Envelope) -> Optional[List[Content]]:
-        # check document
-        if not await self._check_document(doc, meta=meta, identifier=identifier):
+    async def _save_documents(self, documents: List[Document], meta: Meta, identifier: ID,
+                              content: DocumentCommand, envelope: Envelope) -> Optional[List[Content]]:
+        """
+        Check documents and save the valid ones with one archivist call,
+        override it (or '_check_document()') to customize the saving
+
+        :return: error receipts, None on all documents saved
+        """
+        errors = []
+        # check documents
+        valid_docs = []
+        for doc in documents:
+            if await self._check_document(doc, meta=meta, identifier=identifier):
+                valid_docs.append(doc)
+                continue
             # document invalid
             text = 'Document not accepted.'
-            return self._respond_receipt(text=text, content=content, envelope=envelope, extra={
+            errors.extend(self._respond_receipt(text=text, content=content, envelope=envelope, extra={
                 'template': 'Document not accepted: ${did}.',
                 'replacements': {
                     'did': str(identifier),
                 }
-            })
-        elif not await self.archivist.save_document(document=doc, identifier=identifier):
-            # document expired
-            text = 'Document not changed.'
-            return self._respond_receipt(text=text, content=content, envelope=envelope, extra={
-                'template': 'Document not changed: ${did}.',
-                'replacements': {
-                    'did': str(identifier),
-                }
-            })
-        # document saved, return no error
+            }))
+        # save valid documents in one batch
+        if len(valid_docs) > 0:
+            identifiers = [identifier] * len(valid_docs)
+            results = await self.archivist.save_documents(documents=valid_docs, identifiers=identifiers)
+            for ok in results:
+                if ok:
+                    continue
+                # document expired
+                text = 'Document not changed.'
+                errors.extend(self._respond_receipt(text=text, content=content, envelope=envelope, extra={
+                    'template': 'Document not changed: ${did}.',
+                    'replacements': {
+                        'did': str(identifier),
+                    }
+                }))
+        if len(errors) > 0:
+            return errors
+        # documents saved, return no error
 
     # protected
     async def _check_document(self, doc: Document, meta: Meta, identifier: ID) -> bool:
@@ -42,12 +42,14 @@ from dimp import ContentType, Command
 from ..dkd import ContentProcessor, ContentProcessorCreator
 
 from ..base import TwinsHelper
+from ..base import Facebook, Messenger
 
 from .base import BaseContentProcessor
 from .base import BaseCommandProcessor
 
 from .contents import ForwardContentProcessor
 from .contents import ArrayContentProcessor
+from .commands import MetaValidationCache
 from .commands import MetaCommandProcessor
 from .commands import DocumentCommandProcessor
 
@@ -55,6 +57,23 @@ from .commands import DocumentCommandProcessor
 class BaseContentProcessorCreator(TwinsHelper, ContentProcessorCreator):
     """ Base ContentProcessor Creator """
 
+    def __init__(self, facebook: Facebook, messenger: Messenger, meta_cache: Optional[MetaValidationCache] = None):
+        """
+        Create content processor creator
+
+        :param facebook:   entity delegate
+        :param messenger:  message transceiver
+        :param meta_cache: results of checking meta, shared by meta & document command processors
+        """
+        super().__init__(facebook=facebook, messenger=messenger)
+        if meta_cache is None:
+            meta_cache = MetaValidationCache()
+        self.__meta_cache = meta_cache
+
+    @property  # protected
+    def meta_cache(self) -> MetaValidationCache:
+        return self.__meta_cache
+
     # Override
     def create_content_processor(self, msg_type: str) -> Optional[ContentProcessor]:
         # forward content
@@ -78,8 +97,10 @@ class BaseContentProcessorCreator(TwinsHelper, ContentProcessorCreator):
     def create_command_processor(self, msg_type: str, cmd: str) -> Optional[ContentProcessor]:
         # meta command
         if cmd == Command.META:
-            return MetaCommandProcessor(facebook=self.facebook, messenger=self.messenger)
+            return MetaCommandProcessor(facebook=self.facebook, messenger=self.messenger,
+                                        meta_cache=self.meta_cache)
         # document command
         if cmd == Command.DOCUMENTS:
-            return DocumentCommandProcessor(facebook=self.facebook, messenger=self.messenger)
+            return DocumentCommandProcessor(facebook=self.facebook, messenger=self.messenger,
+                                            meta_cache=self.meta_cache)
         # assert False, f'unsupported command: {cmd}'
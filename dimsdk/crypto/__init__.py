@@ -30,7 +30,7 @@
 
 from .bundle import BytesMap
 
-from .bundle import EncryptedBundle, UserEncryptedBundle
+from .bundle import EncryptedBundle, UserEncryptedBundle, SingleEncryptedBundle
 from .bundle import EncryptedBundleHelper, DefaultBundleHelper
 from .bundle import EncryptedBundleExtension
 
@@ -42,7 +42,7 @@ __all__ = [
 
     'BytesMap',
 
-    'EncryptedBundle', 'UserEncryptedBundle',
+    'EncryptedBundle', 'UserEncryptedBundle', 'SingleEncryptedBundle',
     'EncryptedBundleHelper', 'DefaultBundleHelper',
     'EncryptedBundleExtension',
 
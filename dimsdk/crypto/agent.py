@@ -37,7 +37,7 @@ from dimp import Meta, Document, Visa
 from dimp import GeneralAccountHelper
 from dimp import GeneralAccountExtension, shared_account_extensions
 
-from .bundle import EncryptedBundle, UserEncryptedBundle
+from .bundle import EncryptedBundle
 
 
 class VisaAgent(ABC):
@@ -71,7 +71,7 @@ class DefaultVisaAgent(VisaAgent):
     def encrypt_bundle(self, plaintext: bytes, meta: Meta, documents: List[Document]) -> EncryptedBundle:
         # NOTICE: meta.key will never changed, so use visa.key to encrypt message
         #         is a better way
-        bundle = UserEncryptedBundle()
+        dictionary = {}
         #
         #  1. encrypt with visa keys
         #
@@ -84,12 +84,12 @@ class DefaultVisaAgent(VisaAgent):
             terminal = self.get_terminal(document=doc)
             if terminal is None or len(terminal) == 0:
                 terminal = '*'
-            if bundle.get(terminal) is not None:
+            if dictionary.get(terminal) is not None:
                 # assert False, f'duplicated visa key: {doc}'
                 continue
             ciphertext = pub_key.encrypt(plaintext=plaintext)
-            bundle[terminal] = ciphertext
-        if bundle.is_empty:
+            dictionary[terminal] = ciphertext
+        if len(dictionary) == 0:
             #
             #  2. encrypt with meta key
             #
@@ -97,9 +97,9 @@ class DefaultVisaAgent(VisaAgent):
             if isinstance(meta_key, EncryptKey):
                 # terminal = '*
                 ciphertext = meta_key.encrypt(plaintext=plaintext)
-                bundle['*'] = ciphertext
+                dictionary['*'] = ciphertext
         # OK
-        return bundle
+        return EncryptedBundle.create(dictionary=dictionary)
 
     # Override
     def get_verify_keys(self, meta: Meta, documents: List[Document]) -> List[VerifyKey]:
@@ -197,7 +197,9 @@ class VisaAgentExtension:
         )
 
 
-shared_account_extensions.visa_agent: VisaAgent = DefaultVisaAgent()
+# the application may have set its own before this module was loaded
+if getattr(shared_account_extensions, 'visa_agent', None) is None:
+    shared_account_extensions.visa_agent = DefaultVisaAgent()
 
 
 def account_extensions() -> Union[VisaAgentExtension, GeneralAccountExtension]:
@@ -30,8 +30,8 @@
 
 from abc import ABC, abstractmethod
 from collections.abc import MutableMapping
-from typing import Optional, Tuple
-from typing import Iterator, Iterable
+from typing import Optional, Tuple, Dict
+from typing import Iterator, Iterable, Mapping
 from typing import AbstractSet, ValuesView
 
 from dimp import StrMap
@@ -54,6 +54,8 @@ except TypeError:
 
 class EncryptedBundle(ABC):
 
+    __slots__ = ()
+
     @abstractmethod
     def to_map(self) -> BytesMap:
         raise NotImplementedError(
@@ -180,12 +182,27 @@ class EncryptedBundle(ABC):
         helper = bundle_helper()
         return helper.decode_bundle(keys=keys, identifier=identifier, terminals=terminals)
 
+    @classmethod
+    def create(cls, dictionary: BytesMap):  # -> EncryptedBundle:
+        """
+        Create bundle for terminal-specific data,
+        compact one for single terminal (upgraded when another terminal added)
+        """
+        if len(dictionary) == 1:
+            for terminal, data in dictionary.items():
+                return SingleEncryptedBundle(terminal=terminal, data=data)
+        return UserEncryptedBundle(dictionary=dictionary)
+
 
 class UserEncryptedBundle(EncryptedBundle):
 
-    def __init__(self):
+    __slots__ = ('__dictionary',)
+
+    def __init__(self, dictionary: BytesMap = None):
         super().__init__()
-        self.__dictionary: BytesMap = {}
+        if dictionary is None:
+            dictionary = {}
+        self.__dictionary: BytesMap = dictionary
 
     # private
     def to_str(self) -> str:
@@ -279,6 +296,186 @@ class UserEncryptedBundle(EncryptedBundle):
         return helper.encode_bundle(bundle=self, identifier=identifier)
 
 
+class SingleEncryptedBundle(EncryptedBundle):
+    """
+        Bundle for one terminal only
+        ~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+        Most users login with one device, so the key data for a user
+        is kept in two slots instead of a dictionary;
+        when data for another terminal is set, it upgrades to a dictionary.
+
+        NOTICE: 'to_map()' returns a new dictionary every time before upgraded.
+    """
+
+    __slots__ = ('__terminal', '__data', '__bundle')
+
+    def __init__(self, terminal: str = None, data: bytes = None):
+        super().__init__()
+        self.__terminal: Optional[str] = terminal
+        self.__data: Optional[bytes] = data
+        # bundle for multiple terminals, created when another terminal added
+        self.__bundle: Optional[UserEncryptedBundle] = None
+
+    # private
+    def to_str(self) -> str:
+        clazz = self.__class__.__name__
+        bundle = self.__bundle
+        if bundle is not None:
+            return bundle.to_str().replace(UserEncryptedBundle.__name__, clazz)
+        terminal = self.__terminal
+        if terminal is None:
+            return f'<{clazz} count=0>\n</{clazz}>'
+        text = f'\t"{terminal}": {len(self.__data)} byte(s)\n'
+        return f'<{clazz} count=1>\n{text}</{clazz}>'
+
+    # Override
+    def to_map(self) -> BytesMap:
+        bundle = self.__bundle
+        if bundle is not None:
+            return bundle.to_map()
+        terminal = self.__terminal
+        if terminal is None:
+            return {}
+        return {terminal: self.__data}
+
+    @property  # Override
+    def is_empty(self) -> bool:
+        bundle = self.__bundle
+        if bundle is not None:
+            return bundle.is_empty
+        return self.__terminal is None
+
+    # Override
+    def clear(self):
+        self.__terminal = None
+        self.__data = None
+        self.__bundle = None
+
+    # Override
+    def get(self, key: str, default: Optional[bytes] = None) -> Optional[bytes]:
+        bundle = self.__bundle
+        if bundle is not None:
+            return bundle.get(key, default)
+        if key == self.__terminal:
+            return self.__data
+        return default
+
+    # Override
+    def items(self) -> AbstractSet[Tuple[str, bytes]]:
+        return self.to_map().items()
+
+    # Override
+    def keys(self) -> AbstractSet[str]:
+        return self.to_map().keys()
+
+    # Override
+    def pop(self, key: str, default: Optional[bytes] = None) -> Optional[bytes]:
+        bundle = self.__bundle
+        if bundle is not None:
+            return bundle.pop(key, default)
+        if key == self.__terminal:
+            data = self.__data
+            self.clear()
+            return data
+        return default
+
+    # Override
+    def values(self) -> ValuesView[bytes]:
+        return self.to_map().values()
+
+    # Override
+    def __contains__(self, o) -> bool:
+        """ True if the dictionary has the specified key, else False. """
+        bundle = self.__bundle
+        if bundle is not None:
+            return bundle.__contains__(o)
+        return o is not None and o == self.__terminal
+
+    # Override
+    def __delitem__(self, v: str):
+        """ Delete self[key]. """
+        bundle = self.__bundle
+        if bundle is not None:
+            bundle.__delitem__(v)
+        elif v is None or v != self.__terminal:
+            raise KeyError(v)
+        else:
+            self.clear()
+
+    # Override
+    def __getitem__(self, k: str) -> bytes:
+        """ x.__getitem__(y) <==> x[y] """
+        bundle = self.__bundle
+        if bundle is not None:
+            return bundle.__getitem__(k)
+        if k is None or k != self.__terminal:
+            raise KeyError(k)
+        return self.__data
+
+    # Override
+    def __iter__(self) -> Iterator[str]:
+        """ Implement iter(self). """
+        bundle = self.__bundle
+        if bundle is not None:
+            return bundle.__iter__()
+        terminal = self.__terminal
+        if terminal is None:
+            return iter(())
+        return iter((terminal,))
+
+    # Override
+    def __len__(self) -> int:
+        """ Return len(self). """
+        bundle = self.__bundle
+        if bundle is not None:
+            return bundle.__len__()
+        return 0 if self.__terminal is None else 1
+
+    # Override
+    def __str__(self) -> str:
+        """ Return str(self). """
+        return self.to_str()
+
+    # Override
+    def __repr__(self) -> str:
+        """ Return repr(self). """
+        return self.to_str()
+
+    # Override
+    def __setitem__(self, k: str, v: Optional[bytes]):
+        """ Set self[key] to value. """
+        bundle = self.__bundle
+        if bundle is not None:
+            bundle.__setitem__(k, v)
+            return
+        terminal = self.__terminal
+        if terminal is None or terminal == k:
+            self.__terminal = k
+            self.__data = v
+            return
+        # another terminal, upgrade to dictionary
+        self.__bundle = UserEncryptedBundle(dictionary={
+            terminal: self.__data,
+            k: v,
+        })
+        self.__terminal = None
+        self.__data = None
+
+    # Override
+    def __sizeof__(self) -> int:
+        """ D.__sizeof__() -> size of D in memory, in bytes """
+        bundle = self.__bundle
+        if bundle is not None:
+            return object.__sizeof__(self) + bundle.__sizeof__()
+        return object.__sizeof__(self)
+
+    # Override
+    def encode(self, identifier: ID) -> StrMap:
+        helper = bundle_helper()
+        return helper.encode_bundle(bundle=self, identifier=identifier)
+
+
 # -----------------------------------------------------------------------------
 #  Account Extensions
 # -----------------------------------------------------------------------------
@@ -300,33 +497,68 @@ class EncryptedBundleHelper(ABC):
             f'Not implemented: {type(self).__module__}.{type(self).__name__}.decode_bundle()'
         )
 
+    def encode_bundles(self, bundles: Mapping[ID, EncryptedBundle]) -> StrMap:
+        """ Encode key bundles for all receivers (group members) """
+        encoded_keys = {}
+        for identifier, bundle in bundles.items():
+            encoded_keys.update(self.encode_bundle(bundle=bundle, identifier=identifier))
+        return encoded_keys
+
 
 class DefaultBundleHelper(EncryptedBundleHelper):
 
+    def __init__(self, capacity: int = 4096):
+        super().__init__()
+        # ID => str(ID.without_terminal())
+        self.__capacity = capacity
+        self.__prefixes: Dict[ID, str] = {}
+
+    # protected
+    def _get_prefix(self, identifier: ID) -> str:
+        """ Get ID string without terminal (cached) """
+        prefixes = self.__prefixes
+        text = prefixes.get(identifier)
+        if text is None:
+            text = str(identifier.without_terminal())
+            if len(prefixes) >= self.__capacity:
+                # drop the eldest one
+                prefixes.pop(next(iter(prefixes)), None)
+            prefixes[identifier] = text
+        return text
+
     # Override
     def encode_bundle(self, bundle: EncryptedBundle, identifier: ID) -> StrMap:
-        text = str(identifier.without_terminal())
         encoded_keys = {}
-        info = bundle.to_map()
-        for terminal, data in info.items():
+        self._encode_into(encoded_keys, bundle=bundle, identifier=identifier)
+        return encoded_keys
+
+    # Override
+    def encode_bundles(self, bundles: Mapping[ID, EncryptedBundle]) -> StrMap:
+        encoded_keys = {}
+        for identifier, bundle in bundles.items():
+            self._encode_into(encoded_keys, bundle=bundle, identifier=identifier)
+        return encoded_keys
+
+    # protected
+    def _encode_into(self, encoded_keys: Dict[str, str], bundle: EncryptedBundle, identifier: ID):
+        """ Encode bundle data, insert to 'message.keys' with ID + terminal """
+        text = self._get_prefix(identifier=identifier)
+        for terminal, data in bundle.items():
             # encode data
             base64 = base64_encode(data=data)
             if terminal == '' or terminal == '*':
                 target = text
             else:
                 target = f'{text}/{terminal}'
-            # insert to 'message.keys' with ID + terminal
             encoded_keys[target] = base64
-        # OK
-        return encoded_keys
 
     # Override
     def decode_bundle(self, keys: StrMap, identifier: ID, terminals: Iterable[str]) -> EncryptedBundle:
-        bundle = UserEncryptedBundle()
+        dictionary = {}
         #
         #  0. ID string without terminal (base identifier)
         #
-        text = str(identifier.without_terminal())
+        text = self._get_prefix(identifier=identifier)
         for item in terminals:
             if item == '':
                 target = '*'
@@ -354,11 +586,11 @@ class DefaultBundleHelper(EncryptedBundleHelper):
                     #
                     #  3. Store decoded data for the terminal
                     #
-                    bundle[target] = data
+                    dictionary[target] = data
                 # else:
                 #     assert False, f'key data error: {item} -> {base64}'
         # OK
-        return bundle
+        return EncryptedBundle.create(dictionary=dictionary)
 
 
 class EncryptedBundleExtension:
@@ -378,7 +610,9 @@ class EncryptedBundleExtension:
         )
 
 
-shared_account_extensions.bundle_helper = DefaultBundleHelper()
+# the application may have set its own before this module was loaded
+if getattr(shared_account_extensions, 'bundle_helper', None) is None:
+    shared_account_extensions.bundle_helper = DefaultBundleHelper()
 
 
 def account_extensions() -> EncryptedBundleExtension:
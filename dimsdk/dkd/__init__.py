@@ -34,6 +34,8 @@ from .proc import ContentProcessorFactory
 
 from .factory import GeneralContentProcessorFactory
 
+from .scheduler import ContentScheduler
+
 
 __all__ = [
 
@@ -47,4 +49,6 @@ __all__ = [
 
     'GeneralContentProcessorFactory',
 
+    'ContentScheduler',
+
 ]
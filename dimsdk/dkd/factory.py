@@ -34,10 +34,14 @@
 
 """
 
+import tracemalloc
 from collections.abc import MutableMapping
-from typing import Optional
+from typing import Optional, List
 
 from dimp import Content, Command, GroupCommand
+from dimp import ReliableMessage
+
+from ..core import PipelineMetrics
 
 from .proc import ContentProcessor
 from .proc import ContentProcessorCreator
@@ -63,11 +67,73 @@ class GeneralContentProcessorFactory(ContentProcessorFactory):
         self.__creator = creator
         self.__content_processors: CpuMap = {}
         self.__command_processors: CpuMap = {}
+        # profiling
+        self.__metrics = PipelineMetrics()
+        self.__sample_interval = 0
+        self.__calls = 0
 
     @property  # protected
     def creator(self) -> ContentProcessorCreator:
         return self.__creator
 
+    #
+    #   Profiling
+    #
+
+    @property
+    def metrics(self) -> PipelineMetrics:
+        """ Measurements of the CPUs, disabled until a sink is added """
+        return self.__metrics
+
+    @property
+    def sample_interval(self) -> int:
+        """ Sample allocation every N calls while 'tracemalloc' is tracing, 0 means never """
+        return self.__sample_interval
+
+    @sample_interval.setter
+    def sample_interval(self, interval: int):
+        self.__sample_interval = interval
+
+    # noinspection PyMethodMayBeStatic
+    def get_stage(self, content: Content) -> str:
+        """ Stage name for measuring the CPU: 'process_content:{type}' or 'process_content:{type}:{cmd}' """
+        if isinstance(content, Command):
+            return 'process_content:%s:%s' % (content.type, content.cmd)
+        return 'process_content:%s' % content.type
+
+    # Override
+    async def measure(self, cpu: ContentProcessor, content: Content, r_msg: ReliableMessage) -> List[Content]:
+        """
+        Call the CPU and record its latency, count of responses and allocated bytes
+        (growth of traced memory, other tasks running at the same time will be counted too)
+        in the stage of this content, when any sink added to 'metrics'
+
+        :param cpu:     content processor
+        :param content: content to be processed
+        :param r_msg:   message containing the content
+        :return: responses
+        """
+        metrics = self.__metrics
+        if not metrics.enabled:
+            return await cpu.process_content(content=content, r_msg=r_msg)
+        stage = self.get_stage(content=content)
+        sampling = self._should_sample()
+        before = tracemalloc.get_traced_memory()[0] if sampling else 0
+        responses = await metrics.measure(stage=stage, coro=cpu.process_content(content=content, r_msg=r_msg))
+        metrics.record_value(stage=stage, name='responses', value=0 if responses is None else len(responses))
+        if sampling and tracemalloc.is_tracing():
+            allocated = max(0, tracemalloc.get_traced_memory()[0] - before)
+            metrics.record_value(stage=stage, name='allocated', value=allocated)
+        return responses
+
+    # protected
+    def _should_sample(self) -> bool:
+        interval = self.__sample_interval
+        if interval <= 0 or not tracemalloc.is_tracing():
+            return False
+        self.__calls += 1
+        return self.__calls % interval == 0
+
     #
     #   ContentProcessorFactory
     #
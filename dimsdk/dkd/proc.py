@@ -126,3 +126,14 @@ class ContentProcessorFactory(ABC):
         raise NotImplementedError(
             f'Not implemented: {type(self).__module__}.{type(self).__name__}.get_content_processor_for_type()'
         )
+
+    async def measure(self, cpu: ContentProcessor, content: Content, r_msg: ReliableMessage) -> List[Content]:
+        """
+        Call the CPU for the message processor, override it to profile the CPUs
+
+        :param cpu:     content processor
+        :param content: content to be processed
+        :param r_msg:   message containing the content
+        :return: responses
+        """
+        return await cpu.process_content(content=content, r_msg=r_msg)
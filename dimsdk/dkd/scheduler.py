@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+#
+#   DIM-SDK : Decentralized Instant Messaging Software Development Kit
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+"""
+    Content Scheduler
+    ~~~~~~~~~~~~~~~~~
+
+    Weighted fair queuing for contents before dispatching to CPUs
+"""
+
+import asyncio
+import heapq
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, List, Dict, Tuple
+
+from dimp import ContentType
+from dimp import Content, Command, GroupCommand
+
+
+# schedulers whose slots are held by the running task,
+# nested contents (forward/array) will be processed without queuing again
+_scheduled: ContextVar[Tuple[Any, ...]] = ContextVar('scheduled', default=())
+
+
+class _ClassStats:
+
+    __slots__ = ('enqueued', 'dispatched', 'completed', 'depth', 'max_depth',
+                 'total_wait', 'max_wait', 'total_service')
+
+    def __init__(self):
+        self.enqueued = 0
+        self.dispatched = 0
+        self.completed = 0
+        self.depth = 0
+        self.max_depth = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_service = 0.0
+
+
+class ContentScheduler:
+    """
+        Content Scheduler
+        ~~~~~~~~~~~~~~~~~
+
+        Limit the contents being processed at the same time, waiting contents
+        are dispatched by weighted fair queuing of their priority classes,
+        which are decided by content type & command name (the same keys used
+        by the CPU factory); so a flood of documents will not delay texts and receipts.
+    """
+
+    URGENT = 'urgent'
+    INTERACTIVE = 'interactive'
+    NORMAL = 'normal'
+    BULK = 'bulk'
+
+    def __init__(self, concurrency: int = 8):
+        """
+        Create content scheduler
+
+        :param concurrency: max contents being processed at the same time
+        """
+        super().__init__()
+        self.__concurrency = concurrency
+        self.__running = 0
+        # priority classes
+        self.__weights: Dict[str, float] = {
+            self.URGENT: 8.0,
+            self.INTERACTIVE: 4.0,
+            self.NORMAL: 2.0,
+            self.BULK: 1.0,
+        }
+        self.__types: Dict[str, str] = {
+            ContentType.TEXT: self.INTERACTIVE,
+        }
+        self.__commands: Dict[str, str] = {
+            Command.RECEIPT: self.URGENT,
+            Command.META: self.BULK,
+            Command.DOCUMENTS: self.BULK,
+        }
+        self.__default = self.NORMAL
+        # waiting queue: (finish tag, sequence, class name, future)
+        self.__queue: List[Tuple[float, int, str, asyncio.Future]] = []
+        self.__sequence = 0
+        self.__virtual_time = 0.0
+        self.__finish_tags: Dict[str, float] = {}
+        self.__stats: Dict[str, _ClassStats] = {}
+
+    @property
+    def concurrency(self) -> int:
+        return self.__concurrency
+
+    @property
+    def running(self) -> int:
+        return self.__running
+
+    #
+    #   Priority Classes
+    #
+
+    def set_weight(self, name: str, weight: float):
+        assert weight > 0, f'weight error: {name}, {weight}'
+        self.__weights[name] = weight
+
+    def set_type_class(self, msg_type: str, name: str):
+        """ Set priority class for content type """
+        self.__types[msg_type] = name
+
+    def set_command_class(self, cmd: str, name: str):
+        """ Set priority class for command name ('group' for all group commands) """
+        self.__commands[cmd] = name
+
+    def classify(self, content: Content) -> str:
+        """ Get priority class for the content """
+        if isinstance(content, Command):
+            name = self.__commands.get(content.cmd)
+            if name is None and isinstance(content, GroupCommand):
+                name = self.__commands.get('group')
+            if name is not None:
+                return name
+        return self.__types.get(content.type, self.__default)
+
+    #
+    #   Scheduling
+    #
+
+    async def run(self, content: Content, coro: Awaitable) -> Any:
+        """
+        Await the coroutine (processing the content) when its turn comes
+
+        :param content: content to be processed
+        :param coro:    coroutine for processing the content
+        :return: result of the coroutine
+        """
+        holders = _scheduled.get()
+        if self in holders:
+            # nested content, the slot is held by the outer one
+            return await coro
+        name = self.classify(content=content)
+        stats = self._get_stats(name=name)
+        stats.enqueued += 1
+        start = time.perf_counter()
+        try:
+            await self._acquire(name=name, stats=stats)
+        except BaseException:
+            # cancelled while waiting, drop the coroutine quietly
+            close = getattr(coro, 'close', None)
+            if close is not None:
+                close()
+            raise
+        now = time.perf_counter()
+        wait = now - start
+        stats.dispatched += 1
+        stats.total_wait += wait
+        if wait > stats.max_wait:
+            stats.max_wait = wait
+        token = _scheduled.set(holders + (self,))
+        try:
+            return await coro
+        finally:
+            _scheduled.reset(token)
+            stats.completed += 1
+            stats.total_service += time.perf_counter() - now
+            self._release()
+
+    async def _acquire(self, name: str, stats: _ClassStats):
+        if self.__running < self.__concurrency and len(self.__queue) == 0:
+            self.__running += 1
+            return
+        # virtual finish tag of this content (unit cost)
+        weight = self.__weights.get(name, 1.0)
+        start = max(self.__virtual_time, self.__finish_tags.get(name, 0.0))
+        finish = start + 1.0 / weight
+        self.__finish_tags[name] = finish
+        self.__sequence += 1
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.__queue, (finish, self.__sequence, name, future))
+        stats.depth += 1
+        if stats.depth > stats.max_depth:
+            stats.max_depth = stats.depth
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # slot granted but not used
+                self._release()
+            else:
+                stats.depth -= 1
+            raise
+
+    def _release(self):
+        self.__running -= 1
+        queue = self.__queue
+        while len(queue) > 0 and self.__running < self.__concurrency:
+            finish, _, name, future = heapq.heappop(queue)
+            if future.done():
+                # cancelled
+                continue
+            self.__virtual_time = finish
+            self._get_stats(name=name).depth -= 1
+            self.__running += 1
+            future.set_result(True)
+
+    def _get_stats(self, name: str) -> _ClassStats:
+        stats = self.__stats.get(name)
+        if stats is None:
+            stats = _ClassStats()
+            self.__stats[name] = stats
+        return stats
+
+    def get_metrics(self) -> Dict[str, Dict[str, float]]:
+        """ Snapshot for queue depth, waiting & service time (seconds) of each class """
+        metrics = {}
+        for name, stats in self.__stats.items():
+            dispatched = stats.dispatched
+            completed = stats.completed
+            metrics[name] = {
+                'weight': self.__weights.get(name, 1.0),
+                'enqueued': stats.enqueued,
+                'dispatched': dispatched,
+                'completed': completed,
+                'queue_depth': stats.depth,
+                'max_queue_depth': stats.max_depth,
+                'avg_wait': stats.total_wait / dispatched if dispatched > 0 else 0.0,
+                'max_wait': stats.max_wait,
+                'avg_service': stats.total_service / completed if completed > 0 else 0.0,
+            }
+        return metrics
@@ -29,7 +29,7 @@
 # ==============================================================================
 
 from abc import ABC, abstractmethod
-from typing import Optional, List
+from typing import Optional, Tuple, FrozenSet, List
 
 from dimp import ID
 
@@ -142,6 +142,10 @@ class BaseGroup(BaseEntity, Group):
         super().__init__(identifier=identifier)
         # once the group founder is set, it will never change
         self.__founder = None
+        # cached owner & members, cleared by 'invalidate()' when group changed
+        self.__owner: Optional[ID] = None
+        self.__members: Optional[Tuple[ID, ...]] = None
+        self.__member_set: Optional[FrozenSet[ID]] = None
 
     @BaseEntity.data_source.getter  # Override
     def data_source(self) -> Optional[GroupDataSource]:
@@ -163,12 +167,55 @@ class BaseGroup(BaseEntity, Group):
 
     @property  # Override
     async def owner(self) -> ID:
-        facebook = self.data_source
-        assert isinstance(facebook, GroupDataSource), f'group delegate error: {facebook}'
-        return await facebook.get_owner(identifier=self.identifier)
+        uid = self.__owner
+        if uid is None:
+            facebook = self.data_source
+            assert isinstance(facebook, GroupDataSource), f'group delegate error: {facebook}'
+            uid = await facebook.get_owner(identifier=self.identifier)
+            self.__owner = uid
+        return uid
 
     @property  # Override
     async def members(self) -> List[ID]:
+        array = self.__members
+        if array is None:
+            array = await self._load_members()
+            if array is None:
+                # members not found
+                return None
+        return list(array)
+
+    async def has_member(self, identifier: ID) -> bool:
+        """ Check whether the user is a member of this group """
+        members = self.__member_set
+        if members is None:
+            array = await self._load_members()
+            if array is None:
+                return False
+            members = frozenset(array)
+        if identifier in members:
+            return True
+        # check without terminal
+        return identifier.terminal is not None and identifier.without_terminal() in members
+
+    # protected
+    async def _load_members(self) -> Optional[Tuple[ID, ...]]:
         facebook = self.data_source
         assert isinstance(facebook, GroupDataSource), f'group delegate error: {facebook}'
-        return await facebook.get_members(identifier=self.identifier)
+        members = await facebook.get_members(identifier=self.identifier)
+        if members is None:
+            return None
+        array = tuple(members)
+        if len(array) > 0:
+            # cache members
+            self.__members = array
+            self.__member_set = frozenset(array)
+        # else:
+        #     # group not ready, load again next time
+        return array
+
+    def invalidate(self):
+        """ Clear cached owner & members, call it when group changed """
+        self.__owner = None
+        self.__members = None
+        self.__member_set = None
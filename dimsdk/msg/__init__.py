@@ -41,6 +41,9 @@ from .reliable_packer import ReliableMessagePacker
 from .helpers import MessagePackerFactory
 from .helpers import MessagePackerExtension
 
+from .chunks import ChunkedBase64
+from .buffers import MessageBuffers
+
 
 __all__ = [
 
@@ -61,4 +64,7 @@ __all__ = [
     'MessagePackerFactory',
     'MessagePackerExtension',
 
+    'ChunkedBase64',
+    'MessageBuffers',
+
 ]
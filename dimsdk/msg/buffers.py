@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+#
+#   DIM-SDK : Decentralized Instant Messaging Software Development Kit
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+"""
+    Message Buffers
+    ~~~~~~~~~~~~~~~
+
+    Decoded 'data' & 'signature' of message objects
+"""
+
+import weakref
+from typing import Optional, Union, Any, Dict, Tuple
+
+from dimp import Base64Data
+from dimp import SecureMessage, ReliableMessage
+
+from .chunks import ChunkedBase64
+
+
+class MessageBuffers:
+    """
+        Message Buffers
+        ~~~~~~~~~~~~~~~
+
+        Binary data decoded from a message object will be memoized until
+        the message object released, so the packers won't decode the same
+        data again (e.g.: 'sign_message' after 'encrypt_message' for a large
+        payload, or 'decrypt_message' after 'verify_message').
+
+        Message data larger than 'large_payload_size' will be decoded chunk
+        by chunk into a 'bytearray', any bytes-like object is acceptable here.
+
+        A buffer is valid only while the message field it was decoded from
+        is not replaced (e.g.: msg['data'] = ...), stale ones are discarded.
+    """
+
+    def __init__(self, large_payload_size: int = 1024 * 1024):
+        super().__init__()
+        self.__large_payload_size = large_payload_size
+        # id(msg) => {name: (field value, buffer)}
+        self.__buffers: Dict[int, Dict[str, Tuple[Any, Union[bytes, bytearray, memoryview]]]] = {}
+
+    @property
+    def large_payload_size(self) -> int:
+        return self.__large_payload_size
+
+    @large_payload_size.setter
+    def large_payload_size(self, size: int):
+        self.__large_payload_size = size
+
+    def get_buffer(self, msg: SecureMessage, name: str) -> Optional[Union[bytes, bytearray, memoryview]]:
+        table = self.__buffers.get(id(msg))
+        if table is None:
+            return None
+        item = table.get(name)
+        if item is None:
+            return None
+        elif item[0] is msg.get(name):
+            return item[1]
+        # the field had been replaced
+        table.pop(name, None)
+
+    def set_buffer(self, msg: SecureMessage, name: str, buffer: Union[bytes, bytearray, memoryview]):
+        """ Memoize decoded buffer for the message field """
+        key = id(msg)
+        table = self.__buffers.get(key)
+        if table is None:
+            table = {}
+            self.__buffers[key] = table
+            # remove the table when the message object released
+            weakref.finalize(msg, self.__buffers.pop, key, None)
+        table[name] = (msg.get(name), buffer)
+
+    def pop_buffer(self, msg: SecureMessage, name: str) -> Optional[Union[bytes, bytearray, memoryview]]:
+        """ Remove memoized buffer for the message field """
+        table = self.__buffers.get(id(msg))
+        if table is None:
+            return None
+        item = table.pop(name, None)
+        if item is not None and item[0] is msg.get(name):
+            return item[1]
+
+    def decode_data(self, msg: SecureMessage, keep: bool = True) -> Optional[Union[bytes, bytearray, memoryview]]:
+        """
+        Decode 'message.data'
+
+        :param msg:  secure/reliable message
+        :param keep: False means the caller is the last one who needs the binary data
+                     (e.g.: 'decrypt_message'), so it won't be held by the message object
+        :return: binary data
+        """
+        if keep:
+            buffer = self.get_buffer(msg=msg, name='data')
+        else:
+            buffer = self.pop_buffer(msg=msg, name='data')
+        if buffer is not None:
+            return buffer
+        msg_data = msg.data
+        if msg_data is None:
+            return None
+        elif isinstance(msg_data, Base64Data):
+            text = msg_data.to_str()
+            if len(text) > self.__large_payload_size:
+                buffer = ChunkedBase64.decode(text=text)
+                if buffer is not None:
+                    if keep:
+                        self.set_buffer(msg=msg, name='data', buffer=buffer)
+                    return buffer
+        # small data will be cached by the message object itself
+        return msg_data.to_bytes()
+
+    def decode_signature(self, msg: ReliableMessage) -> Optional[Union[bytes, bytearray, memoryview]]:
+        """ Decode 'message.signature' """
+        buffer = self.get_buffer(msg=msg, name='signature')
+        if buffer is not None:
+            return buffer
+        msg_sig = msg.signature
+        if msg_sig is None:
+            return None
+        return msg_sig.to_bytes()
+
+
+# shared by message packers
+shared_message_buffers = MessageBuffers()
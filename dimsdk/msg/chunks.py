@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+#
+#   DIM-SDK : Decentralized Instant Messaging Software Development Kit
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+"""
+    Chunked Base-64
+    ~~~~~~~~~~~~~~~
+
+    Encode/decode large message data piece by piece through memoryviews,
+    so the whole payload never coexists with its intermediate copies
+"""
+
+import binascii
+import re
+from typing import Optional, Union
+
+
+class ChunkedBase64:
+    """
+        Chunked Base-64 Coder
+        ~~~~~~~~~~~~~~~~~~~~~
+
+        'base64.b64encode()' builds the encoded bytes before turning it
+        into a string, and 'base64.b64decode()' converts the whole string
+        to ASCII bytes before decoding, both of them double the peak memory
+        for large payloads; this coder writes into a preallocated buffer
+        chunk by chunk instead.
+    """
+
+    # 192 KiB raw / 256 KiB encoded per chunk
+    CHUNK_SIZE = 3 * 64 * 1024
+
+    _ALPHABET = re.compile(r'[A-Za-z0-9+/]*={0,2}')
+
+    @classmethod
+    def encode(cls, data: Union[bytes, bytearray, memoryview]) -> bytearray:
+        """
+        Encode binary data to Base-64 (ASCII) buffer
+
+        :param data: binary data
+        :return: ASCII buffer, call 'buffer.decode()' for string
+                 (after the source data released)
+        """
+        view = memoryview(data)
+        size = len(view)
+        buffer = bytearray((size + 2) // 3 * 4)
+        step = cls.CHUNK_SIZE
+        pos = 0
+        for start in range(0, size, step):
+            piece = binascii.b2a_base64(view[start:start + step], newline=False)
+            end = pos + len(piece)
+            buffer[pos:end] = piece
+            pos = end
+        assert pos == len(buffer), f'base64 buffer error: {pos}, {len(buffer)}'
+        return buffer
+
+    @classmethod
+    def decode(cls, text: str) -> Optional[bytearray]:
+        """
+        Decode Base-64 string to binary data
+
+        :param text: Base-64 string
+        :return: None when the string is not in the standard alphabet
+                 (e.g.: contains line breaks), decode it as usual then
+        """
+        length = len(text)
+        if length % 4 != 0 or cls._ALPHABET.fullmatch(text) is None:
+            return None
+        padding = 0
+        if length > 0 and text[-1] == '=':
+            padding = 2 if text[-2] == '=' else 1
+        buffer = bytearray(length // 4 * 3 - padding)
+        step = cls.CHUNK_SIZE // 3 * 4
+        pos = 0
+        for start in range(0, length, step):
+            piece = binascii.a2b_base64(text[start:start + step])
+            end = pos + len(piece)
+            buffer[pos:end] = piece
+            pos = end
+        assert pos == len(buffer), f'base64 data error: {pos}, {len(buffer)}'
+        return buffer
@@ -74,7 +74,9 @@ class MessagePackerExtension:
         )
 
 
-shared_message_extensions.packer_factory = MessagePackerFactory()
+# the application may have set its own before this module was loaded
+if getattr(shared_message_extensions, 'packer_factory', None) is None:
+    shared_message_extensions.packer_factory = MessagePackerFactory()
 
 
 def message_extensions() -> MessagePackerExtension:
@@ -29,7 +29,7 @@
 # ==============================================================================
 
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Optional, Mapping
 
 from dimp import StrMap
 from dimp import SymmetricKey
@@ -145,3 +145,24 @@ class InstantMessageDelegate(ABC):
         raise NotImplementedError(
             f'Not implemented: {type(self).__module__}.{type(self).__name__}.encode_keys()'
         )
+
+    async def encode_bundles(self, bundles: Mapping[ID, EncryptedBundle], msg: InstantMessage) -> StrMap:
+        """
+        6. Encode the bundles for all receivers to 'message.keys',
+           'encode_keys()' is called for each receiver;
+           override it to encode all bundles in one pass
+           (e.g. with 'EncryptedBundleHelper.encode_bundles()')
+
+        :param bundles:  encrypted key bundles for receivers (or group members)
+        :param msg:      instant message object
+        :return: encoded key map (ID + terminal → base64-encoded encrypted key data)
+        """
+        msg_keys = {}
+        for receiver, bundle in bundles.items():
+            encoded_keys = await self.encode_keys(bundle=bundle, receiver=receiver, msg=msg)
+            if encoded_keys is None or len(encoded_keys) == 0:
+                # assert False, f'failed to encode key data: {receiver}'
+                continue
+            # insert to 'message.keys' with ID + terminal
+            msg_keys.update(encoded_keys)
+        return msg_keys
@@ -41,6 +41,7 @@ from dimp import PlainData, Base64Data
 
 from ..crypto import EncryptedBundle
 
+from .chunks import ChunkedBase64
 from .instant_delegate import InstantMessageDelegate
 
 
@@ -57,6 +58,10 @@ except TypeError:
 
 class InstantMessagePacker:
 
+    # content data larger than this will be encoded chunk by chunk,
+    # and the intermediate buffers will be released as soon as possible
+    LARGE_PAYLOAD_SIZE = 1024 * 1024
+
     def __init__(self, messenger: InstantMessageDelegate):
         super().__init__()
         self.__transformer = weakref.ref(messenger)
@@ -80,7 +85,7 @@ class InstantMessagePacker:
     """
 
     async def encrypt_message(self, msg: InstantMessage, password: SymmetricKey,
-                              members: List[ID] = None) -> Optional[SecureMessage]:
+                              members: List[ID] = None, bundles: BundleMap = None) -> Optional[SecureMessage]:
         """
         1. Encrypt message, replace 'content' field with encrypted 'data'
         2. Encrypt group message, replace 'content' field with encrypted 'data'
@@ -88,6 +93,7 @@ class InstantMessagePacker:
         :param msg:      plain message
         :param password: symmetric key
         :param members:  group members for group message
+        :param bundles:  message key encrypted for members in advance
         :return: SecureMessage object, None on visa not found
         """
         # TODO: check attachment for File/Image/Audio/Video message content
@@ -110,6 +116,8 @@ class InstantMessagePacker:
         if ciphertext is None:
             return None
         assert len(ciphertext) > 0, f'failed to encrypt content with key: {password}'
+        large = len(body) > self.LARGE_PAYLOAD_SIZE
+        body = None
 
         #
         #   3. Encode 'message.data' to String (Base64)
@@ -118,11 +126,18 @@ class InstantMessagePacker:
             # broadcast message content will not be encrypted (just encoded to JsON),
             # so no need to encode to Base64 here
             encoded_data = PlainData.create(binary=ciphertext)
+        elif large:
+            # encode large data chunk by chunk, and release the ciphertext
+            # before building the string, so they won't stay in memory together
+            buffer = ChunkedBase64.encode(data=ciphertext)
+            ciphertext = None
+            encoded_data = Base64Data.create(string=buffer.decode('ascii'))
+            buffer = None
         else:
             # message content had been encrypted by a symmetric key,
             # so the data should be encoded here (with algorithm 'base64' as default).
             encoded_data = Base64Data.create(binary=ciphertext)
-        assert not encoded_data.is_empty, f'failed to encode content data: {ciphertext}'
+        assert not encoded_data.is_empty, f'failed to encode content data: {msg.sender} => {msg.receiver}'
 
         #
         #   4. Serialize message key to data (JsON / ProtoBuf / ...)
@@ -160,7 +175,9 @@ class InstantMessagePacker:
             #
             #   5. Encrypt key data to 'message.keys' with receiver's public key
             #
-            bundle = await transformer.encrypt_key(pwd, receiver=receiver, msg=msg)
+            bundle = None if bundles is None else bundles.get(receiver)
+            if bundle is None:
+                bundle = await transformer.encrypt_key(pwd, receiver=receiver, msg=msg)
             if bundle is None or bundle.is_empty:
                 # public key for encryption not found
                 # TODO: suspend this message for waiting receiver's visa
@@ -186,13 +203,7 @@ class InstantMessagePacker:
         """ Encodes encrypted key bundles to a message-compatible map """
         transformer = self.delegate
         assert transformer is not None, 'instant message delegate not found'
-        msg_keys: MutableStrMap = {}
-        for receiver, bundle in bundle_map.items():
-            encoded_keys = await transformer.encode_keys(bundle=bundle, receiver=receiver, msg=msg)
-            if encoded_keys is None or len(encoded_keys) == 0:
-                # assert False, f'failed to encode key data: {receiver}'
-                continue
-            # insert to 'message.keys' with ID + terminal
-            msg_keys.update(encoded_keys)
+        # encode bundles for all members in one pass
+        msg_keys: MutableStrMap = await transformer.encode_bundles(bundles=bundle_map, msg=msg)
         # TODO: put key digest
         return msg_keys
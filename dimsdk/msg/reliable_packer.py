@@ -33,6 +33,7 @@ from typing import Optional
 
 from dimp import SecureMessage, ReliableMessage
 
+from .buffers import MessageBuffers, shared_message_buffers
 from .reliable_delegate import ReliableMessageDelegate
 
 
@@ -46,6 +47,10 @@ class ReliableMessagePacker:
     def delegate(self) -> Optional[ReliableMessageDelegate]:
         return self.__transformer()
 
+    @property  # protected
+    def buffers(self) -> MessageBuffers:
+        return shared_message_buffers
+
     """
         Verify the Reliable Message to Secure Message
         ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
@@ -74,8 +79,8 @@ class ReliableMessagePacker:
         #
         #   0. Decode 'message.data' to encrypted content data
         #
-        msg_data = msg.data
-        ciphertext = None if msg_data is None else msg_data.to_bytes()
+        buffers = self.buffers
+        ciphertext = buffers.decode_data(msg=msg, keep=False)
         if ciphertext is None:
             return None
         assert len(ciphertext) > 0, f'failed to decode message data: {msg.sender} => {msg.receiver}, {msg.group}'
@@ -83,8 +88,7 @@ class ReliableMessagePacker:
         #
         #   1. Decode 'message.signature' from String (Base64)
         #
-        msg_sig = msg.signature
-        signature = None if msg_sig is None else msg_sig.to_bytes()
+        signature = buffers.decode_signature(msg=msg)
         if signature is None:
             return None
         assert len(signature) > 0, f'failed to decode message signature: {msg.sender} => {msg.receiver}, {msg.group}'
@@ -100,4 +104,10 @@ class ReliableMessagePacker:
         # OK, pack message
         info = msg.copy_map()
         info.pop('signature', None)
-        return SecureMessage.parse(msg=info)
+        s_msg = SecureMessage.parse(msg=info)
+        if s_msg is not None and len(ciphertext) > buffers.large_payload_size:
+            # carry the large data to the new message object,
+            # so it won't be decoded again when decrypting
+            # (small data is cheap to decode, and cached by the message object itself)
+            buffers.set_buffer(msg=s_msg, name='data', buffer=ciphertext)
+        return s_msg
@@ -37,6 +37,7 @@ from dimp import InstantMessage, SecureMessage, ReliableMessage
 
 from ..crypto import EncryptedBundle
 
+from .buffers import MessageBuffers, shared_message_buffers
 from .secure_delegate import SecureMessageDelegate
 
 
@@ -50,6 +51,10 @@ class SecureMessagePacker:
     def delegate(self) -> Optional[SecureMessageDelegate]:
         return self.__transformer()
 
+    @property  # protected
+    def buffers(self) -> MessageBuffers:
+        return shared_message_buffers
+
     """
         Decrypt the Secure Message to Instant Message
         ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
@@ -121,8 +126,7 @@ class SecureMessagePacker:
         #
         #   4. Decode 'message.data' to encrypted content data
         #
-        msg_data = msg.data
-        ciphertext = None if msg_data is None else msg_data.to_bytes()
+        ciphertext = self.buffers.decode_data(msg=msg, keep=False)
         if ciphertext is None:
             return None
         assert len(ciphertext) > 0, f'failed to decode message data: {msg.sender} => {receiver}, {msg.group}'
@@ -130,12 +134,14 @@ class SecureMessagePacker:
         #
         #   5. Decrypt 'message.data' with symmetric key
         #
+        size = len(ciphertext)
         body = await transformer.decrypt_content(data=ciphertext, key=password, msg=msg)
+        ciphertext = None
         if body is None or len(body) == 0:
             # A: password is a reused key loaded from local storage, but it's expired;
             # B: key error.
             raise ValueError(f'failed to decrypt message data with key: {password},'
-                             f' data length: {len(ciphertext)} bytes {msg.sender} => {receiver}, {msg.group}')
+                             f' data length: {size} bytes {msg.sender} => {receiver}, {msg.group}')
             # TODO: ask the sender to send again
         assert len(body) > 0, f'message data should not be empty: {msg.sender} => {receiver}, {msg.group}'
 
@@ -143,6 +149,7 @@ class SecureMessagePacker:
         #   6. Deserialize message content from data (JsON / ProtoBuf / ...)
         #
         content = await transformer.deserialize_content(data=body, key=password, msg=msg)
+        body = None
         if content is None:
             # assert False, f'failed to deserialize content: {len(body)} bytes {msg.sender} => {receiver}, {msg.group}'
             return None
@@ -190,8 +197,7 @@ class SecureMessagePacker:
         #
         #   0. decode message data
         #
-        msg_data = msg.data
-        ciphertext = None if msg_data is None else msg_data.to_bytes()
+        ciphertext = self.buffers.decode_data(msg=msg)
         if ciphertext is None:
             return None
         assert len(ciphertext) > 0, f'failed to decode message data: {msg.sender} => {msg.receiver}, {msg.group}'
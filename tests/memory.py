@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+#
+#   DIM-SDK : Decentralized Instant Messaging Software Development Kit
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+"""
+    In-memory Stand-ins
+    ~~~~~~~~~~~~~~~~~~~
+
+    Self-contained Facebook/Messenger/Archivist with in-memory keys for tests.
+
+    The crypto & format implementations come from 'dimplugins',
+    which must be installed to run the tests.
+"""
+
+import weakref
+from typing import Optional, List, Dict, Tuple
+
+from dimplugins import ExtensionLoader, PluginLoader
+
+from dimsdk import SymmetricKey, SymmetricAlgorithms
+from dimsdk import PrivateKey, SignKey, DecryptKey
+from dimsdk import ID, Meta, Document, BaseVisa
+from dimsdk import MetaType, EntityType
+from dimsdk import ReliableMessage
+from dimsdk import User, Group, BaseUser, BaseGroup
+from dimsdk import Barrack, Archivist, Facebook
+from dimsdk import CipherKeyDelegate, Compressor, Packer, Processor
+from dimsdk import MessageCompressor, MessageShortener
+from dimsdk import ContentProcessorFactory, BaseContentProcessorCreator, GeneralContentProcessorFactory
+from dimsdk import Messenger, MessagePacker, MessageProcessor
+from dimsdk import AsymmetricAlgorithms
+
+
+#
+#   Entities
+#
+
+class MemoryDatabase:
+    """ Metas, documents, private keys and group members """
+
+    def __init__(self):
+        super().__init__()
+        self.metas: Dict[ID, Meta] = {}
+        self.documents: Dict[ID, List[Document]] = {}
+        self.id_keys: Dict[ID, PrivateKey] = {}
+        self.msg_keys: Dict[ID, PrivateKey] = {}
+        self.founders: Dict[ID, ID] = {}
+        self.members: Dict[ID, List[ID]] = {}
+        self.local_users: List[ID] = []
+
+    def copy(self, local_users: List[ID]):
+        """ Share the entities with another endpoint, but select other local users """
+        db = MemoryDatabase()
+        db.metas = dict(self.metas)
+        db.documents = dict(self.documents)
+        db.id_keys = dict(self.id_keys)
+        db.msg_keys = dict(self.msg_keys)
+        db.founders = dict(self.founders)
+        db.members = dict(self.members)
+        db.local_users = list(local_users)
+        return db
+
+
+class MemoryBarrack(Barrack):
+
+    def __init__(self, facebook: Facebook):
+        super().__init__()
+        self.__facebook = weakref.ref(facebook)
+        self.__users: Dict[ID, User] = {}
+        self.__groups: Dict[ID, Group] = {}
+
+    # Override
+    def cache_user(self, user: User):
+        user.data_source = self.__facebook()
+        self.__users[user.identifier] = user
+
+    # Override
+    def cache_group(self, group: Group):
+        group.data_source = self.__facebook()
+        self.__groups[group.identifier] = group
+
+    # Override
+    def get_user(self, identifier: ID) -> Optional[User]:
+        return self.__users.get(identifier)
+
+    # Override
+    def get_group(self, identifier: ID) -> Optional[Group]:
+        return self.__groups.get(identifier)
+
+    # Override
+    def create_user(self, identifier: ID) -> Optional[User]:
+        return BaseUser(identifier=identifier)
+
+    # Override
+    def create_group(self, identifier: ID) -> Optional[Group]:
+        return BaseGroup(identifier=identifier)
+
+
+class MemoryArchivist(Archivist):
+
+    def __init__(self, database: MemoryDatabase):
+        super().__init__()
+        self.__db = database
+
+    # Override
+    async def save_meta(self, meta: Meta, identifier: ID) -> bool:
+        self.__db.metas[identifier] = meta
+        return True
+
+    # Override
+    async def save_document(self, document: Document, identifier: ID) -> bool:
+        self.__db.documents[identifier] = [document]
+        return True
+
+    # Override
+    async def get_local_users(self) -> List[ID]:
+        return self.__db.local_users
+
+
+class MemoryFacebook(Facebook):
+
+    def __init__(self, database: MemoryDatabase):
+        super().__init__()
+        self.__db = database
+        self.__barrack = MemoryBarrack(facebook=self)
+        self.__archivist = MemoryArchivist(database=database)
+
+    @property  # Override
+    def barrack(self) -> Optional[Barrack]:
+        return self.__barrack
+
+    @property  # Override
+    def archivist(self) -> Optional[Archivist]:
+        return self.__archivist
+
+    # Override
+    async def get_meta(self, identifier: ID) -> Optional[Meta]:
+        return self.__db.metas.get(identifier)
+
+    # Override
+    async def get_documents(self, identifier: ID) -> List[Document]:
+        return self.__db.documents.get(identifier, [])
+
+    # Override
+    async def get_contacts(self, identifier: ID) -> List[ID]:
+        return []
+
+    # Override
+    async def private_keys_for_decryption(self, identifier: ID) -> List[DecryptKey]:
+        key = self.__db.msg_keys.get(identifier)
+        return [] if key is None else [key]
+
+    # Override
+    async def private_key_for_signature(self, identifier: ID) -> Optional[SignKey]:
+        return self.__db.id_keys.get(identifier)
+
+    # Override
+    async def private_key_for_visa_signature(self, identifier: ID) -> Optional[SignKey]:
+        return self.__db.id_keys.get(identifier)
+
+    # Override
+    async def get_founder(self, identifier: ID) -> Optional[ID]:
+        return self.__db.founders.get(identifier)
+
+    # Override
+    async def get_owner(self, identifier: ID) -> Optional[ID]:
+        return self.__db.founders.get(identifier)
+
+    # Override
+    async def get_members(self, identifier: ID) -> List[ID]:
+        return self.__db.members.get(identifier, [])
+
+
+#
+#   Messenger
+#
+
+class MemoryKeyCache(CipherKeyDelegate):
+
+    def __init__(self):
+        super().__init__()
+        self.__keys: Dict[Tuple[ID, ID], SymmetricKey] = {}
+
+    # Override
+    async def get_cipher_key(self, sender: ID, receiver: ID, generate: bool = False) -> Optional[SymmetricKey]:
+        if receiver.is_broadcast:
+            return SymmetricKey.generate(algorithm=SymmetricAlgorithms.PLAIN)
+        key = self.__keys.get((sender, receiver))
+        if key is None and generate:
+            key = SymmetricKey.generate(algorithm=SymmetricAlgorithms.AES)
+            self.__keys[(sender, receiver)] = key
+        return key
+
+    # Override
+    async def cache_cipher_key(self, key: SymmetricKey, sender: ID, receiver: ID):
+        if not receiver.is_broadcast:
+            self.__keys[(sender, receiver)] = key
+
+
+class MemoryProcessor(MessageProcessor):
+
+    # Override
+    def _create_factory(self, facebook: Facebook, messenger: Messenger) -> ContentProcessorFactory:
+        creator = BaseContentProcessorCreator(facebook=facebook, messenger=messenger)
+        return GeneralContentProcessorFactory(creator=creator)
+
+
+class MemoryMessenger(Messenger):
+
+    def __init__(self, facebook: MemoryFacebook):
+        super().__init__()
+        self.__facebook = facebook
+        self.__key_cache = MemoryKeyCache()
+        self.__compressor = MessageCompressor(shortener=MessageShortener())
+        self.__packer = MessagePacker(facebook=facebook, messenger=self)
+        self.__processor = MemoryProcessor(facebook=facebook, messenger=self)
+
+    @property  # Override
+    def facebook(self) -> Facebook:
+        return self.__facebook
+
+    @property  # Override
+    def compressor(self) -> Compressor:
+        return self.__compressor
+
+    @property  # Override
+    def key_cache(self) -> Optional[CipherKeyDelegate]:
+        return self.__key_cache
+
+    @property  # Override
+    def packer(self) -> Optional[Packer]:
+        return self.__packer
+
+    @property  # Override
+    def processor(self) -> Optional[Processor]:
+        return self.__processor
+
+
+def create_endpoint(database: MemoryDatabase, local_users: List[ID]) -> MemoryMessenger:
+    facebook = MemoryFacebook(database=database.copy(local_users=local_users))
+    return MemoryMessenger(facebook=facebook)
+
+
+#
+#   Identities
+#
+
+def load_plugins():
+    ExtensionLoader().load()
+    PluginLoader().load()
+
+
+def create_user(database: MemoryDatabase, name: str, msg_key: PrivateKey = None) -> ID:
+    """
+    Create user with meta & visa
+
+    :param database: memory database
+    :param name:     ID.name
+    :param msg_key:  private key for decryption, shared by users to speed up the preparing
+    :return: user ID
+    """
+    id_key = PrivateKey.generate(algorithm=AsymmetricAlgorithms.ECC)
+    if msg_key is None:
+        msg_key = PrivateKey.generate(algorithm=AsymmetricAlgorithms.RSA)
+    meta = Meta.generate(version=MetaType.MKM, private_key=id_key, seed=name)
+    identifier = ID.generate(meta=meta, network=EntityType.USER)
+    visa = BaseVisa()
+    visa.set_property(name='did', value=str(identifier))
+    visa.public_key = msg_key.public_key
+    visa.sign(private_key=id_key)
+    visa['did'] = str(identifier)
+    database.metas[identifier] = meta
+    database.documents[identifier] = [visa]
+    database.id_keys[identifier] = id_key
+    database.msg_keys[identifier] = msg_key
+    return identifier
+
+
+def create_group(database: MemoryDatabase, founder: ID, members: List[ID], name: str = 'group') -> ID:
+    id_key = database.id_keys[founder]
+    meta = Meta.generate(version=MetaType.MKM, private_key=id_key, seed=name)
+    identifier = ID.generate(meta=meta, network=EntityType.GROUP)
+    database.metas[identifier] = meta
+    database.founders[identifier] = founder
+    database.members[identifier] = [founder] + [item for item in members if item != founder]
+    return identifier
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+#
+#   DIM-SDK : Decentralized Instant Messaging Software Development Kit
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+"""
+    Admission Tests
+    ~~~~~~~~~~~~~~~
+
+    Per-sender rate limiting before parsing messages.
+"""
+
+import unittest
+from typing import Optional
+
+from dimsdk import PrivateKey
+from dimsdk import Envelope, InstantMessage, ReliableMessage
+from dimsdk import TextContent
+from dimsdk import SenderRateLimiter
+
+from memory import MemoryDatabase, MemoryFacebook, MemoryMessenger
+from memory import create_user, create_endpoint, load_plugins
+
+
+load_plugins()
+
+
+class SenderRateLimiterTestCase(unittest.TestCase):
+
+    def test_burst(self):
+        limiter = SenderRateLimiter(rate=1.0, burst=3.0)
+        results = [limiter.admit(sender='alice', now=1.0) for _ in range(5)]
+        self.assertEqual(results, [True, True, True, False, False])
+        # other senders are not affected
+        self.assertTrue(limiter.admit(sender='bob', now=1.0))
+        self.assertEqual(limiter.get_metrics(), {'admitted': 4, 'rejected': 2})
+
+    def test_refill(self):
+        limiter = SenderRateLimiter(rate=2.0, burst=3.0)
+        for _ in range(3):
+            self.assertTrue(limiter.admit(sender='alice', now=1.0))
+        self.assertFalse(limiter.admit(sender='alice', now=1.0))
+        # 2 tokens per second
+        self.assertTrue(limiter.admit(sender='alice', now=1.5))
+        self.assertFalse(limiter.admit(sender='alice', now=1.5))
+        # never refilled over the burst
+        results = [limiter.admit(sender='alice', now=100.0) for _ in range(4)]
+        self.assertEqual(results, [True, True, True, False])
+
+    def test_collision(self):
+        # one bucket for all senders
+        limiter = SenderRateLimiter(rate=1.0, burst=2.0, width=1, rows=1)
+        self.assertTrue(limiter.admit(sender='alice', now=1.0))
+        self.assertTrue(limiter.admit(sender='alice', now=1.0))
+        self.assertFalse(limiter.admit(sender='bob', now=1.0))
+
+    def test_partial_collision(self):
+        width = 4
+        limiter = SenderRateLimiter(rate=1.0, burst=2.0, width=width, rows=2)
+
+        def slots(sender: str):
+            return [hash((row, sender)) % width for row in range(2)]
+
+        heavy = 'heavy'
+        light = None
+        for i in range(1000):
+            name = f'light{i}'
+            first, second = slots(name)
+            if first == slots(heavy)[0] and second != slots(heavy)[1]:
+                light = name
+                break
+        self.assertIsNotNone(light)
+        self.assertTrue(limiter.admit(sender=heavy, now=1.0))
+        self.assertTrue(limiter.admit(sender=heavy, now=1.0))
+        self.assertFalse(limiter.admit(sender=heavy, now=1.0))
+        # sharing one bucket with the heavy sender, but not all of them
+        self.assertTrue(limiter.admit(sender=light, now=1.0))
+
+
+class ProcessorAdmissionTestCase(unittest.IsolatedAsyncioTestCase):
+
+    async def test_drop_before_parsing(self):
+        db = MemoryDatabase()
+        key = PrivateKey.generate(algorithm='RSA')
+        alice = create_user(db, 'alice', key)
+        bob = create_user(db, 'bob', key)
+        parsed = []
+
+        class CountingMessenger(MemoryMessenger):
+
+            async def deserialize_message(self, data: bytes) -> Optional[ReliableMessage]:
+                parsed.append(data)
+                return await super().deserialize_message(data=data)
+
+        sender = create_endpoint(db, local_users=[alice])
+        receiver = CountingMessenger(facebook=MemoryFacebook(database=db.copy(local_users=[bob])))
+        receiver.processor.rate_limiter = SenderRateLimiter(rate=0.001, burst=1.0)
+        packages = []
+        for text in ('hello', 'world'):
+            msg = InstantMessage.create(head=Envelope.create(sender=alice, receiver=bob),
+                                        body=TextContent.create(text=text))
+            r_msg = await sender.sign_message(msg=await sender.encrypt_message(msg=msg))
+            packages.append(await sender.serialize_message(msg=r_msg))
+        self.assertEqual(len(await receiver.process_package(data=packages[0])), 1)
+        self.assertEqual(await receiver.process_package(data=packages[1]), [])
+        # the second one is dropped with its envelope only
+        self.assertEqual(parsed, packages[:1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+#
+#   DIM-SDK : Decentralized Instant Messaging Software Development Kit
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+"""
+    Archivist Tests
+    ~~~~~~~~~~~~~~~
+
+    Write-behind buffer for metas & documents.
+"""
+
+import unittest
+from typing import List
+
+from dimsdk import ID, Meta, Document
+from dimsdk import BufferedArchivist
+
+from memory import MemoryDatabase, MemoryArchivist
+from memory import create_user, load_plugins
+
+
+load_plugins()
+
+
+class _Storage(MemoryArchivist):
+
+    def __init__(self, database: MemoryDatabase):
+        super().__init__(database=database)
+        self.batches = []
+        self.failing = False
+        self.rejecting = False
+
+    async def save_metas(self, metas: List[Meta], identifiers: List[ID]) -> List[bool]:
+        if self.failing:
+            raise IOError('storage error')
+        self.batches.append(len(metas))
+        return await super().save_metas(metas=metas, identifiers=identifiers)
+
+    async def save_document(self, document: Document, identifier: ID) -> bool:
+        if self.rejecting:
+            # expired document
+            return False
+        return await super().save_document(document=document, identifier=identifier)
+
+
+class BufferedArchivistTestCase(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.source = MemoryDatabase()
+        self.users = [create_user(self.source, f'user{i}') for i in range(3)]
+        self.db = MemoryDatabase()
+        self.storage = _Storage(database=self.db)
+        self.archivist = BufferedArchivist(archivist=self.storage, interval=60)
+
+    async def asyncTearDown(self):
+        await self.archivist.close()
+
+    async def test_read_your_writes(self):
+        archivist = self.archivist
+        user = self.users[0]
+        meta = self.source.metas[user]
+        visa = self.source.documents[user][0]
+        self.assertTrue(await archivist.save_meta(meta=meta, identifier=user))
+        self.assertTrue(await archivist.save_document(document=visa, identifier=user))
+        # buffered, not written yet
+        self.assertIsNone(self.db.metas.get(user))
+        self.assertIs(archivist.peek_meta(identifier=user), meta)
+        self.assertEqual(archivist.peek_documents(identifier=user), [visa])
+        self.assertEqual(archivist.buffer_depth, 2)
+        # written in one batch
+        self.assertEqual(await archivist.flush(), 2)
+        self.assertIs(self.db.metas.get(user), meta)
+        self.assertIsNone(archivist.peek_meta(identifier=user))
+        self.assertEqual(archivist.buffer_depth, 0)
+
+    async def test_batch(self):
+        archivist = self.archivist
+        for user in self.users:
+            await archivist.save_meta(meta=self.source.metas[user], identifier=user)
+        await archivist.flush()
+        self.assertEqual(self.storage.batches, [len(self.users)])
+
+    async def test_restore(self):
+        archivist = self.archivist
+        user = self.users[0]
+        await archivist.save_meta(meta=self.source.metas[user], identifier=user)
+        self.storage.failing = True
+        with self.assertRaises(IOError):
+            await archivist.flush()
+        # kept for retrying
+        self.assertEqual(archivist.buffer_depth, 1)
+        self.assertIsNotNone(archivist.peek_meta(identifier=user))
+        self.assertIsInstance(archivist.last_error, IOError)
+        self.storage.failing = False
+        self.assertEqual(await archivist.flush(), 1)
+        self.assertEqual(archivist.get_metrics()['flush_errors'], 1)
+
+    async def test_rejected(self):
+        archivist = self.archivist
+        user = self.users[0]
+        visa = self.source.documents[user][0]
+        # acknowledged by the buffer
+        self.assertTrue(await archivist.save_document(document=visa, identifier=user))
+        self.storage.rejecting = True
+        self.assertEqual(await archivist.flush(), 1)
+        # but rejected by the storage
+        self.assertIsNone(self.db.documents.get(user))
+        self.assertEqual(archivist.get_metrics()['rejected_items'], 1)
+        self.assertEqual(archivist.pop_rejected(), [(user, visa)])
+        self.assertEqual(archivist.pop_rejected(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
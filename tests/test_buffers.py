@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+#
+#   DIM-SDK : Decentralized Instant Messaging Software Development Kit
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+"""
+    Buffer Tests
+    ~~~~~~~~~~~~
+
+    Decoded message data memoized between the packers.
+"""
+
+import unittest
+
+from dimsdk import PrivateKey
+from dimsdk import Envelope, InstantMessage, ReliableMessage
+from dimsdk import TextContent
+from dimsdk import MessageBuffers
+
+from memory import MemoryDatabase, create_user, create_endpoint, load_plugins
+
+
+load_plugins()
+
+
+class MessageBuffersTestCase(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        db = MemoryDatabase()
+        key = PrivateKey.generate(algorithm='RSA')
+        alice = create_user(db, 'alice', key)
+        bob = create_user(db, 'bob', key)
+        self.sender = create_endpoint(db, local_users=[alice])
+        self.receiver = create_endpoint(db, local_users=[bob])
+        self.msg = InstantMessage.create(head=Envelope.create(sender=alice, receiver=bob),
+                                         body=TextContent.create(text='hello ' * 100))
+
+    async def _pack(self) -> ReliableMessage:
+        s_msg = await self.sender.encrypt_message(msg=self.msg)
+        return await self.sender.sign_message(msg=s_msg)
+
+    async def test_small_payload(self):
+        r_msg = await self._pack()
+        buffers = self.receiver.packer.reliable_packer.buffers
+        s_msg = await self.receiver.verify_message(msg=r_msg)
+        # small data is not memoized
+        self.assertIsNone(buffers.get_buffer(msg=s_msg, name='data'))
+        i_msg = await self.receiver.decrypt_message(msg=s_msg)
+        self.assertEqual(i_msg.content.get('text'), self.msg.content.get('text'))
+
+    async def test_large_payload(self):
+        r_msg = await self._pack()
+        buffers = self.receiver.packer.reliable_packer.buffers
+        size = buffers.large_payload_size
+        buffers.large_payload_size = 16
+        try:
+            s_msg = await self.receiver.verify_message(msg=r_msg)
+            self.assertIsNotNone(buffers.get_buffer(msg=s_msg, name='data'))
+            i_msg = await self.receiver.decrypt_message(msg=s_msg)
+        finally:
+            buffers.large_payload_size = size
+        self.assertEqual(i_msg.content.get('text'), self.msg.content.get('text'))
+        # released after decrypting
+        self.assertIsNone(buffers.get_buffer(msg=s_msg, name='data'))
+
+    async def test_replaced_data(self):
+        buffers = MessageBuffers()
+        s_msg = await self.sender.encrypt_message(msg=self.msg)
+        other = await self.sender.encrypt_message(msg=self.msg)
+        buffers.set_buffer(msg=s_msg, name='data', buffer=b'decoded')
+        self.assertEqual(buffers.get_buffer(msg=s_msg, name='data'), b'decoded')
+        # the memoized buffer must not outlive the field it was decoded from
+        s_msg['data'] = other['data']
+        self.assertIsNone(buffers.get_buffer(msg=s_msg, name='data'))
+        self.assertIsNone(buffers.pop_buffer(msg=s_msg, name='data'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+#
+#   DIM-SDK : Decentralized Instant Messaging Software Development Kit
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+"""
+    Bundle Tests
+    ~~~~~~~~~~~~
+
+    Encrypted bundles for terminal-specific key data.
+"""
+
+import unittest
+
+from dimplugins import ExtensionLoader, PluginLoader
+
+from dimsdk import ID
+from dimsdk import EncryptedBundle, SingleEncryptedBundle
+
+
+ExtensionLoader().load()
+PluginLoader().load()
+
+
+class BundleTestCase(unittest.TestCase):
+
+    def test_another_terminal(self):
+        bundle = EncryptedBundle.create(dictionary={'home': b'key1'})
+        self.assertIsInstance(bundle, SingleEncryptedBundle)
+        # upgraded for the second terminal
+        bundle['work'] = b'key2'
+        self.assertEqual(len(bundle), 2)
+        self.assertEqual(bundle.to_map(), {'home': b'key1', 'work': b'key2'})
+        self.assertEqual(bundle['home'], b'key1')
+        identifier = ID.parse(identifier='alice@4WDfe3zZ4T7opFSi3iDAKiuTnUHjxmXekk')
+        keys = bundle.encode(identifier=identifier)
+        self.assertEqual(set(keys.keys()), {f'{identifier}/home', f'{identifier}/work'})
+        decoded = EncryptedBundle.decode(keys=keys, identifier=identifier, terminals=['home', 'work'])
+        self.assertEqual(decoded.to_map(), bundle.to_map())
+        del bundle['home']
+        self.assertEqual(list(bundle), ['work'])
+        self.assertEqual(bundle.pop('work'), b'key2')
+        self.assertTrue(bundle.is_empty)
+
+
+if __name__ == '__main__':
+    unittest.main()
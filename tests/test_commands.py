@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+#
+#   DIM-SDK : Decentralized Instant Messaging Software Development Kit
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+"""
+    Command Processor Tests
+    ~~~~~~~~~~~~~~~~~~~~~~~
+
+    Meta validation cache of the meta & document command processors.
+"""
+
+import unittest
+
+from dimsdk import PrivateKey
+from dimsdk import ID, Meta
+from dimsdk import MetaCommand
+from dimsdk import MetaValidationCache
+from dimsdk import MetaCommandProcessor, DocumentCommandProcessor
+from dimsdk import BaseContentProcessorCreator
+
+from memory import MemoryDatabase
+from memory import create_user, create_endpoint, load_plugins
+
+
+load_plugins()
+
+
+class _CountingProcessor(MetaCommandProcessor):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.verified = 0
+
+    def _verify_meta(self, meta: Meta, identifier: ID) -> bool:
+        self.verified += 1
+        return super()._verify_meta(meta=meta, identifier=identifier)
+
+
+class MetaValidationCacheTestCase(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        db = MemoryDatabase()
+        key = PrivateKey.generate(algorithm='RSA')
+        self.db = db
+        self.users = [create_user(db, f'user{i}', key) for i in range(3)]
+        self.messenger = create_endpoint(db, local_users=[self.users[0]])
+
+    def _processor(self, meta_cache: MetaValidationCache = None) -> _CountingProcessor:
+        messenger = self.messenger
+        return _CountingProcessor(facebook=messenger.facebook, messenger=messenger, meta_cache=meta_cache)
+
+    async def test_hit_and_miss(self):
+        cache = MetaValidationCache()
+        cpu = self._processor(meta_cache=cache)
+        user = self.users[1]
+        meta = self.db.metas[user]
+        self.assertTrue(await cpu._check_meta(meta=meta, identifier=user))
+        self.assertTrue(await cpu._check_meta(meta=meta, identifier=user))
+        # verified once, then got from the cache
+        self.assertEqual(cpu.verified, 1)
+        self.assertEqual(len(cache), 1)
+        # another meta is a miss
+        other = self.users[2]
+        self.assertTrue(await cpu._check_meta(meta=self.db.metas[other], identifier=other))
+        self.assertEqual(cpu.verified, 2)
+
+    async def test_invalid_meta(self):
+        cache = MetaValidationCache()
+        cpu = self._processor(meta_cache=cache)
+        alice, bob = self.users[1], self.users[2]
+        # bob's meta does not match alice's ID
+        meta = self.db.metas[bob]
+        self.assertFalse(await cpu._check_meta(meta=meta, identifier=alice))
+        self.assertFalse(await cpu._check_meta(meta=meta, identifier=alice))
+        self.assertEqual(cache.get(cache.cache_key(meta=meta, identifier=alice)), False)
+        # still valid for its own ID
+        self.assertTrue(await cpu._check_meta(meta=meta, identifier=bob))
+        self.assertEqual(cpu.verified, 2)
+
+    def test_eviction(self):
+        cache = MetaValidationCache(capacity=2)
+        cache.put(('a', b'1'), True)
+        cache.put(('b', b'2'), True)
+        # touch 'a', so 'b' is the eldest one
+        self.assertTrue(cache.get(('a', b'1')))
+        cache.put(('c', b'3'), False)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get(('b', b'2')))
+        self.assertTrue(cache.get(('a', b'1')))
+        self.assertFalse(cache.get(('c', b'3')))
+
+    def test_injected(self):
+        messenger = self.messenger
+        # not shared between processors by default
+        one = MetaCommandProcessor(facebook=messenger.facebook, messenger=messenger)
+        two = MetaCommandProcessor(facebook=messenger.facebook, messenger=messenger)
+        self.assertIsNot(one.meta_cache, two.meta_cache)
+        # shared by the processors created by the same creator
+        cache = MetaValidationCache()
+        creator = BaseContentProcessorCreator(facebook=messenger.facebook, messenger=messenger, meta_cache=cache)
+        meta_cpu = creator.create_command_processor(msg_type='', cmd=MetaCommand.META)
+        docs_cpu = creator.create_command_processor(msg_type='', cmd=MetaCommand.DOCUMENTS)
+        self.assertIsInstance(docs_cpu, DocumentCommandProcessor)
+        self.assertIs(meta_cpu.meta_cache, cache)
+        self.assertIs(docs_cpu.meta_cache, cache)
+
+
+if __name__ == '__main__':
+    unittest.main()
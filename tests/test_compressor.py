@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+#
+#   DIM-SDK : Decentralized Instant Messaging Software Development Kit
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+"""
+    Compressor Tests
+    ~~~~~~~~~~~~~~~~
+
+    Message envelope for routing must be the same as the one of the full message,
+    and packages rejected by the JSON decoder must not be routed.
+"""
+
+import unittest
+
+from dimsdk import PrivateKey
+from dimsdk import Envelope, InstantMessage, TextContent
+
+from memory import MemoryDatabase
+from memory import create_user, create_group, create_endpoint, load_plugins
+
+
+load_plugins()
+
+
+class EnvelopeTestCase(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        db = MemoryDatabase()
+        key = PrivateKey.generate(algorithm='RSA')
+        users = [create_user(db, f'user{i}', key) for i in range(4)]
+        group = create_group(db, founder=users[0], members=users[1:])
+        messenger = create_endpoint(db, local_users=[users[0]])
+        self.messenger = messenger
+        self.packages = []
+        for receiver in [users[1], group]:
+            msg = InstantMessage.create(head=Envelope.create(sender=users[0], receiver=receiver),
+                                        body=TextContent.create(text='hello'))
+            s_msg = await messenger.encrypt_message(msg=msg)
+            r_msg = await messenger.sign_message(msg=s_msg)
+            self.packages.append(await messenger.serialize_message(msg=r_msg))
+
+    async def test_round_trip(self):
+        messenger = self.messenger
+        for data in self.packages:
+            env = await messenger.deserialize_envelope(data=data)
+            msg = await messenger.deserialize_message(data=data)
+            self.assertEqual(env.sender, msg.sender)
+            self.assertEqual(env.receiver, msg.receiver)
+            self.assertEqual(env.time, msg.time)
+            self.assertEqual(env.group, msg.group)
+            # network buffer
+            env = await messenger.deserialize_envelope(data=memoryview(bytearray(data)))
+            self.assertEqual(env.receiver, msg.receiver)
+
+    async def test_malformed(self):
+        compressor = self.messenger.compressor
+        samples = [
+            self.packages[0] + b' trailing garbage',
+            self.packages[0][:-1] + b',}',
+            self.packages[0][:-1],
+        ]
+        for data in samples:
+            with self.assertRaises(ValueError):
+                compressor.extract_message_envelope(data=data)
+
+
+if __name__ == '__main__':
+    unittest.main()
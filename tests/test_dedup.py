@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+#
+#   DIM-SDK : Decentralized Instant Messaging Software Development Kit
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+"""
+    Duplicate Tests
+    ~~~~~~~~~~~~~~~
+
+    Rotating Bloom filter & message fingerprint for suppressing duplicates.
+"""
+
+import os
+import time
+import unittest
+
+from dimplugins import ExtensionLoader, PluginLoader
+
+from dimsdk import ReliableMessage
+from dimsdk import MessageProcessor
+from dimsdk import RotatingBloomFilter
+
+
+ExtensionLoader().load()
+PluginLoader().load()
+
+
+class BloomFilterTestCase(unittest.TestCase):
+
+    def test_contains(self):
+        # no confirmation, check the false positive rate of the Bloom filter
+        bloom = RotatingBloomFilter(capacity=1000, window=10, recent=0)
+        keys = [os.urandom(16) for _ in range(1000)]
+        for key in keys:
+            bloom.add(key=key, now=1.0)
+        for key in keys:
+            self.assertTrue(bloom.contains(key=key, now=2.0))
+        others = sum(bloom.contains(key=os.urandom(16), now=2.0) for _ in range(1000))
+        self.assertLess(others, 20)
+
+    def test_window(self):
+        bloom = RotatingBloomFilter(capacity=1000, window=10)
+        now = time.time()
+        bloom.add(key=b'key', now=now + 1)
+        # remembered for at least one window, forgotten after two
+        self.assertTrue(bloom.contains(key=b'key', now=now + 15))
+        self.assertFalse(bloom.contains(key=b'key', now=now + 25))
+
+    def test_false_positive(self):
+        keys = [os.urandom(16) for _ in range(10)]
+        others = [os.urandom(16) for _ in range(1000)]
+        # a crowded filter, most of the other keys will be hits
+        trusted = RotatingBloomFilter(capacity=10, error_rate=0.5, window=10, recent=0)
+        confirmed = RotatingBloomFilter(capacity=10, error_rate=0.5, window=10)
+        for key in keys:
+            trusted.add(key=key, now=1.0)
+            confirmed.add(key=key, now=1.0)
+        hits = sum(trusted.contains(key=key, now=2.0) for key in others)
+        self.assertGreater(hits, 100)
+        self.assertEqual(trusted.get_metrics()['hits'], hits)
+        # never lose a new message by false positive
+        self.assertEqual(sum(confirmed.contains(key=key, now=2.0) for key in others), 0)
+        for key in keys:
+            self.assertTrue(confirmed.contains(key=key, now=2.0))
+        metrics = confirmed.get_metrics()
+        self.assertEqual(metrics['hits'], len(keys))
+        self.assertEqual(metrics['unconfirmed'], hits)
+
+    def test_recent(self):
+        bloom = RotatingBloomFilter(capacity=1000, window=10, recent=2)
+        for key in (b'k1', b'k2', b'k3'):
+            bloom.add(key=key, now=1.0)
+        # too old to confirm, let it through
+        self.assertFalse(bloom.contains(key=b'k1', now=2.0))
+        self.assertTrue(bloom.contains(key=b'k3', now=2.0))
+        metrics = bloom.get_metrics()
+        self.assertEqual(metrics['recent_count'], 2)
+        self.assertEqual(metrics['unconfirmed'], 1)
+
+
+class FingerprintTestCase(unittest.TestCase):
+
+    @staticmethod
+    def _message(receiver: str, group: str = None) -> ReliableMessage:
+        info = {
+            'sender': 'alice@4WDfe3zZ4T7opFSi3iDAKiuTnUHjxmXekk',
+            'receiver': receiver,
+            'time': 1760000000.0,
+            'data': 'AAAA',
+            'key': 'AAAA',
+            'signature': 'c2lnbmF0dXJl',
+        }
+        if group is not None:
+            info['group'] = group
+        msg = ReliableMessage.parse(msg=info)
+        assert msg is not None, f'message error: {info}'
+        return msg
+
+    def test_split_copies(self):
+        # copies split for group members share the sender, time & signature
+        group = 'group@7THVZeDmXRVGDgCyKbQpTcGSgM7KFHjJZU'
+        bob = self._message(receiver='bob@4t2KoiA9nBqbXR9wrrSKh8cCZAu7vaCDiU', group=group)
+        carol = self._message(receiver='carol@4X8uFuVSLSbDP5bmNSdgu3Xwx5xPuW8Lm2', group=group)
+        fingerprint = MessageProcessor._get_fingerprint
+        self.assertNotEqual(fingerprint(None, msg=bob), fingerprint(None, msg=carol))
+        self.assertEqual(fingerprint(None, msg=bob), fingerprint(None, msg=self._message(
+            receiver='bob@4t2KoiA9nBqbXR9wrrSKh8cCZAu7vaCDiU', group=group
+        )))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+#
+#   DIM-SDK : Decentralized Instant Messaging Software Development Kit
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+"""
+    Export Tests
+    ~~~~~~~~~~~~
+
+    Public names of 'dimsdk' (loaded lazily) and the shared extensions.
+"""
+
+import os
+import subprocess
+import sys
+import unittest
+
+import dimsdk
+
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _run(code: str) -> str:
+    return subprocess.check_output([sys.executable, '-c', code], cwd=_ROOT, text=True)
+
+
+class ExportTestCase(unittest.TestCase):
+
+    def test_public_names(self):
+        names = dimsdk.__all__
+        self.assertEqual(len(names), len(set(names)), 'duplicated names')
+        for name in names:
+            self.assertIsNotNone(getattr(dimsdk, name), name)
+
+    def test_own_extensions_kept(self):
+        # fresh process, so the subpackages are loaded after the app sets its own extensions
+        code = '\n'.join([
+            'import dimsdk',
+            'from dimp import shared_account_extensions as account, shared_message_extensions as message',
+            'class Mine: pass',
+            'account.visa_agent = Mine()',
+            'account.bundle_helper = Mine()',
+            'message.packer_factory = Mine()',
+            'from dimsdk import Facebook, MessagePacker, EncryptedBundle, VisaAgent',
+            'print(type(account.visa_agent).__name__, type(account.bundle_helper).__name__,',
+            '      type(message.packer_factory).__name__)',
+        ])
+        output = _run(code)
+        self.assertEqual(output.split(), ['Mine', 'Mine', 'Mine'])
+
+    def test_default_extensions(self):
+        code = '\n'.join([
+            'from dimsdk import Facebook',
+            'from dimp import shared_account_extensions as account, shared_message_extensions as message',
+            'print(type(account.visa_agent).__name__, type(account.bundle_helper).__name__,',
+            '      type(message.packer_factory).__name__)',
+        ])
+        output = _run(code)
+        self.assertEqual(output.split(), ['DefaultVisaAgent', 'DefaultBundleHelper', 'MessagePackerFactory'])
+
+
+if __name__ == '__main__':
+    unittest.main()
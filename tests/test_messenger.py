@@ -0,0 +1,489 @@
+# -*- coding: utf-8 -*-
+#
+#   DIM-SDK : Decentralized Instant Messaging Software Development Kit
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+"""
+    Messenger Tests
+    ~~~~~~~~~~~~~~~
+
+    End-to-end behaviours of the messenger pipeline,
+    with the in-memory stand-ins.
+"""
+
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List
+
+from dimsdk import StrMap
+from dimsdk import PrivateKey, SymmetricKey, EncryptedBundle
+from dimsdk import ID, Meta, Document, BaseBulletin, BaseVisa
+from dimsdk import Envelope, InstantMessage, ReliableMessage
+from dimsdk import Content, TextContent, DocumentCommand
+from dimsdk import Archivist, BufferedArchivist
+from dimsdk import MessagePacker
+from dimsdk import DocumentCommandProcessor
+
+from memory import MemoryDatabase, MemoryArchivist, MemoryFacebook, MemoryMessenger, MemoryProcessor
+from memory import create_user, create_group, create_endpoint, load_plugins
+
+
+load_plugins()
+
+
+class GroupKeysTestCase(unittest.IsolatedAsyncioTestCase):
+
+    async def test_encode_keys_override(self):
+        db = MemoryDatabase()
+        key = PrivateKey.generate(algorithm='RSA')
+        users = [create_user(db, f'user{i}', key) for i in range(4)]
+        group = create_group(db, founder=users[0], members=users[1:])
+        receivers = []
+
+        class CustomMessenger(MemoryMessenger):
+
+            async def encode_keys(self, bundle: EncryptedBundle, receiver: ID, msg: InstantMessage) -> StrMap:
+                receivers.append(receiver)
+                return await super().encode_keys(bundle=bundle, receiver=receiver, msg=msg)
+
+        messenger = CustomMessenger(facebook=MemoryFacebook(database=db.copy(local_users=[users[0]])))
+        msg = InstantMessage.create(head=Envelope.create(sender=users[0], receiver=group),
+                                    body=TextContent.create(text='hello'))
+        s_msg = await messenger.encrypt_message(msg=msg)
+        self.assertIsNotNone(s_msg)
+        # the batch encoding must not skip the customized method
+        self.assertEqual(len(s_msg.encrypted_keys), len(receivers))
+        self.assertTrue(len(receivers) >= 3)
+
+
+class HiddenGroupTestCase(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        db = MemoryDatabase()
+        key = PrivateKey.generate(algorithm='RSA')
+        self.db = db
+        self.users = [create_user(db, f'user{i}', key) for i in range(4)]
+        self.group = create_group(db, founder=self.users[0], members=self.users[1:])
+
+    def _message(self) -> InstantMessage:
+        return InstantMessage.create(head=Envelope.create(sender=self.users[0], receiver=self.group),
+                                     body=TextContent.create(text='hello'))
+
+    async def _decrypt(self, msg: ReliableMessage) -> InstantMessage:
+        endpoint = create_endpoint(self.db, local_users=[msg.receiver])
+        s_msg = await endpoint.verify_message(msg=msg)
+        return await endpoint.decrypt_message(msg=s_msg)
+
+    async def test_split(self):
+
+        class OffloadMessenger(MemoryMessenger):
+
+            @property
+            def offload_key_encryption(self) -> bool:
+                return True
+
+        messenger = OffloadMessenger(facebook=MemoryFacebook(database=self.db.copy(local_users=[self.users[0]])))
+        msg = self._message()
+        with ThreadPoolExecutor(2) as executor:
+            messages = await messenger.packer.split_group_message(msg=msg, executor=executor)
+        self.assertEqual(len(messages), 3)
+        # the caller's content is untouched
+        self.assertIsNone(msg.content.group)
+        for r_msg in messages:
+            self.assertIsNone(r_msg.get('group'))
+            i_msg = await self._decrypt(msg=r_msg)
+            self.assertEqual(i_msg.content.group, self.group)
+            self.assertEqual(i_msg.content.get('text'), 'hello')
+
+    async def test_encrypt_key_override(self):
+        receivers = []
+
+        class CustomMessenger(MemoryMessenger):
+
+            async def encrypt_key(self, data: bytes, receiver: ID, msg: InstantMessage) -> Optional[EncryptedBundle]:
+                receivers.append(receiver)
+                return await super().encrypt_key(data=data, receiver=receiver, msg=msg)
+
+        messenger = CustomMessenger(facebook=MemoryFacebook(database=self.db.copy(local_users=[self.users[0]])))
+        with ThreadPoolExecutor(2) as executor:
+            messages = await messenger.packer.split_group_message(msg=self._message(), executor=executor)
+        self.assertEqual(len(messages), 3)
+        # the executor must not skip the customized method
+        self.assertEqual(set(receivers), set(self.users[1:]))
+
+    async def test_reused_key(self):
+
+        class ReusedKeyMessenger(MemoryMessenger):
+
+            async def serialize_key(self, key: SymmetricKey, msg: InstantMessage) -> Optional[bytes]:
+                # the members have got the key before
+                return None
+
+        messenger = ReusedKeyMessenger(facebook=MemoryFacebook(database=self.db.copy(local_users=[self.users[0]])))
+        # overt group: split for each member without 'keys'
+        messages = await messenger.packer.encrypt_and_sign_many(msg=self._message())
+        self.assertEqual([msg.receiver for msg in messages], self.users[1:])
+        for r_msg in messages:
+            self.assertEqual(r_msg.group, self.group)
+            self.assertIsNone(r_msg.get('keys'))
+        # hidden group: never leak the group ID in a shared message
+        messages = await messenger.packer.split_group_message(msg=self._message())
+        self.assertEqual([msg.receiver for msg in messages], self.users[1:])
+        for r_msg in messages:
+            self.assertIsNone(r_msg.get('group'))
+
+
+class GroupCacheTestCase(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        db = MemoryDatabase()
+        key = PrivateKey.generate(algorithm='RSA')
+        self.db = db
+        self.users = [create_user(db, f'user{i}', key) for i in range(4)]
+        self.group = create_group(db, founder=self.users[0], members=self.users[1:])
+
+    async def test_bulletin(self):
+        founder = self.users[0]
+        alice_db = self.db.copy(local_users=[self.users[1]])
+        messenger = MemoryMessenger(facebook=MemoryFacebook(database=alice_db))
+        group = await messenger.facebook.get_group(identifier=self.group)
+        self.assertEqual(len(await group.members), 4)
+        # membership changed with a new bulletin
+        alice_db.members[self.group] = self.users[:3]
+        bulletin = BaseBulletin()
+        bulletin.set_property(name='did', value=str(self.group))
+        bulletin.name = 'group'
+        bulletin.sign(private_key=self.db.id_keys[founder])
+        bulletin['did'] = str(self.group)
+        content = DocumentCommand.response(identifier=self.group, documents=[bulletin])
+        sender = create_endpoint(self.db, local_users=[founder])
+        msg = InstantMessage.create(head=Envelope.create(sender=founder, receiver=self.users[1]), body=content)
+        r_msg = await sender.sign_message(msg=await sender.encrypt_message(msg=msg))
+        await messenger.processor.process_content(content=content, r_msg=r_msg)
+        self.assertEqual(await group.members, self.users[:3])
+
+    async def test_select_member(self):
+        member = create_endpoint(self.db, local_users=[self.users[2]])
+        user = await member.processor.select_local_user(receiver=self.group)
+        self.assertEqual(user.identifier, self.users[2])
+        outsider = create_user(self.db, 'outsider')
+        stranger = create_endpoint(self.db, local_users=[outsider])
+        self.assertIsNone(await stranger.processor.select_local_user(receiver=self.group))
+
+    async def test_members_not_found(self):
+
+        class EmptyFacebook(MemoryFacebook):
+
+            async def get_members(self, identifier: ID) -> List[ID]:
+                pass
+
+        messenger = MemoryMessenger(facebook=EmptyFacebook(database=self.db.copy(local_users=[self.users[0]])))
+        group = await messenger.facebook.get_group(identifier=self.group)
+        self.assertIsNone(await group.members)
+        msg = InstantMessage.create(head=Envelope.create(sender=self.users[0], receiver=self.group),
+                                    body=TextContent.create(text='hello'))
+        self.assertIsNone(await messenger.packer.encrypt_message(msg=msg))
+
+
+class RoutingTestCase(unittest.IsolatedAsyncioTestCase):
+
+    async def test_forward_not_implemented(self):
+        db = MemoryDatabase()
+        key = PrivateKey.generate(algorithm='RSA')
+        alice, bob, carol = [create_user(db, name, key) for name in ('alice', 'bob', 'carol')]
+        sender = create_endpoint(db, local_users=[alice])
+        msg = InstantMessage.create(head=Envelope.create(sender=alice, receiver=bob),
+                                    body=TextContent.create(text='hello'))
+        r_msg = await sender.sign_message(msg=await sender.encrypt_message(msg=msg))
+        data = await sender.serialize_message(msg=r_msg)
+        # carol routes the package for bob
+        router = create_endpoint(db, local_users=[carol])
+        router.processor.routing = True
+        with self.assertRaises(NotImplementedError):
+            await router.process_package(data=data)
+        forwarded = []
+
+        class RouterProcessor(MemoryProcessor):
+
+            async def _forward_package(self, data: bytes, envelope: Envelope) -> List[bytes]:
+                forwarded.append(envelope.receiver)
+                return []
+
+        processor = RouterProcessor(facebook=router.facebook, messenger=router, routing=True)
+        self.assertEqual(await processor.process_package(data=data), [])
+        self.assertEqual(forwarded, [bob])
+
+
+class StreamingTestCase(unittest.IsolatedAsyncioTestCase):
+
+    async def test_first_package_before_last_response(self):
+        db = MemoryDatabase()
+        key = PrivateKey.generate(algorithm='RSA')
+        alice = create_user(db, 'alice', key)
+        bob = create_user(db, 'bob', key)
+        events = []
+
+        class StreamingProcessor(MemoryProcessor):
+
+            async def iter_process_content(self, content: Content, r_msg: ReliableMessage):
+                for text in ('one', 'two'):
+                    events.append(f'response {text}')
+                    yield TextContent.create(text=text)
+
+        class StreamingMessenger(MemoryMessenger):
+
+            def __init__(self, facebook: MemoryFacebook):
+                super().__init__(facebook=facebook)
+                self.__processor = StreamingProcessor(facebook=facebook, messenger=self)
+
+            @property
+            def processor(self) -> StreamingProcessor:
+                return self.__processor
+
+        sender = create_endpoint(db, local_users=[alice])
+        receiver = StreamingMessenger(facebook=MemoryFacebook(database=db.copy(local_users=[bob])))
+        msg = InstantMessage.create(head=Envelope.create(sender=alice, receiver=bob),
+                                    body=TextContent.create(text='hello'))
+        r_msg = await sender.sign_message(msg=await sender.encrypt_message(msg=msg))
+        data = await sender.serialize_message(msg=r_msg)
+        async for _ in receiver.iter_process_package(data=data):
+            events.append('package')
+        # the first package is yielded before the second response is created
+        self.assertEqual(events, ['response one', 'package', 'response two', 'package'])
+        # the list entry runs through the same pipeline
+        responses = await receiver.process_reliable_message(msg=r_msg)
+        self.assertEqual(len(responses), 2)
+        self.assertTrue(all(res.receiver == alice for res in responses))
+
+
+class SuspendedMessageTestCase(unittest.IsolatedAsyncioTestCase):
+
+    async def test_resume_with_buffered_meta(self):
+        db = MemoryDatabase()
+        key = PrivateKey.generate(algorithm='RSA')
+        alice = create_user(db, 'alice', key)
+        bob = create_user(db, 'bob', key)
+        sender = create_endpoint(db, local_users=[alice])
+        # bob knows nothing about alice
+        bob_db = db.copy(local_users=[bob])
+        bob_db.metas.pop(alice)
+        bob_db.documents.pop(alice)
+        buffered = BufferedArchivist(archivist=MemoryArchivist(database=bob_db), interval=60)
+
+        class BufferedFacebook(MemoryFacebook):
+
+            @property
+            def archivist(self) -> Optional[Archivist]:
+                return buffered
+
+        receiver = MemoryMessenger(facebook=BufferedFacebook(database=bob_db))
+        msg = InstantMessage.create(head=Envelope.create(sender=alice, receiver=bob),
+                                    body=TextContent.create(text='hello'))
+        r_msg = await sender.sign_message(msg=await sender.encrypt_message(msg=msg))
+        r_msg.pop('meta', None)
+        r_msg.pop('visa', None)
+        self.assertEqual(await receiver.process_reliable_message(msg=r_msg), [])
+        self.assertEqual(len(receiver.suspended_messages), 1)
+        # meta & visa saved into the buffer, not flushed yet
+        await buffered.save_meta(meta=db.metas[alice], identifier=alice)
+        await buffered.save_document(document=db.documents[alice][0], identifier=alice)
+        responses = await receiver.processor.resume_messages(identifier=alice)
+        self.assertEqual(len(responses), 1)
+        self.assertEqual(len(receiver.suspended_messages), 0)
+        await buffered.close()
+
+    async def test_resume_flushes_archivist(self):
+        db = MemoryDatabase()
+        key = PrivateKey.generate(algorithm='RSA')
+        alice = create_user(db, 'alice', key)
+        bob = create_user(db, 'bob', key)
+        bob_db = db.copy(local_users=[bob])
+        flushed = []
+
+        class StorageArchivist(MemoryArchivist):
+
+            async def flush(self) -> int:
+                flushed.append(alice)
+                return 0
+
+        archivist = StorageArchivist(database=bob_db)
+
+        class StorageFacebook(MemoryFacebook):
+
+            @property
+            def archivist(self) -> Optional[Archivist]:
+                return archivist
+
+        receiver = MemoryMessenger(facebook=StorageFacebook(database=bob_db))
+        msg = InstantMessage.create(head=Envelope.create(sender=bob, receiver=alice),
+                                    body=TextContent.create(text='hello'))
+        receiver.suspended_messages.suspend(msg=msg, waiting=[alice])
+        responses = await receiver.processor.resume_messages(identifier=alice)
+        # any archivist is flushed before resuming
+        self.assertEqual(flushed, [alice])
+        self.assertEqual(len(responses), 1)
+
+
+class MissingVisaTestCase(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        db = MemoryDatabase()
+        key = PrivateKey.generate(algorithm='RSA')
+        self.db = db
+        self.alice, self.bob, self.carol = [create_user(db, name, key) for name in ('alice', 'bob', 'carol')]
+        self.group = create_group(db, founder=self.alice, members=[self.bob, self.carol])
+        # alice has not got carol's visa yet
+        alice_db = db.copy(local_users=[self.alice])
+        alice_db.documents.pop(self.carol)
+        self.alice_db = alice_db
+        self.sender = MemoryMessenger(facebook=MemoryFacebook(database=alice_db))
+
+    def _message(self) -> InstantMessage:
+        return InstantMessage.create(head=Envelope.create(sender=self.alice, receiver=self.group),
+                                     body=TextContent.create(text='hello'))
+
+    async def _resume(self) -> List[ReliableMessage]:
+        self.alice_db.documents[self.carol] = self.db.documents[self.carol]
+        return await self.sender.processor.resume_messages(identifier=self.carol)
+
+    async def _decrypt(self, msg: ReliableMessage) -> InstantMessage:
+        endpoint = create_endpoint(self.db, local_users=[msg.receiver])
+        s_msg = await endpoint.verify_message(msg=msg)
+        return await endpoint.decrypt_message(msg=s_msg)
+
+    async def test_overt_group(self):
+        messages = await self.sender.packer.encrypt_and_sign_many(msg=self._message())
+        self.assertEqual([msg.receiver for msg in messages], [self.bob])
+        self.assertEqual(self.sender.packer.pop_waiting_visas(), [self.carol])
+        # a copy is waiting for carol only
+        resumed = await self._resume()
+        self.assertEqual([msg.receiver for msg in resumed], [self.carol])
+        self.assertEqual(resumed[0].group, self.group)
+        i_msg = await self._decrypt(msg=resumed[0])
+        self.assertEqual(i_msg.content.get('text'), 'hello')
+
+    async def test_hidden_group(self):
+        messages = await self.sender.packer.split_group_message(msg=self._message())
+        self.assertEqual([msg.receiver for msg in messages], [self.bob])
+        resumed = await self._resume()
+        self.assertEqual([msg.receiver for msg in resumed], [self.carol])
+        self.assertIsNone(resumed[0].get('group'))
+        i_msg = await self._decrypt(msg=resumed[0])
+        self.assertEqual(i_msg.content.group, self.group)
+
+    async def test_resumed_outbox(self):
+        messages = await self.sender.packer.encrypt_and_sign_many(msg=self._message())
+        self.assertEqual([msg.receiver for msg in messages], [self.bob])
+        # carol's visa arrived, the default processor keeps the resumed message
+        carol = create_endpoint(self.db, local_users=[self.carol])
+        command = DocumentCommand.response(identifier=self.carol, meta=self.db.metas[self.carol],
+                                           documents=self.db.documents[self.carol])
+        msg = InstantMessage.create(head=Envelope.create(sender=self.carol, receiver=self.alice), body=command)
+        r_msg = await carol.sign_message(msg=await carol.encrypt_message(msg=msg))
+        await self.sender.processor.process_content(content=command, r_msg=r_msg)
+        resumed = self.sender.processor.pop_resumed_messages()
+        self.assertEqual([msg.receiver for msg in resumed], [self.carol])
+        self.assertEqual(self.sender.processor.pop_resumed_messages(), [])
+        i_msg = await self._decrypt(msg=resumed[0])
+        self.assertEqual(i_msg.content.get('text'), 'hello')
+
+
+class VisaKeyTestCase(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        db = MemoryDatabase()
+        key = PrivateKey.generate(algorithm='RSA')
+        self.db = db
+        self.users = [create_user(db, f'user{i}', key) for i in range(4)]
+
+    async def test_sign_only_visa(self):
+        alice, bob = self.users[:2]
+        # bob's visa carries a key for verifying only
+        visa = BaseVisa()
+        visa.set_property(name='did', value=str(bob))
+        visa.public_key = PrivateKey.generate(algorithm='ECC').public_key
+        visa.sign(private_key=self.db.id_keys[bob])
+        visa['did'] = str(bob)
+        self.db.documents[bob] = [visa]
+        messenger = create_endpoint(self.db, local_users=[alice])
+        packer = messenger.packer
+        self.assertEqual(await packer._prefetch_members(members=[bob]), [])
+        self.assertEqual(packer.pop_waiting_visas(), [bob])
+
+    async def test_waiting_visas_bounded(self):
+
+        class SmallPacker(MessagePacker):
+
+            @property
+            def waiting_visas_capacity(self) -> int:
+                return 2
+
+        messenger = create_endpoint(self.db, local_users=[self.users[0]])
+        packer = SmallPacker(facebook=messenger.facebook, messenger=messenger)
+        for user in self.users[1:]:
+            packer._wait_for_visa(member=user, now=time.time())
+        # the eldest one dropped
+        self.assertEqual(packer.pop_waiting_visas(), self.users[2:])
+        # expired
+        packer._wait_for_visa(member=self.users[1], now=time.time() - packer.waiting_visas_ttl - 1)
+        self.assertEqual(packer.pop_waiting_visas(), [])
+
+
+class DocumentCommandTestCase(unittest.IsolatedAsyncioTestCase):
+
+    async def test_save_documents_override(self):
+        db = MemoryDatabase()
+        key = PrivateKey.generate(algorithm='RSA')
+        alice = create_user(db, 'alice', key)
+        bob = create_user(db, 'bob', key)
+        sender = create_endpoint(db, local_users=[alice])
+        receiver = create_endpoint(db, local_users=[bob])
+        saved = []
+
+        class CustomProcessor(DocumentCommandProcessor):
+
+            async def _save_documents(self, documents: List[Document], meta: Meta, identifier: ID,
+                                      content: DocumentCommand, envelope: Envelope) -> Optional[List[Content]]:
+                saved.extend(documents)
+                return await super()._save_documents(documents, meta=meta, identifier=identifier,
+                                                     content=content, envelope=envelope)
+
+        cpu = CustomProcessor(facebook=receiver.facebook, messenger=receiver)
+        command = DocumentCommand.response(identifier=alice, meta=db.metas[alice], documents=db.documents[alice])
+        msg = InstantMessage.create(head=Envelope.create(sender=alice, receiver=bob), body=command)
+        r_msg = await sender.sign_message(msg=await sender.encrypt_message(msg=msg))
+        responses = await cpu.process_content(content=command, r_msg=r_msg)
+        # all documents are saved through the customized method
+        self.assertEqual(saved, db.documents[alice])
+        self.assertEqual(len(responses), 1)
+        self.assertEqual(responses[0].get('text'), 'Document received.')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+#
+#   DIM-SDK : Decentralized Instant Messaging Software Development Kit
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+"""
+    Metrics Tests
+    ~~~~~~~~~~~~~
+
+    Latency histograms & values of the pipeline stages, and the CPU profiling.
+"""
+
+import tracemalloc
+import unittest
+from typing import Optional, List
+
+from dimsdk import PrivateKey
+from dimsdk import Envelope, InstantMessage, ReliableMessage
+from dimsdk import Content, ContentType, TextContent, ArrayContent, ReceiptCommand
+from dimsdk import ContentProcessor, ContentProcessorFactory, BaseCommandProcessor
+from dimsdk import Facebook, Messenger
+from dimsdk import PipelineMetrics, HistogramSink
+
+from memory import MemoryDatabase, MemoryProcessor
+from memory import create_user, create_endpoint, load_plugins
+
+
+load_plugins()
+
+
+class HistogramSinkTestCase(unittest.TestCase):
+
+    def test_snapshot(self):
+        sink = HistogramSink()
+        metrics = PipelineMetrics()
+        self.assertFalse(metrics.enabled)
+        metrics.add_sink(sink)
+        for elapsed in (0.001, 0.002, 0.003):
+            metrics.record(stage='verify_message', elapsed=elapsed)
+        metrics.record(stage='verify_message', elapsed=0.004, success=False)
+        metrics.record_value(stage='verify_message', name='size', value=10)
+        metrics.record_value(stage='verify_message', name='size', value=30)
+        info = sink.snapshot()['verify_message']
+        self.assertEqual(info['count'], 4)
+        self.assertEqual(info['errors'], 1)
+        self.assertAlmostEqual(info['max'], 0.004)
+        self.assertEqual(info['size'], {'count': 2, 'total': 30 + 10, 'max': 30, 'avg': 20})
+        sink.reset()
+        self.assertEqual(sink.snapshot(), {})
+
+
+class ProcessorMetricsTestCase(unittest.IsolatedAsyncioTestCase):
+
+    async def test_cpu_stages(self):
+        db = MemoryDatabase()
+        key = PrivateKey.generate(algorithm='RSA')
+        alice = create_user(db, 'alice', key)
+        bob = create_user(db, 'bob', key)
+        sender = create_endpoint(db, local_users=[alice])
+        receiver = create_endpoint(db, local_users=[bob])
+        factory = receiver.processor.factory
+        sink = HistogramSink()
+        factory.metrics.add_sink(sink)
+        factory.sample_interval = 1
+        # the CPUs are not wrapped
+        cpu = factory.get_content_processor(content=ReceiptCommand.create(text='OK'))
+        self.assertIsInstance(cpu, BaseCommandProcessor)
+        contents = [
+            TextContent.create(text='hello'),
+            ArrayContent.create(contents=[TextContent.create(text=str(i)) for i in range(3)]),
+        ]
+        tracemalloc.start()
+        try:
+            for content in contents:
+                msg = InstantMessage.create(head=Envelope.create(sender=alice, receiver=bob), body=content)
+                data = await sender.serialize_message(
+                    msg=await sender.sign_message(msg=await sender.encrypt_message(msg=msg))
+                )
+                await receiver.process_package(data=data)
+        finally:
+            tracemalloc.stop()
+            factory.metrics.remove_sink(sink)
+        info = sink.snapshot()
+        text = info['process_content:%s' % ContentType.TEXT]
+        self.assertEqual(text['count'], 4)
+        self.assertEqual(text['responses']['total'], 4)
+        self.assertEqual(text['allocated']['count'], 4)
+        array = info['process_content:%s' % ContentType.ARRAY]
+        self.assertEqual(array['count'], 1)
+        self.assertEqual(array['responses']['total'], 3)
+
+    async def test_custom_factory(self):
+        db = MemoryDatabase()
+        key = PrivateKey.generate(algorithm='RSA')
+        alice = create_user(db, 'alice', key)
+        bob = create_user(db, 'bob', key)
+        sender = create_endpoint(db, local_users=[alice])
+        receiver = create_endpoint(db, local_users=[bob])
+        measured = []
+
+        class CountingFactory(ContentProcessorFactory):
+
+            def __init__(self, factory: ContentProcessorFactory):
+                super().__init__()
+                self.__factory = factory
+
+            def get_content_processor(self, content: Content) -> Optional[ContentProcessor]:
+                return self.__factory.get_content_processor(content=content)
+
+            def get_content_processor_for_type(self, msg_type: str) -> Optional[ContentProcessor]:
+                return self.__factory.get_content_processor_for_type(msg_type=msg_type)
+
+            async def measure(self, cpu: ContentProcessor, content: Content, r_msg: ReliableMessage) -> List[Content]:
+                measured.append(content.type)
+                return await super().measure(cpu=cpu, content=content, r_msg=r_msg)
+
+        class CountingProcessor(MemoryProcessor):
+
+            def _create_factory(self, facebook: Facebook, messenger: Messenger) -> ContentProcessorFactory:
+                return CountingFactory(factory=super()._create_factory(facebook=facebook, messenger=messenger))
+
+        processor = CountingProcessor(facebook=receiver.facebook, messenger=receiver)
+        content = TextContent.create(text='hello')
+        msg = InstantMessage.create(head=Envelope.create(sender=alice, receiver=bob), body=content)
+        r_msg = await sender.sign_message(msg=await sender.encrypt_message(msg=msg))
+        responses = await processor.process_content(content=content, r_msg=r_msg)
+        self.assertEqual(len(responses), 1)
+        # any factory can profile its CPUs
+        self.assertEqual(measured, [ContentType.TEXT])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+#
+#   DIM-SDK : Decentralized Instant Messaging Software Development Kit
+#
+#                                Written in 2026 by Moky <albert.moky@gmail.com>
+#
+# ==============================================================================
+# MIT License
+#
+# Copyright (c) 2026 Albert Moky
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+"""
+    Scheduler Tests
+    ~~~~~~~~~~~~~~~
+
+    Weighted fair queuing for contents before dispatching to CPUs.
+"""
+
+import asyncio
+import unittest
+
+from dimsdk import TextContent
+from dimsdk import ContentScheduler
+
+from memory import load_plugins
+
+
+load_plugins()
+
+
+class ContentSchedulerTestCase(unittest.IsolatedAsyncioTestCase):
+
+    async def test_nested_content(self):
+        scheduler = ContentScheduler(concurrency=1)
+        content = TextContent.create(text='hello')
+
+        async def inner() -> str:
+            return 'done'
+
+        async def outer() -> str:
+            # the slot is held by the outer content, no deadlock
+            return await scheduler.run(content=content, coro=inner())
+
+        result = await asyncio.wait_for(scheduler.run(content=content, coro=outer()), timeout=1)
+        self.assertEqual(result, 'done')
+        self.assertEqual(scheduler.running, 0)
+
+    async def test_other_scheduler(self):
+        first = ContentScheduler(concurrency=1)
+        second = ContentScheduler(concurrency=1)
+        content = TextContent.create(text='hello')
+        gate = asyncio.Event()
+        events = []
+
+        async def busy():
+            await gate.wait()
+            events.append('busy done')
+
+        async def inner():
+            events.append('inner')
+
+        async def outer():
+            # a slot of the first scheduler does not admit the second one
+            await second.run(content=content, coro=inner())
+
+        blocker = asyncio.create_task(second.run(content=content, coro=busy()))
+        await asyncio.sleep(0)
+        task = asyncio.create_task(first.run(content=content, coro=outer()))
+        await asyncio.sleep(0.01)
+        self.assertEqual(events, [])
+        gate.set()
+        await asyncio.wait_for(asyncio.gather(blocker, task), timeout=1)
+        self.assertEqual(events, ['busy done', 'inner'])
+
+
+if __name__ == '__main__':
+    unittest.main()